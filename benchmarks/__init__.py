@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the RTP package
+
+Run a single benchmark with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,45 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import time
+
+
+def measure(func, number=None, repeat=7, min_time=0.2):
+    """Time ``func`` and return the best rate in calls per second
+
+    Args:
+        func: Zero-argument callable to benchmark
+        number: Calls per timing run, None to calibrate to ``min_time``
+        repeat: Number of timing runs, the fastest one is reported
+        min_time: Target duration (seconds) of one run when calibrating
+    """
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time / 4:
+                number = max(1, int(number * min_time / elapsed))
+                break
+            number *= 4
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+
+def print_table(title, header, rows):
+    """Print benchmark results as an aligned text table"""
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    print(title)
+    print('  '.join(str(h).rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
+    print()
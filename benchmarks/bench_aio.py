@@ -0,0 +1,121 @@
+"""
+Benchmark of many concurrent streams: threads vs one asyncio event loop
+
+Each stream is a sender/receiver pair on loopback sending 20 ms packets.
+The threaded classes use three OS threads per stream; the asyncio classes
+share one event loop. Reports delivered packets, CPU time per packet and
+the number of threads the streams started. Console output of the stream
+classes is discarded.
+
+Usage:
+    python -m benchmarks.bench_aio
+"""
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+
+from rtp.core.aio import AsyncRTPSender, AsyncRTPReceiver
+from rtp.core.receiver import RTPReceiver
+from rtp.core.sender import RTPSender
+from benchmarks._util import print_table
+
+INTERVAL = 0.02
+DURATION = 2.0
+ASYNC_STREAMS = [10, 100, 1000]
+THREAD_STREAMS = [10, 100]
+
+
+def _count_writes(receiver, counter):
+    def write(packet):
+        counter[0] += 1
+    receiver._write_packet = write
+
+
+def run_threads(streams, duration=DURATION):
+    """Run streams on RTPSender/RTPReceiver threads"""
+    counter = [0]
+    receivers = []
+    senders = []
+    baseline = threading.active_count()
+    for i in range(streams):
+        receiver = RTPReceiver("127.0.0.1", 0)
+        _count_writes(receiver, counter)
+        receiver.running = True
+        receiver.receiver_thread = threading.Thread(target=receiver._receiver_loop, daemon=True)
+        receiver.receiver_thread.start()
+        receivers.append(receiver)
+        senders.append(RTPSender("127.0.0.1", receiver.socket.getsockname()[1], ssrc=i + 1))
+
+    start = time.process_time()
+    for sender in senders:
+        sender.start_sending(interval=INTERVAL, duration=duration)
+    threads = threading.active_count() - baseline
+    time.sleep(duration + 0.2)
+    for sender in senders:
+        sender.stop_sending()
+    cpu = time.process_time() - start
+    for receiver in receivers:
+        receiver.running = False
+    for receiver in receivers:
+        receiver.receiver_thread.join()
+        receiver.socket.close()
+    return counter[0], cpu, threads
+
+
+async def _run_async(streams, duration):
+    counter = [0]
+    receivers = []
+    senders = []
+    baseline = threading.active_count()
+    for i in range(streams):
+        receiver = AsyncRTPReceiver("127.0.0.1", 0)
+        _count_writes(receiver, counter)
+        await receiver.start()
+        receivers.append(receiver)
+        senders.append(AsyncRTPSender("127.0.0.1", receiver.local_address[1], ssrc=i + 1))
+
+    start = time.process_time()
+    for sender in senders:
+        await sender.start(interval=INTERVAL, duration=duration)
+    threads = threading.active_count() - baseline
+    await asyncio.gather(*(sender.wait_closed() for sender in senders))
+    await asyncio.sleep(0.2)
+    cpu = time.process_time() - start
+    for receiver in receivers:
+        receiver.stop_receiving()
+    return counter[0], cpu, threads
+
+
+def run_async(streams, duration=DURATION):
+    """Run streams on AsyncRTPSender/AsyncRTPReceiver in one event loop"""
+    return asyncio.run(_run_async(streams, duration))
+
+
+def run(async_streams=ASYNC_STREAMS, thread_streams=THREAD_STREAMS, duration=DURATION):
+    """Run the benchmark and return delivered packets, CPU time and threads per case"""
+    results = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for streams in thread_streams:
+            results[f'threads_{streams}'] = run_threads(streams, duration)
+        for streams in async_streams:
+            results[f'asyncio_{streams}'] = run_async(streams, duration)
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for key, (delivered, cpu, threads) in results.items():
+        mode, streams = key.split('_')
+        expected = int(streams) * round(DURATION / INTERVAL)
+        rows.append([mode, streams, f'{delivered:,}', f'{delivered / expected:.1%}',
+                     f'{cpu / max(delivered, 1) * 1e6:.1f}', threads])
+    print_table(f'{DURATION:.0f} s of {INTERVAL * 1000:.0f} ms packets per stream',
+                ['mode', 'streams', 'delivered', 'of sent', 'cpu us/pkt', 'threads'], rows)
+
+
+if __name__ == '__main__':
+    main()
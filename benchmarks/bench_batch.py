@@ -0,0 +1,49 @@
+"""
+Benchmark of batch decode/encode against per-packet loops
+
+Usage:
+    python -m benchmarks.bench_batch
+"""
+
+from rtp.core.packet import RTPPacket
+from benchmarks._util import measure, print_table
+
+BATCH_SIZES = [16, 64, 256, 1024]
+
+
+def run():
+    """Run the benchmark and return packets per second keyed by case"""
+    results = {}
+    for count in BATCH_SIZES:
+        packets = [RTPPacket(seq_num=i, timestamp=i * 160, ssrc=0x1234, payload=bytes(160))
+                   for i in range(count)]
+        datagrams = [p.encode() for p in packets]
+
+        def decode_loop():
+            decode = RTPPacket.decode
+            return [decode(d).seq_num for d in datagrams]
+
+        def decode_batch():
+            return RTPPacket.decode_many(datagrams).headers['seq_num']
+
+        results[f'decode_loop_{count}'] = measure(decode_loop) * count
+        results[f'decode_many_{count}'] = measure(decode_batch) * count
+        results[f'encode_loop_{count}'] = measure(lambda: [p.encode() for p in packets]) * count
+        results[f'encode_many_{count}'] = measure(lambda: RTPPacket.encode_many(packets)) * count
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for count in BATCH_SIZES:
+        for op in ('decode', 'encode'):
+            loop = results[f'{op}_loop_{count}']
+            batch = results[f'{op}_many_{count}']
+            rows.append([op, count, f'{loop:,.0f}', f'{batch:,.0f}', f'{batch / loop:.2f}x'])
+    print_table('Batch API throughput (packets/s)',
+                ['op', 'batch', 'loop', 'batch api', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
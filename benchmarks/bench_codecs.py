@@ -0,0 +1,82 @@
+"""
+Benchmark of the G.711 codecs in MB/s of 16-bit PCM
+
+Encodes and decodes one 20 ms frame (the per-packet case) and one minute of
+audio in a single call, with the NumPy lookup tables against a per-sample
+Python loop over the same tables. ``audioop`` is included as a C baseline
+where the interpreter still ships it (removed in Python 3.13).
+
+Usage:
+    python -m benchmarks.bench_codecs
+"""
+
+import array
+import warnings
+
+import numpy as np
+
+from rtp.utils.codecs import PCMA, PCMU
+from benchmarks._util import measure, print_table
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+SIZES = [('20 ms', 160), ('60 s', 8000 * 60)]
+
+
+def python_codec(codec):
+    """(encode, decode) doing per-sample lookups in list copies of the tables"""
+    encode_table = codec.encode_table.tolist()
+    decode_table = codec.decode_table.tolist()
+
+    def encode(pcm):
+        return bytes([encode_table[sample] for sample in memoryview(pcm).cast('H')])
+
+    def decode(payload):
+        return array.array('h', [decode_table[code] for code in payload]).tobytes()
+    return encode, decode
+
+
+def run():
+    """MB/s of PCM keyed by (codec, size, implementation, direction)"""
+    rng = np.random.default_rng(0)
+    results = {}
+    for size_name, samples in SIZES:
+        pcm = rng.integers(-32768, 32768, samples).astype('<i2').tobytes()
+        mb = len(pcm) / 1e6
+        for codec in (PCMU, PCMA):
+            payload = codec.encode(pcm)
+            cases = {
+                ('numpy', 'encode'): lambda: codec.encode(pcm),
+                ('numpy', 'decode'): lambda: codec.decode(payload),
+            }
+            if samples <= 8000:
+                encode, decode = python_codec(codec)
+                cases[('python', 'encode')] = lambda: encode(pcm)
+                cases[('python', 'decode')] = lambda: decode(payload)
+            if audioop is not None:
+                c_encode = audioop.lin2ulaw if codec is PCMU else audioop.lin2alaw
+                c_decode = audioop.ulaw2lin if codec is PCMU else audioop.alaw2lin
+                cases[('audioop', 'encode')] = lambda: c_encode(pcm, 2)
+                cases[('audioop', 'decode')] = lambda: c_decode(payload, 2)
+            for (impl, direction), func in cases.items():
+                results[(codec.name, size_name, impl, direction)] = measure(func, repeat=5) * mb
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for (codec, size, impl, direction), rate in results.items():
+        if direction == 'encode':
+            rows.append([codec, size, impl, f'{rate:,.1f}',
+                         f"{results[(codec, size, impl, 'decode')]:,.1f}"])
+    print_table('G.711, MB/s of 16-bit PCM', ['codec', 'frame', 'impl', 'encode', 'decode'], rows)
+
+
+if __name__ == '__main__':
+    main()
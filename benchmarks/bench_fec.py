@@ -0,0 +1,88 @@
+"""
+Benchmark of XOR FEC encoding and recovery
+
+Compares the vectorized ``FECHandler`` with the previous per-byte Python
+implementation (reproduced below) across group sizes and payload sizes.
+Rates are FEC groups per second.
+
+Usage:
+    python -m benchmarks.bench_fec
+"""
+
+from rtp.core.packet import RTPPacket
+from rtp.utils.fec import FECHandler
+from benchmarks._util import measure, print_table
+
+GROUP_SIZES = [2, 4, 8, 16]
+PAYLOAD_SIZES = [160, 320, 640, 1400]
+
+
+def legacy_generate(packets):
+    """Parity generation as it was before vectorization"""
+    fec_payload = packets[0].payload
+    for packet in packets[1:]:
+        fec_payload = bytes(a ^ b for a, b in zip(fec_payload, packet.payload))
+    return fec_payload
+
+
+def legacy_recover(fec_payload, available_packets):
+    """Recovery XOR loop as it was before vectorization"""
+    fec_data = bytearray(fec_payload)
+    for packet in available_packets:
+        packet_data = packet.encode()
+        for i in range(len(fec_data)):
+            if i < len(packet_data):
+                fec_data[i] ^= packet_data[i]
+    return bytes(fec_data)
+
+
+def make_group(group_size, payload_size):
+    return [RTPPacket(seq_num=i, timestamp=i * 160, ssrc=0x1234,
+                      payload=bytes([i & 0xFF]) * payload_size)
+            for i in range(group_size)]
+
+
+def run(group_sizes=GROUP_SIZES, payload_sizes=PAYLOAD_SIZES):
+    """Run the benchmark and return groups per second keyed by case"""
+    results = {}
+    for group_size in group_sizes:
+        for payload_size in payload_sizes:
+            packets = make_group(group_size, payload_size)
+            handler = FECHandler(group_size=group_size)
+
+            def encode():
+                handler.packet_buffer = list(packets)
+                return handler._generate_fec_packets()[0]
+
+            fec_packet = encode()
+            available = packets[1:]
+            legacy_parity = legacy_generate(packets)
+            key = f'{group_size}x{payload_size}'
+            results[f'legacy_encode_{key}'] = measure(lambda: legacy_generate(packets), repeat=3)
+            results[f'encode_{key}'] = measure(encode, repeat=3)
+            results[f'legacy_recover_{key}'] = measure(
+                lambda: legacy_recover(legacy_parity, available), repeat=3, min_time=0.1)
+            results[f'recover_{key}'] = measure(
+                lambda: handler.recover_packet(fec_packet, available), repeat=3)
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for group_size in GROUP_SIZES:
+        for payload_size in PAYLOAD_SIZES:
+            key = f'{group_size}x{payload_size}'
+            row = [group_size, payload_size]
+            for op in ('encode', 'recover'):
+                before = results[f'legacy_{op}_{key}']
+                after = results[f'{op}_{key}']
+                row += [f'{before:,.0f}', f'{after:,.0f}', f'{after / before:.1f}x']
+            rows.append(row)
+    print_table('XOR FEC throughput (groups/s)',
+                ['group', 'payload', 'enc before', 'enc after', 'speedup',
+                 'rec before', 'rec after', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of FEC schemes: recovery rate against CPU cost under burst loss
+
+Every media and FEC packet of a synthetic stream goes through a seeded
+``GilbertElliottLoss`` model, the burst loss ``SimulatedNetwork`` uses, whose
+mean loss matches the default ``RTPConfig`` drop rate (10%), with a mean
+burst length of ``BURST_LENGTH`` packets. Each scheme reports its bandwidth overhead, the
+residual media loss after decoding and the encode/decode CPU cost.
+
+Usage:
+    python -m benchmarks.bench_fec_schemes
+"""
+
+import random
+import time
+
+from rtp.config import default_config
+from rtp.core.packet import RTPPacket
+from rtp.utils.fec import FECHandler, FECRecoveryIndex
+from rtp.utils.impairments import GilbertElliottLoss
+from benchmarks._util import print_table
+
+PACKET_COUNT = 20000
+PAYLOAD_SIZE = 160
+BURST_LENGTH = 2.0
+
+SCHEMES = [
+    ('xor k=4', dict(group_size=4, scheme='xor')),
+    ('xor k=8', dict(group_size=8, scheme='xor')),
+    ('2d 4x4', dict(group_size=16, scheme='2d')),
+    ('rs(8,10)', dict(group_size=8, scheme='rs', repair_count=2)),
+    ('rs(8,12)', dict(group_size=8, scheme='rs', repair_count=4)),
+    ('rs(16,20)', dict(group_size=16, scheme='rs', repair_count=4)),
+]
+
+
+def run_scheme(options, packet_count=PACKET_COUNT, loss_rate=default_config.drop_rate,
+               burst_length=BURST_LENGTH, seed=1):
+    """Stream packets through one scheme and the burst loss process"""
+    packets = [RTPPacket(seq_num=i % 65536, timestamp=i * 160, ssrc=0x1234,
+                         payload=bytes([i & 0xFF]) * PAYLOAD_SIZE)
+               for i in range(packet_count)]
+
+    handler = FECHandler(**options)
+    stream = []
+    start = time.process_time()
+    for packet in packets:
+        stream.append(packet)
+        stream.extend(handler.add_packet(packet))
+    encode_time = time.process_time() - start
+    fec_count = len(stream) - packet_count
+
+    loss = GilbertElliottLoss(loss_rate, burst_length)
+    rng = random.Random(seed)
+    delivered = [p for p in stream if not loss.lost(rng)]
+    received = sum(1 for p in delivered if p.payload_type != RTPPacket.PT_FEC)
+
+    index = FECRecoveryIndex()
+    start = time.process_time()
+    for packet in delivered:
+        if packet.payload_type == RTPPacket.PT_FEC:
+            index.add_fec(packet)
+        else:
+            index.add_media(packet)
+    decode_time = time.process_time() - start
+
+    lost = packet_count - received
+    return {
+        'overhead': fec_count / packet_count,
+        'loss': lost / packet_count,
+        'residual_loss': (lost - index.recovered_count) / packet_count,
+        'recovery_rate': index.recovered_count / lost if lost else 1.0,
+        'encode_us': encode_time / packet_count * 1e6,
+        'decode_us': decode_time / packet_count * 1e6,
+    }
+
+
+def run(packet_count=PACKET_COUNT):
+    """Run every scheme and return the results keyed by scheme name"""
+    return {name: run_scheme(options, packet_count) for name, options in SCHEMES}
+
+
+def main():
+    results = run()
+    rows = [[name, f"{r['overhead']:.0%}", f"{r['loss']:.2%}", f"{r['residual_loss']:.2%}",
+             f"{r['recovery_rate']:.1%}", f"{r['encode_us']:.1f}", f"{r['decode_us']:.1f}"]
+            for name, r in results.items()]
+    print_table(f'FEC schemes under Gilbert-Elliott loss '
+                f'({default_config.drop_rate:.0%} mean, bursts of {BURST_LENGTH:g})',
+                ['scheme', 'overhead', 'loss', 'residual', 'recovered',
+                 'enc us/pkt', 'dec us/pkt'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark of the adaptive jitter buffer under SimulatedNetwork impairments
+
+A 20 ms packet stream goes through the seeded ``NetworkModel`` that
+``SimulatedNetwork`` applies: every packet gets a uniform delay in
+``[0, max_delay]``, skips it with ``reorder_rate`` and is duplicated with
+``duplicate_rate``; the "correlated" network blends consecutive delays
+instead. Packets arrive in due-time order, as the simulator's delay heap
+forwards them. The arrivals feed a ``JitterBuffer`` on a virtual clock, so
+the run is deterministic and takes no wall time. The adaptive buffer is compared with fixed playout delays
+on late drops (audio lost to jitter), mean playout delay and occupancy.
+
+Usage:
+    python -m benchmarks.bench_jitter_buffer
+"""
+
+import heapq
+import time
+
+from rtp.config import default_config
+from rtp.core.packet import RTPPacket
+from rtp.utils.impairments import Delay, Duplicate, NetworkModel
+from rtp.utils.jitter_buffer import JitterBuffer
+from benchmarks._util import print_table
+
+PACKET_COUNT = 5000
+FRAME = 0.02
+
+NETWORKS = [
+    ('delay 50ms', dict(max_delay=default_config.max_delay, reorder_rate=0.0)),
+    ('delay 50ms reorder', dict(max_delay=default_config.max_delay,
+                                reorder_rate=default_config.reorder_rate)),
+    ('delay 100ms reorder', dict(max_delay=0.1, reorder_rate=default_config.reorder_rate)),
+    ('delay 200ms reorder', dict(max_delay=0.2, reorder_rate=default_config.reorder_rate)),
+    ('delay 200ms correlated', dict(impairments=[Delay(0.2, correlation=0.5),
+                                                 Duplicate(default_config.duplicate_rate)])),
+]
+
+BUFFERS = [
+    ('fixed 20ms', dict(min_delay=0.02, max_delay=0.02)),
+    ('fixed 100ms', dict(min_delay=0.1, max_delay=0.1)),
+    ('adaptive', dict(min_delay=0.02, max_delay=0.5)),
+]
+
+
+def simulate_arrivals(packet_count, max_delay=0.0, reorder_rate=0.0,
+                      duplicate_rate=default_config.duplicate_rate, impairments=None, seed=1):
+    """Return (arrival time, packet) pairs in the order SimulatedNetwork forwards them"""
+    if impairments is None:
+        model = NetworkModel.from_rates(0.0, max_delay, reorder_rate, duplicate_rate, seed=seed)
+    else:
+        model = NetworkModel(impairments, seed)
+    queue = []  # [(due, index, packet)] like SimulatedNetwork's delay heap
+    for seq in range(packet_count):
+        packet = RTPPacket(seq_num=seq % 65536, timestamp=seq * 160, ssrc=1,
+                           payload=b'\x00' * 160)
+        for delay in model():
+            heapq.heappush(queue, (seq * FRAME + delay, len(queue), packet))
+    return [heapq.heappop(queue)[::2] for _ in range(len(queue))]
+
+
+def run_buffer(arrivals, options):
+    """Feed the arrivals through one jitter buffer configuration"""
+    buffer = JitterBuffer(**options)
+    played = 0
+    delay_sum = 0.0
+    occupancy_sum = 0
+    start = time.process_time()
+    for arrival, packet in arrivals:
+        for frame in buffer.pop_due(arrival):
+            if frame is not None:
+                played += 1
+                delay_sum += buffer.delay
+        buffer.put(packet, arrival=arrival)
+        occupancy_sum += buffer.occupancy
+    played += sum(1 for frame in buffer.pop_due(float('inf')) if frame is not None)
+    cpu = time.process_time() - start
+    return {
+        'late_drops': buffer.late_drops,
+        'lost': buffer.lost,
+        'played': played,
+        'mean_delay_ms': delay_sum / max(played, 1) * 1000.0,
+        'mean_occupancy': occupancy_sum / len(arrivals),
+        'us_per_packet': cpu / len(arrivals) * 1e6,
+    }
+
+
+def run(packet_count=PACKET_COUNT):
+    """Run every buffer against every network and return the results"""
+    results = {}
+    for network_name, network in NETWORKS:
+        arrivals = simulate_arrivals(packet_count, **network)
+        for buffer_name, options in BUFFERS:
+            results[f'{network_name}/{buffer_name}'] = run_buffer(arrivals, options)
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for network_name, _ in NETWORKS:
+        for buffer_name, _ in BUFFERS:
+            r = results[f'{network_name}/{buffer_name}']
+            rows.append([network_name, buffer_name,
+                         f"{r['lost'] / PACKET_COUNT:.2%}",
+                         f"{r['mean_delay_ms']:.1f}",
+                         f"{r['mean_occupancy']:.1f}",
+                         f"{r['us_per_packet']:.1f}"])
+    print_table(f'Jitter buffer, {PACKET_COUNT} packets of {FRAME * 1000:.0f} ms',
+                ['network', 'buffer', 'audio lost', 'delay ms', 'occupancy', 'us/pkt'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark of the sender's audio sources
+
+Streams long WAV files across many senders ticked round robin, the way the
+pacing scheduler drives them, with the socket send left out:
+
+- legacy: one ``wave`` reader per sender and ``readframes(160)`` per tick,
+  as ``set_audio_file`` did before media sources (8 kHz mono 16-bit only)
+- mmap: ``WaveSource`` slices of one shared memory map
+
+Each is timed reading frames alone and through ``RTPSender.tick``.
+
+Also times loading a 44.1 kHz stereo file, which the legacy reader
+rejected: the one-off conversion, a load served from the in-process cache
+and one from the on-disk cache.
+
+Usage:
+    python -m benchmarks.bench_media
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from rtp.core.sender import RTPSender
+from rtp.utils.media import WaveSource, clear_cache
+from benchmarks._util import print_table
+
+MINUTES = 10
+SENDERS = [1, 100, 1000]
+TICKS = 100000
+
+
+class LegacySender(RTPSender):
+    """RTPSender reading its file with wave.readframes on every tick"""
+    def _open_socket(self):
+        return None
+
+    def _send_batch(self, datagrams):
+        pass
+
+    def set_audio_file(self, wav_path):
+        self.legacy_file = wave.open(wav_path, 'rb')
+
+    def _next_payload(self, packet_count):
+        return self.legacy_file.readframes(160) or None
+
+
+class MmapSender(LegacySender):
+    """RTPSender streaming from a WaveSource"""
+    set_audio_file = RTPSender.set_audio_file
+
+    def _next_payload(self, packet_count):
+        return self.audio_source.read()
+
+
+def write_wave(path, rate, channels, seconds):
+    """A tone of the given length and format"""
+    t = np.arange(int(rate * seconds)) / rate
+    tone = np.rint(np.sin(2 * np.pi * 440 * t) * 16000).astype('<i2')
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(tone, channels).tobytes())
+
+
+def _rate(senders, call, ticks):
+    rounds = ticks // len(senders)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for sender in senders:
+            call(sender)
+    return rounds * len(senders) / (time.perf_counter() - start)
+
+
+def stream(sender_class, path, count, ticks=TICKS):
+    """(Frames read per second, ticks per second) over count senders"""
+    def open_senders():
+        senders = []
+        for _ in range(count):
+            sender = sender_class('127.0.0.1', 9, history_size=64, stats_interval=None,
+                                  rtcp_interval=None)
+            sender.set_audio_file(path)
+            senders.append(sender)
+        return senders
+    reads = _rate(open_senders(), lambda sender: sender._next_payload(0), ticks)
+    return reads, _rate(open_senders(), sender_class.tick, ticks)
+
+
+def load_times(path, cache_dir):
+    """Seconds to load a file needing conversion: first, cached in memory, cached on disk"""
+    clear_cache()
+    times = []
+    for clear in (False, False, True):
+        if clear:
+            clear_cache()
+        start = time.perf_counter()
+        WaveSource(path, cache_dir=cache_dir)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run():
+    """Stream with both readers and time the conversion"""
+    directory = tempfile.mkdtemp()
+    try:
+        native = os.path.join(directory, 'native.wav')
+        stereo = os.path.join(directory, 'stereo.wav')
+        write_wave(native, 8000, 1, MINUTES * 60)
+        write_wave(stereo, 44100, 2, MINUTES * 60)
+        results = {}
+        for count in SENDERS:
+            results[f'legacy/{count}'] = stream(LegacySender, native, count)
+            results[f'mmap/{count}'] = stream(MmapSender, native, count)
+        results['load'] = load_times(stereo, os.path.join(directory, 'cache'))
+        return results
+    finally:
+        clear_cache()
+        shutil.rmtree(directory)
+
+
+def main():
+    results = run()
+    rows = []
+    for count in SENDERS:
+        for reader in ('legacy', 'mmap'):
+            reads, ticks = results[f'{reader}/{count}']
+            rows.append([count, reader, f'{reads:,.0f}', f'{ticks:,.0f}'])
+    print_table(f'{MINUTES} min 8 kHz files, {TICKS:,} ticks round robin',
+                ['senders', 'reader', 'frames/s', 'ticks/s'], rows)
+    first, memory, disk = results['load']
+    print_table(f'Loading a {MINUTES} min 44.1 kHz stereo file as 8 kHz mono',
+                ['case', 'ms'],
+                [['convert', f'{first * 1000:,.1f}'], ['in-process cache', f'{memory * 1000:,.3f}'],
+                 ['disk cache', f'{disk * 1000:,.3f}']])
+
+
+if __name__ == '__main__':
+    main()
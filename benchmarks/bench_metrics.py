@@ -0,0 +1,116 @@
+"""
+Benchmark of the per-packet cost of console output vs metrics
+
+Compares the receive and send paths with the per-packet ``print()`` calls
+they used to make (the stats line with its loss rate, "Processed packet"
+and "Sent") against the current metrics, which only bump counters. Printing
+goes to /dev/null, the cheapest possible console; a real terminal is slower
+still. Rates are packets per second on one core.
+
+Usage:
+    python -m benchmarks.bench_metrics
+"""
+
+import contextlib
+import logging
+import os
+
+from rtp.core.packet import RTPPacket
+from rtp.core.receiver import RTPReceiver
+from rtp.core.sender import RTPSender
+from benchmarks._util import measure, print_table
+
+ADDR = ('127.0.0.1', 9)
+
+
+class PrintingReceiver(RTPReceiver):
+    """Receiver printing per packet as it did before metrics"""
+    def _process_media_packet(self, packet, recovered=False):
+        super()._process_media_packet(packet, recovered)
+        stats = self.stats
+        loss_rate = stats['lost_packets'] / (stats['packets_received'] + stats['lost_packets']) * 100 if (stats['packets_received'] + stats['lost_packets']) > 0 else 0
+        print(f"Stats: Received={stats['packets_received']}, Lost={stats['lost_packets']}, "
+              f"Out-of-order={stats['out_of_order']}, Loss Rate={loss_rate:.2f}%, "
+              f"NACKs Sent={stats['nacks_sent']}, "
+              f"Retransmissions={stats['retransmissions_received']}")
+
+    def _write_packet(self, packet):
+        super()._write_packet(packet)
+        print(f"Processed packet: {packet}")
+
+
+class PrintingSender(RTPSender):
+    """Sender printing per packet as it did before metrics"""
+    def send_packet(self, payload):
+        seq_num = super().send_packet(payload)
+        print(f"Sent: seq={seq_num}")
+        return seq_num
+
+
+def _receive_rate(receiver_class, **options):
+    receiver = receiver_class('127.0.0.1', 0, **options)
+    datagrams = [RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=bytes(160)).encode()
+                 for seq in range(65536)]
+    state = {'seq': 0}
+
+    def receive():
+        seq = state['seq']
+        state['seq'] = (seq + 1) & 0xFFFF
+        receiver._process_packet(RTPPacket.decode(datagrams[seq]), ADDR)
+        receiver.reporter.maybe_report()  # Once per batch in the loop, once per packet here
+
+    try:
+        return measure(receive)
+    finally:
+        receiver.socket.close()
+
+
+def _send_rate(sender_class, **options):
+    sender = sender_class('127.0.0.1', 9, ssrc=1, **options)
+    payload = bytes(160)
+    try:
+        return measure(lambda: sender.send_packet(payload))
+    finally:
+        sender.socket.close()
+
+
+def run():
+    """Return packets per second keyed by case"""
+    results = {}
+    rtp_logger = logging.getLogger('rtp')
+    level = rtp_logger.level
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results['receive_print'] = _receive_rate(PrintingReceiver, stats_interval=None)
+        results['receive_metrics'] = _receive_rate(RTPReceiver, stats_interval=None)
+        # Snapshots enabled and emitted, at the default rate
+        handler = logging.StreamHandler(devnull)
+        rtp_logger.addHandler(handler)
+        rtp_logger.setLevel(logging.INFO)
+        try:
+            results['receive_metrics_logged'] = _receive_rate(RTPReceiver, stats_interval=1.0)
+        finally:
+            rtp_logger.removeHandler(handler)
+            rtp_logger.setLevel(level)
+        results['send_print'] = _send_rate(PrintingSender, stats_interval=None)
+        results['send_metrics'] = _send_rate(RTPSender, stats_interval=None)
+    return results
+
+
+def main():
+    results = run()
+    rows = [
+        ['receive', 'print per packet', f"{results['receive_print']:,.0f}", '1.00x'],
+        ['receive', 'metrics, no output', f"{results['receive_metrics']:,.0f}",
+         f"{results['receive_metrics'] / results['receive_print']:.2f}x"],
+        ['receive', 'metrics, logged 1/s', f"{results['receive_metrics_logged']:,.0f}",
+         f"{results['receive_metrics_logged'] / results['receive_print']:.2f}x"],
+        ['send', 'print per packet', f"{results['send_print']:,.0f}", '1.00x'],
+        ['send', 'metrics', f"{results['send_metrics']:,.0f}",
+         f"{results['send_metrics'] / results['send_print']:.2f}x"],
+    ]
+    print_table('Per-packet output cost (packets/s, stdout to /dev/null)',
+                ['path', 'output', 'packets/s', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
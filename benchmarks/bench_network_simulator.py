@@ -0,0 +1,218 @@
+"""
+Benchmark of the SimulatedNetwork middlebox: list rebuild vs delay heap
+
+Compares the old middlebox, which rebuilt its whole buffer list on a 5 ms
+tick and swapped random entries to reorder, with the current one keeping a
+heap of due times. Both use the default reorder rate without loss or
+duplicates.
+
+- Forwarding CPU: the queueing work of both, without sockets, on a virtual
+  clock at 50k packets/s, in microseconds per packet as the maximum delay
+  and so the backlog grows.
+- Loopback: datagrams offered at a fixed rate through the real middlebox;
+  every datagram that does not arrive was lost by it falling behind.
+
+Usage:
+    python -m benchmarks.bench_network_simulator
+"""
+
+import heapq
+import random
+import socket
+import threading
+import time
+
+from rtp.config import default_config
+from rtp.utils.impairments import NetworkModel
+from rtp.utils.network_simulator import SimulatedNetwork
+from rtp.utils.socket_io import BufferPool, recv_batch
+from benchmarks._util import print_table
+
+RATES = [5000, 20000, 50000, 80000]
+DURATION = 2.0
+MAX_DELAY = default_config.max_delay
+CPU_RATE = 50000
+CPU_DELAYS = [0.05, 0.2, 1.0]
+REORDER_RATE = default_config.reorder_rate
+RCVBUF = 1 << 20
+
+
+class LegacySimulatedNetwork:
+    """The middlebox before the delay heap, kept for comparison"""
+    def __init__(self, forward_port, max_delay, reorder_rate):
+        self.forward_port = forward_port
+        self.max_delay = max_delay
+        self.reorder_rate = reorder_rate
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.running = False
+
+    @property
+    def local_address(self):
+        return self.socket.getsockname()
+
+    def start(self):
+        self.running = True
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        threading.Thread(target=self._recv_loop, daemon=True).start()
+        threading.Thread(target=self._forward_loop, daemon=True).start()
+
+    def _recv_loop(self):
+        while self.running:
+            try:
+                data, addr = self.socket.recvfrom(4096)
+            except OSError:
+                break
+            delay = random.uniform(0, self.max_delay)
+            with self.lock:
+                self.buffer.append((time.time() + delay, data))
+            if random.random() < self.reorder_rate and len(self.buffer) >= 2:
+                i = random.randint(0, len(self.buffer) - 1)
+                self.buffer[-1], self.buffer[i] = self.buffer[i], self.buffer[-1]
+
+    def _forward_loop(self):
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        while self.running:
+            now = time.time()
+            with self.lock:
+                ready = [pkt for pkt in self.buffer if pkt[0] <= now]
+                self.buffer = [pkt for pkt in self.buffer if pkt[0] > now]
+            for _, pkt_data in ready:
+                send_sock.sendto(pkt_data, ('127.0.0.1', self.forward_port))
+            time.sleep(0.005)
+        send_sock.close()
+
+    def stop(self):
+        self.running = False
+        self.socket.close()
+
+
+def forward_cost_legacy(max_delay, rate=CPU_RATE, duration=DURATION):
+    """CPU seconds per packet of the list buffer, 1 ms arrival bursts"""
+    rng = random.Random(1)
+    burst = rate // 1000
+    buffer = []
+    forwarded = 0
+    start = time.process_time()
+    for ms in range(int(duration * 1000)):
+        now = ms / 1000.0
+        for _ in range(burst):
+            buffer.append((now + rng.uniform(0, max_delay), b''))
+            if rng.random() < REORDER_RATE and len(buffer) >= 2:
+                i = rng.randint(0, len(buffer) - 1)
+                buffer[-1], buffer[i] = buffer[i], buffer[-1]
+        if ms % 5 == 0:
+            ready = [pkt for pkt in buffer if pkt[0] <= now]
+            buffer = [pkt for pkt in buffer if pkt[0] > now]
+            forwarded += len(ready)
+    return (time.process_time() - start) / (burst * duration * 1000)
+
+
+def forward_cost_heap(max_delay, rate=CPU_RATE, duration=DURATION):
+    """CPU seconds per packet of the model and delay heap, 1 ms arrival bursts"""
+    model = NetworkModel.from_rates(max_delay=max_delay, reorder_rate=REORDER_RATE, seed=1)
+    burst = rate // 1000
+    queue = []
+    arrivals = 0
+    forwarded = 0
+    start = time.process_time()
+    for ms in range(int(duration * 1000)):
+        now = ms / 1000.0
+        for index, delay in model.schedule(burst):
+            if delay <= 0.0:
+                forwarded += 1
+            else:
+                heapq.heappush(queue, (now + delay, arrivals, b''))
+            arrivals += 1
+        while queue and queue[0][0] <= now:
+            heapq.heappop(queue)
+            forwarded += 1
+    return (time.process_time() - start) / (burst * duration * 1000)
+
+
+def _heap_network(forward_port):
+    return SimulatedNetwork(0, '127.0.0.1', forward_port, drop_rate=0.0, max_delay=MAX_DELAY,
+                            reorder_rate=REORDER_RATE, duplicate_rate=0.0, seed=1,
+                            listen_ip='127.0.0.1')
+
+
+def _legacy_network(forward_port):
+    return LegacySimulatedNetwork(forward_port, MAX_DELAY, REORDER_RATE)
+
+
+def run_case(factory, rate, duration=DURATION):
+    """Offer rate datagrams/s for duration seconds, return (delivered/s, loss)"""
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+    sink.bind(('127.0.0.1', 0))
+    network = factory(sink.getsockname()[1])
+    network.start()
+    network.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    received = [0]
+
+    def drain():
+        pool = BufferPool()
+        while True:
+            batch = recv_batch(sink, pool, timeout=0.5)
+            if not batch:
+                break
+            received[0] += len(batch)
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+    # Send in 1 ms bursts on absolute deadlines
+    burst = max(1, rate // 1000)
+    count = int(rate * duration) // burst * burst
+    target = network.local_address
+    datagram = bytes(172)
+    start = time.monotonic()
+    for i in range(count // burst):
+        delay = start + i * burst / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        for _ in range(burst):
+            sender.sendto(datagram, target)
+    drainer.join()
+    elapsed = time.monotonic() - start - 0.5
+    network.stop()
+    sender.close()
+    sink.close()
+    return received[0] / elapsed, 1.0 - received[0] / count
+
+
+def run(rates=RATES, duration=DURATION):
+    """Run both middleboxes offline at every delay and live at every rate"""
+    results = {}
+    for max_delay in CPU_DELAYS:
+        results[f'cpu_legacy_{max_delay}'] = forward_cost_legacy(max_delay)
+        results[f'cpu_heap_{max_delay}'] = forward_cost_heap(max_delay)
+    for rate in rates:
+        results[f'legacy_{rate}'] = run_case(_legacy_network, rate, duration)
+        results[f'heap_{rate}'] = run_case(_heap_network, rate, duration)
+    return results
+
+
+def main():
+    results = run()
+    rows = [[f'{max_delay * 1000:.0f}', f'{CPU_RATE * max_delay / 2:,.0f}',
+             f"{results[f'cpu_legacy_{max_delay}'] * 1e6:.2f}",
+             f"{results[f'cpu_heap_{max_delay}'] * 1e6:.2f}"]
+            for max_delay in CPU_DELAYS]
+    print_table(f'Forwarding CPU at {CPU_RATE:,} packets/s (us/packet)',
+                ['max delay ms', 'mean backlog', 'legacy', 'heap'], rows)
+    print()
+
+    rows = []
+    for rate in RATES:
+        for name in ('legacy', 'heap'):
+            delivered, loss = results[f'{name}_{rate}']
+            rows.append([f'{rate:,}', name, f'{delivered:,.0f}', f'{loss:.2%}'])
+    print_table(f'Middlebox forwarding, {MAX_DELAY * 1000:.0f} ms max delay, '
+                f'{REORDER_RATE:.0%} reorder',
+                ['offered/s', 'middlebox', 'delivered/s', 'lost'], rows)
+
+
+if __name__ == '__main__':
+    main()
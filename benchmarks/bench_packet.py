@@ -0,0 +1,100 @@
+"""
+Microbenchmark for RTPPacket decode throughput
+
+Compares the current ``RTPPacket.decode`` against the previous eager,
+copying implementation (reproduced below as ``legacy_decode``).
+
+Usage:
+    python -m benchmarks.bench_packet
+"""
+
+import struct
+
+from rtp.core.packet import RTPPacket
+from benchmarks._util import measure, print_table
+
+PAYLOAD_SIZES = [160, 320, 1400]
+
+
+class LegacyPacket:
+    """Dict-backed packet object as built by the old decoder"""
+    def __init__(self, payload_type, seq_num, timestamp, ssrc, payload):
+        self.version = 2
+        self.padding = 0
+        self.extension = 0
+        self.cc = 0
+        self.marker = 0
+        self.payload_type = payload_type
+        self.seq_num = seq_num
+        self.timestamp = timestamp
+        self.ssrc = ssrc
+        self.csrc = []
+        self.payload = payload
+        self.original_seq = None
+
+
+def legacy_decode(packet_bytes):
+    """Decoder as it was before the zero-copy packet view"""
+    if len(packet_bytes) < 12:
+        raise ValueError("Packet too small to be a valid RTP packet")
+    first_byte, second_byte, seq_num = struct.unpack('!BBH', packet_bytes[0:4])
+    timestamp, ssrc = struct.unpack('!II', packet_bytes[4:12])
+    version = (first_byte >> 6) & 0x03
+    padding = (first_byte >> 5) & 0x01
+    extension = (first_byte >> 4) & 0x01
+    cc = first_byte & 0x0F
+    marker = (second_byte >> 7) & 0x01
+    payload_type = second_byte & 0x7F
+    csrc_list = []
+    for i in range(cc):
+        if 12 + i*4 < len(packet_bytes):
+            csrc, = struct.unpack('!I', packet_bytes[12+i*4:16+i*4])
+            csrc_list.append(csrc)
+    payload = packet_bytes[12 + cc * 4:]
+    packet = LegacyPacket(payload_type, seq_num, timestamp, ssrc, payload)
+    packet.version = version
+    packet.padding = padding
+    packet.extension = extension
+    packet.cc = cc
+    packet.marker = marker
+    packet.csrc = csrc_list
+    return packet
+
+
+def run():
+    """Run the benchmark and return decodes per second keyed by case"""
+    results = {}
+    for size in PAYLOAD_SIZES:
+        data = RTPPacket(seq_num=1234, timestamp=5678, ssrc=0x1234,
+                         payload=bytes(size)).encode()
+        decode = RTPPacket.decode
+
+        def legacy_receive():
+            packet = legacy_decode(data)
+            return packet.seq_num, packet.payload
+
+        def receive():
+            packet = decode(data)
+            return packet.seq_num, packet.payload_view
+
+        results[f'legacy_decode_{size}'] = measure(lambda: legacy_decode(data))
+        results[f'decode_{size}'] = measure(lambda: decode(data))
+        results[f'legacy_decode_payload_{size}'] = measure(legacy_receive)
+        results[f'decode_payload_{size}'] = measure(receive)
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for size in PAYLOAD_SIZES:
+        for case in ('decode', 'decode_payload'):
+            before = results[f'legacy_{case}_{size}']
+            after = results[f'{case}_{size}']
+            rows.append([case, size, f'{before:,.0f}', f'{after:,.0f}', f'{after / before:.2f}x'])
+    print_table('RTPPacket.decode throughput (packets/s)',
+                ['case', 'payload', 'before', 'after', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
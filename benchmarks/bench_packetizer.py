@@ -0,0 +1,88 @@
+"""
+Benchmark of ptime and MTU against packet rate, bandwidth and sender CPU
+
+For each codec, ptime and MTU, streams one minute of audio through
+``RTPSender.tick`` with the socket send left out and reports the packets
+per second of one stream, the bandwidth on the wire (IP/UDP/RTP headers
+included), the share of it taken by headers, the packetization latency
+(one ptime of audio is buffered before a packet leaves) and the sender CPU
+per second of audio. An MTU of 576 makes the 16-bit PCM frames of long
+ptimes fragment.
+
+Usage:
+    python -m benchmarks.bench_packetizer
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+from rtp.core.sender import RTPSender
+from rtp.utils.codecs import PCM16, PCMU
+from rtp.utils.packetizer import IP_UDP_OVERHEAD
+from benchmarks._util import print_table
+
+SECONDS = 60
+CODECS = [PCMU, PCM16]
+PTIMES = [10, 20, 40, 60]
+MTUS = [1500, 576]
+
+
+def stream(path, codec, ptime, mtu):
+    """Stream the file once; return (packets, wire bytes, CPU seconds)"""
+    sender = RTPSender('127.0.0.1', 9, payload_type=codec.payload_type, ptime=ptime, mtu=mtu,
+                       history_size=64, stats_interval=None, rtcp_interval=None)
+    sender.socket.close()
+    wire = [0]
+
+    def send_batch(datagrams):
+        wire[0] += sum(len(data) + IP_UDP_OVERHEAD for data in datagrams)
+    sender._send_batch = send_batch
+    sender.set_audio_file(path)
+    start = time.process_time()
+    while sender.tick():
+        pass
+    return sender.stats['packets_sent'], wire[0], time.process_time() - start
+
+
+def run():
+    """Results keyed by (codec, ptime, mtu)"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'audio.wav')
+        with wave.open(path, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(bytes(2 * 8000 * SECONDS))
+        results = {}
+        for codec, ptime, mtu in itertools.product(CODECS, PTIMES, MTUS):
+            packets, wire, cpu = stream(path, codec, ptime, mtu)
+            payload = SECONDS * 8000 * codec.bytes_per_sample
+            results[(codec.name, ptime, mtu)] = {
+                'packets_per_second': packets / SECONDS,
+                'kbps': wire * 8 / SECONDS / 1000,
+                'header_share': 1 - payload / wire,
+                'latency_ms': ptime,
+                'cpu_us_per_second': cpu / SECONDS * 1e6,
+            }
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    results = run()
+    rows = [[codec, ptime, mtu, f"{r['packets_per_second']:.0f}", f"{r['kbps']:.1f}",
+             f"{r['header_share']:.1%}", r['latency_ms'], f"{r['cpu_us_per_second']:.0f}"]
+            for (codec, ptime, mtu), r in results.items()]
+    print_table(f'{SECONDS} s of 8 kHz audio per configuration',
+                ['codec', 'ptime', 'mtu', 'packets/s', 'kbit/s', 'headers', 'latency ms',
+                 'cpu us/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark of packet loss concealment against silence fill
+
+Plays two minutes of synthetic voiced speech (a gliding pitch with
+harmonics and syllable-rate amplitude modulation, 20 ms frames) through an
+``AudioSink`` with random and bursty loss and reports:
+
+- the SNR of the lost stretches against the original audio, concealed
+  versus filled with silence
+- the cost of ``PacketLossConcealer.conceal`` per lost 20 ms frame, and as
+  a share of the frame's duration
+- the extra cost per received packet of keeping the history
+- how many streams one core could conceal at 5% loss, from the
+  per-frame cost
+
+Usage:
+    python -m benchmarks.bench_plc
+"""
+
+import numpy as np
+
+from rtp.core.packet import RTPPacket
+from rtp.utils.plc import PacketLossConcealer
+from rtp.utils.sinks import AudioSink
+from benchmarks._util import measure, print_table
+
+SECONDS = 120
+FRAME = 160  # 20 ms at 8 kHz
+
+
+def voiced_audio(seconds=SECONDS, seed=0):
+    """16-bit PCM with a pitch gliding between 90 and 220 Hz"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(8000 * seconds)) / 8000
+    pitch = 155 + 65 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / 8000
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    noise = rng.standard_normal(len(t)) * 0.02
+    return np.rint((voice * envelope + noise) * 6000).astype('<i2')
+
+
+class _CaptureSink(AudioSink):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.out = bytearray()
+
+    def write_frames(self, data):
+        self.out += data
+
+
+def losses(frames, rate, burst, seed=1):
+    """Indexes of lost frames: Gilbert model with mean burst length burst"""
+    rng = np.random.default_rng(seed)
+    leave = 1.0 / burst
+    enter = rate * leave / (1 - rate)
+    lost, bad = [], False
+    for index in range(1, frames):  # The first frame always arrives
+        bad = rng.random() < (1 - leave if bad else enter)
+        if bad:
+            lost.append(index)
+    return lost
+
+
+def play(audio, lost, plc):
+    """Feed the frames that were not lost; return the output PCM"""
+    sink = _CaptureSink(plc=plc)
+    lost = set(lost)
+    pcm = audio.tobytes()
+    for index in range(len(audio) // FRAME):
+        if index not in lost:
+            sink.write(RTPPacket(payload_type=96, seq_num=index & 0xFFFF,
+                                 timestamp=index * FRAME, ssrc=1,
+                                 payload=pcm[2 * index * FRAME:2 * (index + 1) * FRAME]))
+    return np.frombuffer(bytes(sink.out), dtype='<i2')
+
+
+def snr(reference, output, lost):
+    """SNR in dB over the lost frames"""
+    index = (np.asarray(lost)[:, None] * FRAME + np.arange(FRAME)).reshape(-1)
+    index = index[index < len(output)]
+    ref = reference[index].astype(np.float64)
+    err = ref - output[index]
+    return 10 * np.log10(np.dot(ref, ref) / max(np.dot(err, err), 1e-9))
+
+
+def run():
+    """Compare concealment with silence and time the concealer"""
+    audio = voiced_audio()
+    frames = len(audio) // FRAME
+    results = {}
+    for rate, burst in ((0.02, 1.0), (0.05, 1.0), (0.10, 2.0)):
+        lost = losses(frames, rate, burst)
+        key = f"{rate:.0%} loss, burst {burst:g}"
+        results[key] = {
+            'lost': len(lost),
+            'silence_db': snr(audio, play(audio, lost, plc=False), lost),
+            'plc_db': snr(audio, play(audio, lost, plc=True), lost),
+        }
+
+    pcm = audio.tobytes()
+    plc = PacketLossConcealer()
+    plc.update(pcm[:3200])
+
+    def conceal_frame():
+        plc.conceal(FRAME)
+        plc.update(pcm[3200:3200 + 2 * FRAME])  # Resume, which crossfades
+    results['conceal_us'] = 1e6 / measure(conceal_frame)
+    frame = pcm[:2 * FRAME]
+    results['update_us'] = 1e6 / measure(lambda: plc.update(frame))
+    return results
+
+
+def main():
+    results = run()
+    rows = [[name, r['lost'], f"{r['silence_db']:.1f}", f"{r['plc_db']:.1f}"]
+            for name, r in results.items() if isinstance(r, dict)]
+    print_table(f'{SECONDS} s of voiced audio, SNR of the lost frames (dB)',
+                ['loss', 'lost frames', 'silence', 'concealed'], rows)
+    conceal = results['conceal_us']
+    print_table('Concealer cost', ['case', 'us', 'of 20 ms'],
+                [['conceal one lost frame + resume', f"{conceal:.1f}",
+                  f"{conceal / 20000:.2%}"],
+                 ['history update per received frame', f"{results['update_us']:.2f}",
+                  f"{results['update_us'] / 20000:.3%}"]])
+    # Per stream and second: 50 updates plus 50 * 5% concealments
+    per_stream = 50 * results['update_us'] + 2.5 * conceal
+    print(f"Streams per core at 5% loss, concealment alone: {1e6 / per_stream:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
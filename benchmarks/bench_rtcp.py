@@ -0,0 +1,56 @@
+"""
+Benchmark of RTCP cost per stream
+
+Measures the per-packet reception accounting (sequence extension, loss
+counters and incremental jitter), building and parsing one compound RR,
+and the total CPU share RTCP takes for 1000 streams at 50 packets/s with
+a 5 s reporting interval.
+
+Usage:
+    python -m benchmarks.bench_rtcp
+"""
+
+from rtp.core import rtcp
+from benchmarks._util import measure, print_table
+
+STREAMS = 1000
+PACKET_RATE = 50  # 20 ms packets
+INTERVAL = 5.0
+
+
+def run():
+    """Return operations per second keyed by case, plus the CPU share"""
+    stats = rtcp.ReceptionStats(0x1234)
+    state = {'seq': 0}
+
+    def update():
+        seq = state['seq'] = (state['seq'] + 1) & 0xFFFF
+        stats.update(seq, seq * 160, seq * 0.02)
+
+    def build():
+        report = rtcp.ReceiverReport(0x5678, [stats.report_block(1.0)])
+        return rtcp.encode_compound(report, "receiver@host")
+
+    data = build()
+    results = {
+        'update': measure(update),
+        'build_rr': measure(build),
+        'parse_rr': measure(lambda: rtcp.parse(data)),
+    }
+    # Seconds of CPU per second of wall time for STREAMS streams
+    results['cpu_share'] = STREAMS * (PACKET_RATE / results['update']
+                                      + (1.0 / results['build_rr'] + 1.0 / results['parse_rr']) / INTERVAL)
+    return results
+
+
+def main():
+    results = run()
+    rows = [[case, f'{results[case]:,.0f}', f'{1e6 / results[case]:.2f}']
+            for case in ('update', 'build_rr', 'parse_rr')]
+    print_table('RTCP operations', ['case', 'ops/s', 'us/op'], rows)
+    print(f"\n{STREAMS} streams at {PACKET_RATE} packets/s, reports every {INTERVAL:.0f} s: "
+          f"{results['cpu_share']:.1%} of one core")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark of send pacing: sleep-after-work threads vs absolute deadlines
+
+Every sender sends 20 ms packets to the loopback discard port for a few
+seconds, paced by:
+
+- ``sleep``: one thread per sender, ``time.sleep(interval)`` after each send
+  (the original ``_sender_loop``)
+- ``deadline``: one thread per sender, sleeping until absolute deadlines
+  (the current ``_sender_loop``)
+- ``scheduler``: every sender on one ``PacingScheduler`` thread
+
+Reports send-time lateness percentiles against the ideal cadence
+``start + n * interval``, the drift at the end of the run and the share of
+the expected packets actually sent. Console output is discarded.
+
+Usage:
+    python -m benchmarks.bench_scheduler
+"""
+
+import contextlib
+import os
+import threading
+import time
+
+from rtp.core.sender import RTPSender
+from rtp.utils.scheduler import PacingScheduler
+from benchmarks._util import print_table
+
+INTERVAL = 0.02
+DURATION = 3.0
+CASES = [('sleep', 10), ('deadline', 10), ('scheduler', 10),
+         ('sleep', 100), ('deadline', 100), ('scheduler', 100), ('scheduler', 1000)]
+
+
+def _legacy_loop(sender, interval, duration):
+    """_sender_loop before absolute deadlines"""
+    start_time = time.time()
+    while sender.running:
+        sender.tick()
+        if duration and (time.time() - start_time) >= duration:
+            break
+        time.sleep(interval)
+
+
+def _recording_senders(count, start, times):
+    senders = []
+    for i in range(count):
+        sender = RTPSender('127.0.0.1', 9, ssrc=i + 1)
+        record = times[i] = []
+        send = sender.send_packet
+
+        def send_packet(payload, send=send, record=record):
+            record.append(time.monotonic())
+            return send(payload)
+
+        sender.send_packet = send_packet
+        senders.append(sender)
+    return senders
+
+
+def run_case(mode, count, duration=DURATION):
+    """Return (lateness samples in s, last-second drift in s, packets sent)"""
+    times = {}
+    start = time.monotonic() + 0.2
+    senders = _recording_senders(count, start, times)
+    if mode == 'scheduler':
+        scheduler = PacingScheduler()
+        for sender in senders:
+            scheduler.add_sender(sender, INTERVAL, start=start, duration=duration)
+        scheduler.run()
+    else:
+        target = _legacy_loop if mode == 'sleep' else RTPSender._sender_loop
+        threads = []
+        for sender in senders:
+            sender.running = True
+            threads.append(threading.Thread(target=target, args=(sender, INTERVAL, duration)))
+        time.sleep(max(0.0, start - time.monotonic()))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    for sender in senders:
+        sender.socket.close()
+
+    lateness = []
+    drift = []
+    for record in times.values():
+        late = [t - (start + k * INTERVAL) for k, t in enumerate(record)]
+        lateness.extend(late)
+        drift.extend(late[-int(1.0 / INTERVAL):])
+    sent = sum(len(record) for record in times.values())
+    return lateness, sum(drift) / max(len(drift), 1), sent
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))]
+
+
+def run(cases=CASES, duration=DURATION):
+    """Run every pacing mode and sender count"""
+    results = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for mode, count in cases:
+            lateness, drift, sent = run_case(mode, count, duration)
+            results[f'{mode}_{count}'] = {
+                'p50_ms': percentile(lateness, 50) * 1000,
+                'p99_ms': percentile(lateness, 99) * 1000,
+                'p999_ms': percentile(lateness, 99.9) * 1000,
+                'drift_ms': drift * 1000,
+                'sent_ratio': sent / (count * round(duration / INTERVAL)),
+            }
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for mode, count in CASES:
+        r = results[f'{mode}_{count}']
+        rows.append([mode, count, f"{r['p50_ms']:.2f}", f"{r['p99_ms']:.2f}",
+                     f"{r['p999_ms']:.2f}", f"{r['drift_ms']:.1f}", f"{r['sent_ratio']:.1%}"])
+    print_table(f'Send-time lateness over {DURATION:.0f} s of {INTERVAL * 1000:.0f} ms packets',
+                ['pacing', 'senders', 'p50 ms', 'p99 ms', 'p99.9 ms', 'drift ms', 'sent'], rows)
+
+
+if __name__ == '__main__':
+    main()
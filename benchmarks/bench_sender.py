@@ -0,0 +1,100 @@
+"""
+Benchmark of sender-side packet building, in packets per second per core
+
+Compares the previous per-packet ``RTPPacket(...).encode()`` path with the
+preallocated ``RTPHeaderTemplate``, both for building alone and for building
+plus ``sendto`` on a loopback socket.
+
+Usage:
+    python -m benchmarks.bench_sender
+"""
+
+import contextlib
+import io
+import socket
+import struct
+
+from rtp.core.packet import RTPPacket, RTPHeaderTemplate
+from rtp.core.sender import RTPSender
+from benchmarks._util import measure, print_table
+
+PAYLOAD_SIZE = 320  # 20 ms of 16-bit PCM @ 8kHz
+
+
+def legacy_encode(seq_num, timestamp, ssrc, payload):
+    """Packet building as it was before header templates"""
+    packet = RTPPacket(RTPPacket.PT_AUDIO, seq_num, timestamp, ssrc, payload)
+    first_byte = (packet.version << 6) | (packet.padding << 5) | (packet.extension << 4) | packet.cc
+    second_byte = (packet.marker << 7) | packet.payload_type
+    header = struct.pack('!BBH', first_byte, second_byte, packet.seq_num)
+    header += struct.pack('!II', packet.timestamp, packet.ssrc)
+    return header + packet.payload
+
+
+def run():
+    """Run the benchmark and return packets per second keyed by case"""
+    payload = bytes(PAYLOAD_SIZE)
+    template = RTPHeaderTemplate(RTPPacket.PT_AUDIO, 0x1234)
+    state = {'seq': 0}
+
+    def next_seq():
+        state['seq'] = (state['seq'] + 1) & 0xFFFF
+        return state['seq']
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    sink.setblocking(False)
+    dest = sink.getsockname()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def drain():
+        try:
+            while True:
+                sink.recv(2048)
+        except BlockingIOError:
+            pass
+
+    def legacy_send():
+        seq = next_seq()
+        sock.sendto(legacy_encode(seq, seq * 160, 0x1234, payload), dest)
+        if seq & 0xFF == 0:
+            drain()
+
+    def template_send():
+        seq = next_seq()
+        sock.sendto(template.pack(seq, seq * 160, payload), dest)
+        if seq & 0xFF == 0:
+            drain()
+
+    sender = RTPSender(dest[0], dest[1])
+    sender.socket = sock
+
+    def sender_send():
+        sender.send_packet(payload)
+        if sender.seq_num & 0xFF == 0:
+            drain()
+
+    results = {
+        'build_legacy': measure(lambda: legacy_encode(next_seq(), 0, 0x1234, payload)),
+        'build_encode': measure(lambda: RTPPacket(RTPPacket.PT_AUDIO, next_seq(), 0, 0x1234, payload).encode()),
+        'build_template': measure(lambda: template.pack(next_seq(), 0, payload)),
+        'send_legacy': measure(legacy_send),
+        'send_template': measure(template_send),
+    }
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        results['send_packet'] = measure(lambda: (sender_send(), out.seek(0), out.truncate()))
+    sock.close()
+    sink.close()
+    return results
+
+
+def main():
+    results = run()
+    baseline = results['build_legacy']
+    rows = [[case, f'{rate:,.0f}', f'{rate / baseline:.2f}x'] for case, rate in results.items()]
+    print_table(f'Sender packet rate, {PAYLOAD_SIZE}-byte payload (packets/s per core)',
+                ['case', 'rate', 'vs build_legacy'], rows)
+
+
+if __name__ == '__main__':
+    main()
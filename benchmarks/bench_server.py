@@ -0,0 +1,85 @@
+"""
+Benchmark of RTPServer SSRC demultiplexing from 10 to 10,000 streams
+
+A fixed number of pre-encoded datagrams, interleaved round-robin across the
+streams with 1% random loss, is fed to ``RTPServer.handle_datagram``
+without going through the socket. Reports packets per second, memory per
+stream (tracemalloc, measured in a separate pass) and the time to expire
+every stream.
+
+Usage:
+    python -m benchmarks.bench_server
+"""
+
+import random
+import time
+import tracemalloc
+
+from rtp.core.packet import RTPPacket
+from rtp.core.server import RTPServer
+from benchmarks._util import print_table
+
+STREAM_COUNTS = [10, 100, 1000, 10000]
+TOTAL_PACKETS = 200000
+LOSS_RATE = 0.01
+
+
+def make_datagrams(streams, total=TOTAL_PACKETS, seed=1):
+    """Interleaved datagrams of every stream, with random loss"""
+    rng = random.Random(seed)
+    per_stream = max(total // streams, 2)
+    payload = bytes(160)
+    datagrams = []
+    for seq in range(per_stream):
+        for ssrc in range(1, streams + 1):
+            if seq and rng.random() < LOSS_RATE:
+                continue
+            datagrams.append(RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=ssrc,
+                                       payload=payload).encode())
+    return datagrams
+
+
+def feed(server, datagrams):
+    addr = ('127.0.0.1', 9)  # Discard port, NACKs go nowhere
+    handle = server.handle_datagram
+    for data in datagrams:
+        handle(data, addr, 0.0)
+
+
+def run_case(streams):
+    datagrams = make_datagrams(streams)
+
+    server = RTPServer('127.0.0.1', 0)
+    start = time.perf_counter()
+    feed(server, datagrams)
+    rate = len(datagrams) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    server.expire_idle(now=server.idle_timeout + 1.0)
+    expire = time.perf_counter() - start
+    server.stop()
+
+    # Memory of the stream state alone, datagrams are allocated beforehand
+    server = RTPServer('127.0.0.1', 0)
+    tracemalloc.start()
+    feed(server, datagrams[:streams])
+    memory = tracemalloc.get_traced_memory()[0] / streams
+    tracemalloc.stop()
+    server.stop()
+    return rate, memory, expire
+
+
+def run(stream_counts=STREAM_COUNTS):
+    """Return (packets/s, bytes per stream, expiry seconds) per stream count"""
+    return {streams: run_case(streams) for streams in stream_counts}
+
+
+def main():
+    results = run()
+    rows = [[streams, f'{rate:,.0f}', f'{memory / 1024:.1f}', f'{expire * 1000:.1f}']
+            for streams, (rate, memory, expire) in results.items()]
+    print_table(f'RTPServer demux, {TOTAL_PACKETS:,} packets, {LOSS_RATE:.0%} loss',
+                ['streams', 'packets/s', 'KiB/stream', 'expire all ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
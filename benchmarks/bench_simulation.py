@@ -0,0 +1,76 @@
+"""
+Parameter sweep on the virtual-clock call simulation
+
+First times a one-hour call through ``CallSimulation`` to show how much
+faster than real time it runs, then sweeps the FEC group size, the
+sender's retransmission history and the receiver's NACK timeout over
+several seeds under Gilbert-Elliott loss. Each configuration reports the
+mean residual loss (media never accepted in time) and the overhead of FEC
+and retransmissions per media packet, played out through the jitter buffer
+so late recoveries count as lost.
+
+Usage:
+    python -m benchmarks.bench_simulation
+"""
+
+import itertools
+import time
+
+from rtp.core.simulation import CallSimulation
+from benchmarks._util import print_table
+
+CALL = 3600.0
+DURATION = 60.0
+SEEDS = range(3)
+NETWORK = dict(drop_rate=0.05, burst_length=2.0, max_delay=0.05, reorder_rate=0.0,
+               duplicate_rate=0.0, latency=0.04)
+FEC_GROUP_SIZES = [None, 4, 8]
+HISTORY_SIZES = [4, 1000]
+NACK_TIMEOUTS = [0.05, 0.2]
+
+
+def time_call(duration=CALL):
+    """Return (wall seconds, results) of one call of duration seconds"""
+    start = time.perf_counter()
+    results = CallSimulation(duration=duration, seed=0, **NETWORK).run()
+    return time.perf_counter() - start, results
+
+
+def sweep(duration=DURATION, seeds=SEEDS):
+    """Mean results per (fec_group_size, history_size, nack_timeout)"""
+    results = {}
+    for params in itertools.product(FEC_GROUP_SIZES, HISTORY_SIZES, NACK_TIMEOUTS):
+        fec_group_size, history_size, nack_timeout = params
+        runs = [CallSimulation(duration=duration, fec_group_size=fec_group_size,
+                               history_size=history_size, nack_timeout=nack_timeout,
+                               use_jitter_buffer=True, seed=seed, **NETWORK).run()
+                for seed in seeds]
+        results[params] = {key: sum(run[key] for run in runs) / len(runs)
+                           for key in ('residual_loss', 'network_loss', 'overhead')}
+    return results
+
+
+def run():
+    """Time a long call and run the sweep"""
+    wall, call = time_call()
+    return {'call_wall_time': wall, 'call': call, 'sweep': sweep()}
+
+
+def main():
+    results = run()
+    wall = results['call_wall_time']
+    print(f"{CALL / 60:.0f} min call ({results['call']['packets_sent']:,} packets, "
+          f"{results['call']['events']:,} events) in {wall:.1f} s: "
+          f"{CALL / wall:,.0f}x real time\n")
+
+    rows = [['none' if fec is None else fec, history, f'{timeout * 1000:.0f}',
+             f"{r['network_loss']:.2%}", f"{r['residual_loss']:.2%}", f"{r['overhead']:.1%}"]
+            for (fec, history, timeout), r in results['sweep'].items()]
+    print_table(f'{DURATION:.0f} s calls, {NETWORK["drop_rate"]:.0%} loss in bursts of '
+                f'{NETWORK["burst_length"]:.0f}, mean of {len(SEEDS)} seeds',
+                ['fec group', 'history', 'nack timeout ms', 'network loss', 'residual', 'overhead'],
+                rows)
+
+
+if __name__ == '__main__':
+    main()
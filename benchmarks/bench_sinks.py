@@ -0,0 +1,156 @@
+"""
+Benchmark of the receiver audio sinks
+
+Every sink gets the same stream of 20 ms frames (320 bytes). Two tables:
+
+- Receive path: ``RTPReceiver._process_packet`` over in-order packets with
+  each sink attached, in packets per second. The null sink is the protocol
+  overhead alone.
+- Disk stalls: a file whose writes block for ``STALL`` seconds every
+  ``STALL_EVERY`` writes. Reports the time ``write`` takes on the receive
+  thread: with the synchronous writers every stall lands there, with the
+  threaded sink only the background writer waits.
+
+The "legacy" writer is ``wave.writeframes`` per packet, as the receiver
+did before sinks.
+
+Usage:
+    python -m benchmarks.bench_sinks
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+from rtp.core.packet import RTPPacket
+from rtp.core.receiver import RTPReceiver
+from rtp.utils.sinks import AudioSink, MmapWaveSink, NullSink, ThreadedSink, WaveFileSink
+from benchmarks._util import print_table
+
+PACKETS = 20000
+STALL_PACKETS = 2000
+STALL = 0.02
+STALL_EVERY = 100
+ADDR = ('127.0.0.1', 9)
+
+
+class LegacyWaveSink(AudioSink):
+    """wave.writeframes per packet, patching the header every time"""
+    def __init__(self, path):
+        super().__init__()
+        self._wave = wave.open(path, 'wb')
+        self._wave.setnchannels(1)
+        self._wave.setsampwidth(2)
+        self._wave.setframerate(8000)
+
+    def write(self, packet):
+        self._wave.writeframes(packet.payload)
+
+    def close(self):
+        self._wave.close()
+
+
+class _StallingFile:
+    """File wrapper whose writes block now and then, like a busy disk"""
+    def __init__(self, f):
+        self._f = f
+        self._writes = 0
+
+    def write(self, data):
+        self._writes += 1
+        if self._writes % STALL_EVERY == 0:
+            time.sleep(STALL)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def _stalling(sink):
+    """Make the wave module writer of a sink stall"""
+    writer = sink._wave
+    writer._file = _StallingFile(writer._file)
+    return sink
+
+
+SINKS = [
+    ('null', lambda path: NullSink()),
+    ('legacy wave', LegacyWaveSink),
+    ('wave', WaveFileSink),
+    ('threaded wave', lambda path: ThreadedSink(WaveFileSink(path))),
+    ('mmap', lambda path: MmapWaveSink(path)),
+]
+
+STALLING_SINKS = [
+    ('legacy wave', lambda path: _stalling(LegacyWaveSink(path))),
+    ('wave', lambda path: _stalling(WaveFileSink(path))),
+    ('threaded wave', lambda path: ThreadedSink(_stalling(WaveFileSink(path)))),
+]
+
+
+def _packets(count):
+    return [RTPPacket(seq_num=seq & 0xFFFF, timestamp=seq * 160, ssrc=1,
+                      payload=bytes([seq & 0xFF]) * 320).encode() for seq in range(count)]
+
+
+def receive_rate(factory, path, count=PACKETS):
+    """Packets per second through the receiver with the sink attached"""
+    datagrams = _packets(count)
+    receiver = RTPReceiver('127.0.0.1', 0, stats_interval=None, rtcp_interval=None)
+    receiver.socket.close()
+    receiver._sendto = lambda data, addr: None
+    receiver.sink = factory(path)
+    start = time.perf_counter()
+    for data in datagrams:
+        receiver._process_packet(RTPPacket.decode(data), ADDR)
+    receiver.sink.close()
+    return count / (time.perf_counter() - start)
+
+
+def write_latency(factory, path, count=STALL_PACKETS):
+    """Mean, p99 and max seconds of sink.write on the calling thread"""
+    packets = [RTPPacket.decode(data) for data in _packets(count)]
+    sink = factory(path)
+    times = []
+    for packet in packets:
+        start = time.perf_counter()
+        sink.write(packet)
+        times.append(time.perf_counter() - start)
+    sink.close()
+    times.sort()
+    return sum(times) / count, times[int(0.99 * count)], times[-1]
+
+
+def run():
+    """Run every sink through both cases"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'out.wav')
+        results = {}
+        for name, factory in SINKS:
+            results[f'rate/{name}'] = receive_rate(factory, path)
+        for name, factory in STALLING_SINKS:
+            results[f'stall/{name}'] = write_latency(factory, path)
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    results = run()
+    print_table(f'Receive path, {PACKETS} packets of 20 ms',
+                ['sink', 'packets/s'],
+                [[name, f"{results[f'rate/{name}']:,.0f}"] for name, _ in SINKS])
+    print()
+    rows = []
+    for name, _ in STALLING_SINKS:
+        mean, p99, worst = results[f'stall/{name}']
+        rows.append([name, f'{mean * 1e6:,.1f}', f'{p99 * 1e6:,.1f}', f'{worst * 1e3:.1f}'])
+    print_table(f'write() on the receive thread, {STALL * 1000:.0f} ms stall every '
+                f'{STALL_EVERY} file writes', ['sink', 'mean us', 'p99 us', 'max ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark of the receive path: recvfrom per datagram vs recv_batch into a pool
+
+Bursts of RTP packets are sent over loopback, then drained and decoded
+either with one ``recvfrom(2048)`` per datagram (the old receiver loop) or
+with ``recv_batch`` into a preallocated ``BufferPool``. Reports packets per
+second and, measured separately, the memory blocks and peak bytes allocated
+per packet while a batch is received and decoded.
+
+Usage:
+    python -m benchmarks.bench_socket_io
+"""
+
+import socket
+import sys
+import time
+import tracemalloc
+
+from rtp.core.packet import RTPPacket
+from rtp.utils.socket_io import BufferPool, recv_batch, send_batch
+from benchmarks._util import print_table
+
+BURSTS = 2000
+BURST_SIZES = [1, 8, 32]
+PAYLOAD_SIZE = 160
+
+
+def recv_legacy(sock, count, pool):
+    """One recvfrom per datagram, as the receiver loop did before"""
+    sock.settimeout(1.0)
+    packets = []
+    for _ in range(count):
+        data, addr = sock.recvfrom(2048)
+        packets.append(RTPPacket.decode(data))
+    return packets
+
+
+def recv_pooled(sock, count, pool):
+    """Drain the socket into the buffer pool"""
+    sock.settimeout(None)
+    packets = []
+    while len(packets) < count:
+        for data, addr in recv_batch(sock, pool, 1.0):
+            packets.append(RTPPacket.decode(data))
+    return packets
+
+
+def _pair():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    receiver.bind(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    return sender, receiver
+
+
+def run_case(receive, burst_size, bursts=BURSTS):
+    """Return (packets/s, blocks/packet, peak bytes/packet) for one receive path"""
+    sender, receiver = _pair()
+    pool = BufferPool(64)
+    addr = receiver.getsockname()
+    datagrams = [RTPPacket(seq_num=i, timestamp=i * 160, ssrc=1,
+                           payload=bytes(PAYLOAD_SIZE)).encode() for i in range(burst_size)]
+    try:
+        elapsed = 0.0
+        for _ in range(bursts):
+            send_batch(sender, datagrams, addr)
+            start = time.perf_counter()
+            receive(receiver, burst_size, pool)
+            elapsed += time.perf_counter() - start
+        rate = bursts * burst_size / elapsed
+
+        # Allocations still alive while the decoded batch is held
+        blocks = 0
+        for _ in range(100):
+            send_batch(sender, datagrams, addr)
+            before = sys.getallocatedblocks()
+            packets = receive(receiver, burst_size, pool)
+            blocks += sys.getallocatedblocks() - before
+            del packets
+
+        tracemalloc.start()
+        peak = 0
+        for _ in range(100):
+            send_batch(sender, datagrams, addr)
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            packets = receive(receiver, burst_size, pool)
+            peak += tracemalloc.get_traced_memory()[1] - current
+            del packets
+        tracemalloc.stop()
+    finally:
+        sender.close()
+        receiver.close()
+    packets = 100 * burst_size
+    return rate, blocks / packets, peak / packets
+
+
+def run(burst_sizes=BURST_SIZES, bursts=BURSTS):
+    """Run both receive paths for every burst size"""
+    results = {}
+    for burst_size in burst_sizes:
+        results[f'recvfrom_{burst_size}'] = run_case(recv_legacy, burst_size, bursts)
+        results[f'recv_batch_{burst_size}'] = run_case(recv_pooled, burst_size, bursts)
+    return results
+
+
+def main():
+    results = run()
+    rows = []
+    for burst_size in BURST_SIZES:
+        for name in ('recvfrom', 'recv_batch'):
+            rate, blocks, peak = results[f'{name}_{burst_size}']
+            rows.append([burst_size, name, f'{rate:,.0f}', f'{blocks:.1f}', f'{peak:,.0f}'])
+    print_table('Loopback receive + decode',
+                ['burst', 'path', 'packets/s', 'blocks/pkt', 'peak bytes/pkt'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark of silence suppression (VAD/DTX) on conversational audio
+
+Builds five minutes of call-like audio: talkspurts of speech-like noise
+separated by background noise at -65 dBov, with about 40% silence. Streams
+it with PCMU through ``RTPSender.tick`` with and without a
+``VoiceActivityDetector`` and reports:
+
+- packets and bytes sent, comfort noise packets included
+- sender CPU per second of audio, the VAD included
+- the VAD cost per frame: ``is_active`` frame by frame against
+  ``frame_levels`` over the whole file in one call
+- on the receiver, packets counted lost (must be 0) and the output length
+
+Usage:
+    python -m benchmarks.bench_vad
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from rtp.core.packet import RTPPacket
+from rtp.core.receiver import RTPReceiver
+from rtp.core.sender import RTPSender
+from rtp.utils.sinks import NullSink
+from rtp.utils.vad import VoiceActivityDetector, frame_levels
+from benchmarks._util import measure, print_table
+
+SECONDS = 300
+TALK = 1.2     # Mean talkspurt in seconds
+PAUSE = 0.8    # Mean pause in seconds
+
+
+def call_audio(seconds=SECONDS, seed=0):
+    """16-bit PCM alternating talkspurts and background noise"""
+    rng = np.random.default_rng(seed)
+    samples = int(8000 * seconds)
+    audio = rng.standard_normal(samples) * 32768 * 10 ** (-65 / 20)  # Background
+    position = 0
+    while position < samples:
+        position += int(8000 * rng.exponential(PAUSE))
+        length = int(8000 * rng.exponential(TALK))
+        # Syllable-rate amplitude modulation of louder noise
+        t = np.arange(min(length, max(0, samples - position)))
+        audio[position:position + len(t)] += (rng.standard_normal(len(t)) * 3000
+                                              * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t / 8000)))
+        position += length
+    return np.clip(np.rint(audio), -32768, 32767).astype('<i2')
+
+
+def stream(path, vad):
+    """Send the file; return (datagrams, sender stats, CPU seconds)"""
+    sender = RTPSender('127.0.0.1', 9, payload_type=0, vad=vad, history_size=64,
+                       stats_interval=None, rtcp_interval=None)
+    sender.socket.close()
+    sent = []
+    sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+    sender.set_audio_file(path)
+    start = time.process_time()
+    while sender.tick():
+        pass
+    return sent, sender.stats, time.process_time() - start
+
+
+def receive(datagrams):
+    """Play the datagrams into a null sink; return (lost packets, output seconds)"""
+    receiver = RTPReceiver('127.0.0.1', 0, stats_interval=None, rtcp_interval=None)
+    receiver.socket.close()
+    receiver._sendto = lambda data, addr: None
+    receiver.sink = NullSink()
+    for data in datagrams:
+        receiver._process_packet(RTPPacket.decode(data), ('127.0.0.1', 9))
+    return receiver.stats['lost_packets'], receiver.sink.bytes / 2 / 8000
+
+
+def run():
+    """Stream with and without VAD and time the detector"""
+    audio = call_audio()
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'call.wav')
+        with wave.open(path, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(audio.tobytes())
+        results = {}
+        for name, vad in (('continuous', None), ('vad/dtx', VoiceActivityDetector())):
+            sent, stats, cpu = stream(path, vad)
+            lost, output = receive(sent)
+            results[name] = {
+                'packets': len(sent),
+                'bytes': sum(len(data) for data in sent),
+                'comfort_noise': stats['comfort_noise_sent'],
+                'cpu_us_per_second': cpu / SECONDS * 1e6,
+                'lost': lost,
+                'output_seconds': output,
+            }
+    finally:
+        shutil.rmtree(directory)
+
+    pcm = audio.tobytes()
+    frames = [pcm[i:i + 320] for i in range(0, len(pcm), 320)]
+    vad = VoiceActivityDetector()
+    iterator = iter(frames * 2)
+    results['is_active_us'] = 1e6 / measure(lambda: vad.is_active(next(iterator)),
+                                            number=len(frames), repeat=1)
+    results['frame_levels_us'] = 1e6 / measure(lambda: frame_levels(pcm), number=1) / len(frames)
+    return results
+
+
+def main():
+    results = run()
+    base = results['continuous']['packets']
+    rows = [[name, f"{r['packets']:,}", f"{r['packets'] / base:.0%}", f"{r['bytes'] / 1e6:.2f}",
+             r['comfort_noise'], f"{r['cpu_us_per_second']:.0f}", r['lost'],
+             f"{r['output_seconds']:.1f}"]
+            for name, r in results.items() if isinstance(r, dict)]
+    print_table(f'{SECONDS} s of call audio, PCMU 20 ms',
+                ['sender', 'packets', 'vs continuous', 'MB', 'CN packets', 'cpu us/s',
+                 'lost', 'output s'], rows)
+    print_table('VAD cost per 20 ms frame', ['case', 'us'],
+                [['is_active, per frame', f"{results['is_active_us']:.2f}"],
+                 ['frame_levels, whole file', f"{results['frame_levels_us']:.3f}"]])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Scaling benchmark of SO_REUSEPORT receiver workers on loopback
+
+A load process blasts RTP packets from several source sockets (so the
+kernel can spread the flows) for a few seconds, while 1..N
+``ReceiverWorkers`` processes receive them. Reports the aggregated receive
+rate per worker count. Gains are bounded by the number of cores: on a
+single core the rate stays flat.
+
+Usage:
+    python -m benchmarks.bench_workers
+"""
+
+import multiprocessing
+import os
+import socket
+import time
+
+from rtp.core.packet import RTPPacket
+from rtp.core.workers import ReceiverWorkers
+from benchmarks._util import print_table
+
+DURATION = 2.0
+FLOWS = 16
+WORKER_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def _load(port, duration, sent):
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(FLOWS)]
+    datagrams = [RTPPacket(seq_num=0, ssrc=flow + 1, payload=bytes(160)).encode()
+                 for flow in range(FLOWS)]
+    addr = ('127.0.0.1', port)
+    count = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        for sock, data in zip(sockets, datagrams):
+            try:
+                sock.sendto(data, addr)
+            except OSError:
+                pass
+        count += FLOWS
+    sent.value = count
+
+
+def _free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def run_case(workers, duration=DURATION):
+    """Return (packets sent, packets received) for one worker count"""
+    port = _free_port()
+    pool = ReceiverWorkers('127.0.0.1', port, workers, output_pattern=None, quiet=True)
+    pool.start()
+    time.sleep(0.5)
+    sent = multiprocessing.Value('q', 0)
+    load = multiprocessing.Process(target=_load, args=(port, duration, sent))
+    load.start()
+    load.join()
+    time.sleep(0.5)
+    stats = pool.stop()
+    return sent.value, stats['packets_received']
+
+
+def run(worker_counts=WORKER_COUNTS, duration=DURATION):
+    """Run every worker count"""
+    return {workers: run_case(workers, duration) for workers in worker_counts}
+
+
+def main():
+    results = run()
+    base = results[WORKER_COUNTS[0]][1] or 1
+    rows = [[workers, f'{sent / DURATION:,.0f}', f'{received / DURATION:,.0f}',
+             f'{received / base:.2f}x']
+            for workers, (sent, received) in results.items()]
+    print_table(f'Receive rate with SO_REUSEPORT workers ({os.cpu_count()} cores)',
+                ['workers', 'sent/s', 'received/s', 'scaling'], rows)
+
+
+if __name__ == '__main__':
+    main()
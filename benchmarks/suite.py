@@ -0,0 +1,362 @@
+"""
+Performance suite: microbenchmarks plus a loopback end-to-end run
+
+Microbenchmarks (operations per second, higher is better):
+
+- ``packet_encode`` / ``packet_decode``: ``RTPPacket`` with a 160-byte payload
+- ``nack_create`` / ``nack_parse``: 20 scattered losses in one NACK
+- ``fec_encode``: ``FECHandler.add_packet`` per media packet (groups of 4)
+- ``fec_recover``: ``FECHandler.recover_packets`` of one lost packet
+- ``rtx_lookup``: ``RetransmissionHandler.handle_nack`` for 10 packets
+- ``receiver_in_order`` / ``receiver_reorder`` / ``receiver_loss``:
+  ``RTPReceiver._process_packet`` on in-order input, 10% adjacent swaps and
+  5% random loss
+
+End-to-end, RTPSender -> SimulatedNetwork (no impairments) -> RTPReceiver on
+loopback:
+
+- ``e2e_throughput``: packets/s delivered from a burst
+- ``e2e_latency_p50`` / ``e2e_latency_p99``: one-way latency in ms of paced
+  packets (lower is better)
+
+Results are written as JSON. With ``--baseline`` the run is compared to an
+earlier result file and the exit status is 1 if any case regressed by more
+than ``--threshold``.
+
+Usage:
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.suite --baseline before.json --threshold 0.15
+    python -m benchmarks.suite --only receiver --quick
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+from rtp.core.packet import RTPPacket
+from rtp.core.receiver import RTPReceiver
+from rtp.core.sender import RTPSender
+from rtp.utils.fec import FECHandler
+from rtp.utils.network_simulator import SimulatedNetwork
+from rtp.utils.retransmission import RetransmissionHandler
+from benchmarks._util import measure, print_table
+
+PAYLOAD = bytes(160)
+ADDR = ('127.0.0.1', 9)
+_SEND_TIME = struct.Struct('!d')
+
+
+class Case:
+    """One suite entry"""
+    def __init__(self, name, func, unit='ops/s', higher_is_better=True):
+        self.name = name
+        self.func = func
+        self.unit = unit
+        self.higher_is_better = higher_is_better
+
+
+def _ops(factory):
+    """Case function timing the callable built by factory with measure()"""
+    def run(quick):
+        func = factory()
+        if quick:
+            return measure(func, repeat=3, min_time=0.05)
+        return measure(func)
+    return run
+
+
+# Microbenchmarks
+
+def packet_encode():
+    packet = RTPPacket(seq_num=1, timestamp=160, ssrc=0x1234, payload=PAYLOAD)
+    return packet.encode
+
+
+def packet_decode():
+    data = RTPPacket(seq_num=1, timestamp=160, ssrc=0x1234, payload=PAYLOAD).encode()
+    return lambda: RTPPacket.decode(data).payload_view
+
+
+def _lost_seqs():
+    rng = random.Random(1)
+    return sorted(rng.sample(range(1000), 20))
+
+
+def nack_create():
+    lost = _lost_seqs()
+    return lambda: RTPPacket.create_nack(lost, 0x1234)
+
+
+def nack_parse():
+    nack = RTPPacket.decode(RTPPacket.create_nack(_lost_seqs(), 0x1234).encode())
+    return nack.get_nack_sequence_numbers
+
+
+def fec_encode():
+    handler = FECHandler(group_size=4)
+    packets = [RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=PAYLOAD)
+               for seq in range(65536)]
+    state = {'seq': 0}
+
+    def add():
+        seq = state['seq']
+        state['seq'] = (seq + 1) & 0xFFFF
+        return handler.add_packet(packets[seq])
+    return add
+
+
+def fec_recover():
+    handler = FECHandler(group_size=4)
+    group = [RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=bytes([seq]) * 160)
+             for seq in range(4)]
+    fec_packets = []
+    for packet in group:
+        fec_packets = handler.add_packet(packet) or fec_packets
+    available = group[:1] + group[2:]
+    return lambda: handler.recover_packets(fec_packets, available)
+
+
+def rtx_lookup():
+    handler = RetransmissionHandler(buffer_size=1000)
+    for seq in range(1000):
+        handler.add_packet(RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=PAYLOAD))
+    nack = RTPPacket.create_nack(range(500, 1000, 50), 1)
+    return lambda: handler.handle_nack(nack)
+
+
+def _receiver_case(pattern):
+    """_process_packet over one full sequence cycle arranged by pattern"""
+    def factory():
+        rng = random.Random(1)
+        seqs = list(range(65536))
+        if pattern == 'reorder':
+            for i in range(0, 65534, 10):
+                seqs[i], seqs[i + 1] = seqs[i + 1], seqs[i]
+        elif pattern == 'loss':
+            seqs = [seq for seq in seqs if seq < 2 or rng.random() >= 0.05]
+        datagrams = [RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=PAYLOAD).encode()
+                     for seq in seqs]
+        receiver = RTPReceiver('127.0.0.1', 0, stats_interval=None, rtcp_interval=None)
+        receiver.socket.close()
+        receiver._write_packet = lambda packet: None
+        receiver._sendto = lambda data, addr: None
+        state = {'index': 0}
+        count = len(datagrams)
+
+        def process():
+            index = state['index']
+            state['index'] = (index + 1) % count
+            receiver._process_packet(RTPPacket.decode(datagrams[index]), ADDR)
+        return process
+    return factory
+
+
+# End-to-end
+
+def _free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class _TimingReceiver(RTPReceiver):
+    """Receiver recording the one-way latency of each written packet"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+        self.last_arrival = None
+
+    def _write_packet(self, packet):
+        now = time.monotonic()
+        self.latencies.append(now - _SEND_TIME.unpack_from(packet.payload)[0])
+        self.last_arrival = now
+
+
+def _loopback(run_sender, settle=0.5):
+    """Run run_sender(sender) through a clean SimulatedNetwork into a receiver"""
+    receiver_port = _free_port()
+    network_port = _free_port()
+    receiver = _TimingReceiver('127.0.0.1', receiver_port, stats_interval=None, rtcp_interval=None)
+    receiver.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+    network = SimulatedNetwork(network_port, '127.0.0.1', receiver_port, drop_rate=0.0,
+                               max_delay=0.0, reorder_rate=0.0, duplicate_rate=0.0)
+    sender = RTPSender('127.0.0.1', network_port, ssrc=1, stats_interval=None, rtcp_interval=None)
+    network.start()
+    receiver.start_receiving(None)
+    try:
+        time.sleep(0.1)
+        start = time.monotonic()
+        sent = run_sender(sender)
+        time.sleep(settle)
+    finally:
+        receiver.stop_receiving()
+        network.stop()
+        sender.socket.close()
+    return start, sent, receiver
+
+
+def _payload():
+    return _SEND_TIME.pack(time.monotonic()) + PAYLOAD[_SEND_TIME.size:]
+
+
+def e2e_throughput(quick):
+    count = 2000 if quick else 10000
+
+    def burst(sender):
+        for _ in range(count):
+            sender.send_packet(_payload())
+        return count
+    start, sent, receiver = _loopback(burst)
+    if receiver.last_arrival is None:
+        return 0.0
+    return len(receiver.latencies) / (receiver.last_arrival - start)
+
+
+def _e2e_latencies(quick):
+    count = 100 if quick else 400
+
+    def paced(sender):
+        for _ in range(count):
+            sender.send_packet(_payload())
+            time.sleep(0.005)
+        return count
+    _, _, receiver = _loopback(paced, settle=0.2)
+    return sorted(receiver.latencies) or [float('nan')]
+
+
+_latency_cache = {}
+
+
+def _latency_case(percentile):
+    def run(quick):
+        # Both percentiles come from the same run
+        if quick not in _latency_cache:
+            _latency_cache[quick] = _e2e_latencies(quick)
+        samples = _latency_cache[quick]
+        return samples[min(len(samples) - 1, int(percentile / 100.0 * len(samples)))] * 1000.0
+    return run
+
+
+CASES = [
+    Case('packet_encode', _ops(packet_encode)),
+    Case('packet_decode', _ops(packet_decode)),
+    Case('nack_create', _ops(nack_create)),
+    Case('nack_parse', _ops(nack_parse)),
+    Case('fec_encode', _ops(fec_encode)),
+    Case('fec_recover', _ops(fec_recover)),
+    Case('rtx_lookup', _ops(rtx_lookup)),
+    Case('receiver_in_order', _ops(_receiver_case('in_order'))),
+    Case('receiver_reorder', _ops(_receiver_case('reorder'))),
+    Case('receiver_loss', _ops(_receiver_case('loss'))),
+    Case('e2e_throughput', e2e_throughput, unit='packets/s'),
+    Case('e2e_latency_p50', _latency_case(50), unit='ms', higher_is_better=False),
+    Case('e2e_latency_p99', _latency_case(99), unit='ms', higher_is_better=False),
+]
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(only=None, quick=False):
+    """Run the suite
+
+    Args:
+        only: Substring a case name must contain, None for every case
+        quick: Shorter timing runs, for smoke checks
+
+    Returns:
+        Result document with ``meta`` and ``results``
+    """
+    results = {}
+    for case in CASES:
+        if only and only not in case.name:
+            continue
+        results[case.name] = {
+            'value': case.func(quick),
+            'unit': case.unit,
+            'higher_is_better': case.higher_is_better,
+        }
+    return {
+        'meta': {
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.1):
+    """Compare two result documents case by case
+
+    Returns:
+        List of (name, baseline value, current value, relative change,
+        regressed) for the cases present in both. A positive change is an
+        improvement whatever the case's direction.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or not before['value']:
+            continue
+        change = result['value'] / before['value'] - 1.0
+        if not result['higher_is_better']:
+            change = -change
+        rows.append((name, before['value'], result['value'], change, change < -threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='RTP performance suite')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown counted as a regression (default 0.1)')
+    parser.add_argument('--only', help='Only run cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='Shorter runs')
+    args = parser.parse_args(argv)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        document = run(args.only, args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    rows = [[name, f"{r['value']:,.2f}", r['unit']] for name, r in document['results'].items()]
+    print_table(f"RTP suite ({document['meta']['commit'] or 'no commit'})",
+                ['case', 'value', 'unit'], rows)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare(document, baseline, args.threshold)
+        print_table(f"Against {args.baseline} (regression below -{args.threshold:.0%})",
+                    ['case', 'baseline', 'current', 'change', ''],
+                    [[name, f'{before:,.2f}', f'{after:,.2f}', f'{change:+.1%}',
+                      'REGRESSION' if regressed else '']
+                     for name, before, after, change, regressed in comparison])
+        if any(regressed for *_, regressed in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,16 +4,24 @@ RTP Audio Streaming Package
 
 __version__ = "0.1.0"
 
-from .core.packet import RTPPacket
+from .core.packet import RTPPacket, RTPHeaderTemplate
 from .core.sender import RTPSender
 from .core.receiver import RTPReceiver
+from .core.batch import PacketBatch
+from .core.aio import AsyncRTPSender, AsyncRTPReceiver
+from .core.server import RTPServer
 from .utils.fec import FECHandler
 from .utils.retransmission import RetransmissionHandler
 
 __all__ = [
     'RTPPacket',
+    'RTPHeaderTemplate',
     'RTPSender',
     'RTPReceiver',
+    'PacketBatch',
+    'AsyncRTPSender',
+    'AsyncRTPReceiver',
+    'RTPServer',
     'FECHandler',
     'RetransmissionHandler',
 ] 
\ No newline at end of file
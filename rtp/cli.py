@@ -10,7 +10,12 @@ from pathlib import Path
 
 from .core.sender import RTPSender
 from .core.receiver import RTPReceiver
+from .core.workers import ReceiverWorkers
 from .utils.network_simulator import SimulatedNetwork
+from .utils.metrics import MetricsRegistry, MetricsServer
+from .utils.sinks import MmapWaveSink, NullSink
+from .utils.codecs import codec_names, get_codec
+from .utils.vad import VoiceActivityDetector
 from .config import RTPConfig, default_config
 
 # Configure logging
@@ -31,13 +36,41 @@ def parse_args():
     parser.add_argument('--receiver-port', type=int, default=default_config.receiver_port)
     parser.add_argument('--duration', type=float, default=10.0,
                       help='Duration to run in seconds')
-    parser.add_argument('--interval', type=float, default=0.02,
-                      help='Interval between packets in seconds')
+    parser.add_argument('--interval', type=float,
+                      help='Interval between packets in seconds (default: the ptime)')
+    parser.add_argument('--ptime', type=int, choices=[10, 20, 40, 60], default=default_config.ptime,
+                      help='Milliseconds of audio per packet')
+    parser.add_argument('--mtu', type=int, default=default_config.mtu,
+                      help='Path MTU; frames larger than fits are sent as several packets')
+    parser.add_argument('--vad', action='store_true', default=default_config.vad,
+                      help='Do not send silent frames; send comfort noise packets instead')
     parser.add_argument('--audio', help='Path to input.wav to stream')
+    parser.add_argument('--codec', type=str.lower, choices=[name.lower() for name in codec_names()],
+                      help='Audio codec to send, overriding the payload type of the config '
+                           '(default: pcmu, payload type 0)')
     parser.add_argument('--simulate-network', action='store_true',
                       help='Enable simulated network middlebox')
     parser.add_argument('--middlebox-port', type=int, default=default_config.middlebox_port)
     parser.add_argument('--receiver-listen-port', type=int, default=default_config.receiver_listen_port)
+    parser.add_argument('--burst-length', type=float, default=default_config.burst_length,
+                      help='Mean loss burst of the simulated network in packets')
+    parser.add_argument('--seed', type=int, default=default_config.network_seed,
+                      help='Seed for reproducible simulated network impairments')
+    parser.add_argument('--output', default='received.wav',
+                      help='WAV file the receiver writes')
+    parser.add_argument('--sink', choices=['wave', 'mmap', 'null'], default='wave',
+                      help='Receiver output: WAV written in the background, memory-mapped WAV, '
+                           'or null to discard audio and report the receive rate (bench mode)')
+    parser.add_argument('--jitter-buffer', action='store_true',
+                      help='Play received audio through the adaptive jitter buffer')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Receiver worker processes sharing the port with SO_REUSEPORT')
+    parser.add_argument('--rtcp-interval', type=float, default=default_config.rtcp_interval,
+                      help='Seconds between RTCP reports, 0 to disable')
+    parser.add_argument('--stats-interval', type=float, default=1.0,
+                      help='Seconds between logged stats snapshots, 0 to disable')
+    parser.add_argument('--metrics-port', type=int,
+                      help='Serve Prometheus metrics on this local port')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                       default='INFO', help='Logging level')
     return parser.parse_args()
@@ -61,10 +94,22 @@ def main():
     config.simulate_network = args.simulate_network
     config.middlebox_port = args.middlebox_port
     config.receiver_listen_port = args.receiver_listen_port
+    config.rtcp_interval = args.rtcp_interval
+    config.burst_length = args.burst_length
+    config.network_seed = args.seed
+    config.ptime = args.ptime
+    config.mtu = args.mtu
+    config.vad = args.vad
+    if args.codec:
+        config.payload_type = get_codec(args.codec).payload_type
     
     sender = None
     receiver = None
     network_sim = None
+    metrics_server = None
+    # Sender and receiver share one registry so one endpoint serves both
+    metrics = MetricsRegistry()
+    stats_interval = args.stats_interval or None
 
     try:
         # Start network simulator if enabled
@@ -76,14 +121,22 @@ def main():
                 drop_rate=config.drop_rate,
                 max_delay=config.max_delay,
                 reorder_rate=config.reorder_rate,
-                duplicate_rate=config.duplicate_rate
+                duplicate_rate=config.duplicate_rate,
+                burst_length=config.burst_length,
+                seed=config.network_seed
             )
             threading.Thread(target=network_sim.start, daemon=True).start()
             logger.info("Network simulator started")
 
         # Start sender if needed
         if args.mode in ['sender', 'both']:
-            sender = RTPSender(config.receiver_ip, config.sender_port)
+            sender = RTPSender(config.receiver_ip, config.sender_port,
+                               payload_type=config.payload_type, ptime=config.ptime,
+                               mtu=config.mtu, metrics=metrics,
+                               vad=VoiceActivityDetector() if config.vad else None,
+                               cn_interval=config.cn_interval,
+                               stats_interval=stats_interval,
+                               rtcp_interval=config.rtcp_interval or None)
             if args.audio:
                 sender.set_audio_file(args.audio)
             logger.info("Sender initialized")
@@ -91,11 +144,34 @@ def main():
         # Start receiver if needed
         if args.mode in ['receiver', 'both']:
             listen_port = config.receiver_listen_port if config.simulate_network else config.receiver_port
-            receiver = RTPReceiver(config.receiver_ip, listen_port)
-            receiver.start_receiving()
+            if args.workers > 1:
+                output = Path(args.output)
+                output_pattern = (None if args.sink == 'null'
+                                  else str(output.with_name(output.stem + '-{worker}' + output.suffix)))
+                receiver = ReceiverWorkers(config.receiver_ip, listen_port, args.workers,
+                                           output_pattern=output_pattern, sink=args.sink,
+                                           use_jitter_buffer=args.jitter_buffer,
+                                           rtcp_interval=config.rtcp_interval or None)
+                receiver.register_metrics(metrics)
+                receiver.start()
+            else:
+                receiver = RTPReceiver(config.receiver_ip, listen_port,
+                                       use_jitter_buffer=args.jitter_buffer, metrics=metrics,
+                                       stats_interval=stats_interval,
+                                       rtcp_interval=config.rtcp_interval or None)
+                sink = None
+                if args.sink == 'mmap':
+                    sink = MmapWaveSink(args.output, sample_rate=config.sample_rate)
+                elif args.sink == 'null':
+                    sink = NullSink(sample_rate=config.sample_rate)
+                receiver.start_receiving(args.output, sink=sink)
             logger.info("Receiver started")
             time.sleep(0.5)  # Give receiver time to start
 
+        if args.metrics_port is not None:
+            metrics_server = MetricsServer(metrics, port=args.metrics_port)
+            metrics_server.start()
+
         # Start sending if sender is active
         if sender:
             sender.start_sending(interval=args.interval, duration=args.duration)
@@ -112,10 +188,22 @@ def main():
         # Cleanup
         if sender:
             sender.stop_sending()
-        if receiver:
+            if sender.feedback:
+                logger.info(f"Receiver feedback: {sender.feedback}")
+        if isinstance(receiver, ReceiverWorkers):
+            stats = receiver.stop()
+            stats.pop('per_worker')
+            logger.info(f"Receiver workers stopped: {stats}")
+        elif receiver:
+            sink = receiver.sink
             receiver.stop_receiving()
+            if isinstance(sink, NullSink) and sink.rate():
+                logger.info(f"Bench: {sink.packets} packets at {sink.rate():,.0f} packets/s "
+                            f"with no audio output")
         if network_sim:
             network_sim.stop()
+        if metrics_server:
+            metrics_server.stop()
         logger.info("Cleanup completed")
 
 if __name__ == '__main__':
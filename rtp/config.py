@@ -22,8 +22,12 @@ class RTPConfig:
     sample_width: int = 2
     
     # RTP settings
-    payload_type: int = 0  # Dynamic payload type
+    payload_type: int = 0  # Codec of the stream: 0 PCMU, 8 PCMA, 96 16-bit PCM (rtp/utils/codecs.py)
     timestamp_increment: int = 160  # 20ms @ 8kHz
+    ptime: int = 20  # Milliseconds of audio per packet
+    mtu: int = 1500  # Path MTU, larger frames are fragmented
+    vad: bool = False  # Suppress silent frames and send comfort noise instead
+    cn_interval: float = 0.5  # Seconds between comfort noise packets during silence
     
     # FEC settings
     fec_group_size: int = 4
@@ -31,6 +35,9 @@ class RTPConfig:
     # Retransmission settings
     history_size: int = 1000
     
+    # RTCP settings
+    rtcp_interval: float = 5.0  # Seconds between sender/receiver reports
+    
     # Network simulation settings
     simulate_network: bool = False
     middlebox_port: int = 5000
@@ -39,6 +46,8 @@ class RTPConfig:
     max_delay: float = 0.05
     reorder_rate: float = 0.2
     duplicate_rate: float = 0.05
+    burst_length: float = 1.0  # Mean loss burst in packets, 1 for independent loss
+    network_seed: Optional[int] = None  # Seed for reproducible impairments
 
     @classmethod
     def from_file(cls, config_path: str) -> 'RTPConfig':
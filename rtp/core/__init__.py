@@ -2,8 +2,17 @@
 Core RTP implementation modules
 """
 
-from .packet import RTPPacket
+from .packet import RTPPacket, RTPHeaderTemplate
 from .sender import RTPSender
 from .receiver import RTPReceiver
+from .batch import PacketBatch
+from .aio import AsyncRTPSender, AsyncRTPReceiver
+from .server import RTPServer, RTPStream
+from .workers import ReceiverWorkers
+from .rtcp import SenderReport, ReceiverReport, ReportBlock, ReceptionStats
+from .simulation import Simulation, SimulatedLink, CallSimulation
 
-__all__ = ['RTPPacket', 'RTPSender', 'RTPReceiver'] 
\ No newline at end of file
+__all__ = ['RTPPacket', 'RTPHeaderTemplate', 'RTPSender', 'RTPReceiver', 'PacketBatch',
+           'AsyncRTPSender', 'AsyncRTPReceiver', 'RTPServer', 'RTPStream',
+           'ReceiverWorkers', 'SenderReport', 'ReceiverReport', 'ReportBlock', 'ReceptionStats',
+           'Simulation', 'SimulatedLink', 'CallSimulation'] 
\ No newline at end of file
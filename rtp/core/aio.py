@@ -0,0 +1,234 @@
+"""
+asyncio transport for RTP streams
+
+AsyncRTPSender and AsyncRTPReceiver run the RTPSender / RTPReceiver stream
+logic on an asyncio DatagramProtocol instead of dedicated threads. Packets
+are sent from loop timers, NACKs and media are handled in
+``datagram_received``, so one event loop can drive thousands of streams.
+"""
+
+import asyncio
+import logging
+from rtp.core import rtcp
+from rtp.core.packet import RTPPacket
+from rtp.core.sender import RTPSender
+from rtp.core.receiver import RTPReceiver
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRTPSender(RTPSender, asyncio.DatagramProtocol):
+    """RTPSender driven by an asyncio event loop
+
+    Example:
+        sender = AsyncRTPSender("127.0.0.1", 5000)
+        await sender.start(interval=0.02, duration=10)
+        await sender.wait_closed()
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transport = None
+        self._loop = None
+        self._timer = None
+        self._closed = None
+
+    def _open_socket(self):
+        return None  # The transport is created by start()
+
+    def _send_batch(self, datagrams):
+        sendto = self.transport.sendto
+        addr = (self.dest_ip, self.dest_port)
+        for data in datagrams:
+            sendto(data, addr)
+
+    async def start(self, interval=None, duration=None, local_addr=('0.0.0.0', 0)):
+        """Open the transport and start sending packets periodically
+
+        Args:
+            interval: Time between packets in seconds, the ptime if None
+            duration: Sending time in seconds, None to send until stopped
+            local_addr: Address to bind, NACKs are received on it
+        """
+        self._loop = asyncio.get_running_loop()
+        self._closed = self._loop.create_future()
+        await self._loop.create_datagram_endpoint(lambda: self, local_addr=local_addr)
+        self.running = True
+        self._interval = interval if interval is not None else self.packetizer.ptime / 1000
+        self._start_time = self._loop.time()
+        self._end_time = self._start_time + duration if duration else None
+        self._tick()
+
+    def _tick(self):
+        """Send one packet and schedule the next"""
+        self._timer = None
+        if not self.running:
+            return
+        if not self.tick():
+            self.stop_sending()
+            return
+
+        # Deadlines are counted from the start so timer lateness does not add up
+        next_time = self._start_time + self.packet_count * self._interval
+        if self._end_time is not None and next_time >= self._end_time:
+            self.stop_sending()
+            return
+        self._timer = self._loop.call_at(next_time, self._tick)
+
+    def stop_sending(self):
+        """Stop sending and close the transport"""
+        if self.running:
+            logger.info("Sender stopped after %d packets", self.packet_count)
+        self.running = False
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self.transport:
+            self.transport.close()
+
+    async def wait_closed(self):
+        """Wait until sending has finished and the transport is closed"""
+        await self._closed
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            if rtcp.is_rtcp(data):
+                self._handle_rtcp(data)
+                return
+            packet = RTPPacket.decode(data)
+        except ValueError as e:
+            logger.warning("Error processing NACK: %s", e)
+            return
+        if packet.payload_type == RTPPacket.PT_NACK:
+            self._handle_nack(packet, addr)
+
+    def error_received(self, exc):
+        logger.error("Error in NACK listener: %s", exc)
+
+    def connection_lost(self, exc):
+        self.running = False
+        if self._closed and not self._closed.done():
+            self._closed.set_result(None)
+
+
+class AsyncRTPReceiver(RTPReceiver, asyncio.DatagramProtocol):
+    """RTPReceiver driven by an asyncio event loop
+
+    With the jitter buffer enabled, playout runs from a loop timer set to the
+    next playout deadline.
+
+    Example:
+        receiver = AsyncRTPReceiver("0.0.0.0", 5000)
+        await receiver.start("received.wav")
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transport = None
+        self._loop = None
+        self._playout_timer = None
+        self._nack_timer = None
+
+    def _open_socket(self):
+        return None  # The transport is created by start()
+
+    def _sendto(self, data, addr):
+        self.transport.sendto(data, addr)
+
+    async def start(self, output_path=None, sink=None):
+        """Open the transport and start receiving
+
+        Args:
+            output_path: WAV file received audio is written to, None to
+                discard it
+            sink: Sink to write the audio to instead of output_path
+        """
+        self._loop = asyncio.get_running_loop()
+        if self.jitter_buffer:
+            self.jitter_buffer.clock = self._loop.time
+        if sink is None and output_path:
+            sink = self._open_sink(output_path)
+        self.sink = sink
+        await self._loop.create_datagram_endpoint(
+            lambda: self, local_addr=(self.bind_ip, self.bind_port))
+        self.running = True
+        logger.info("Receiver started on %s:%d", self.bind_ip, self.local_address[1])
+
+    @property
+    def local_address(self):
+        """Address the transport is bound to"""
+        return self.transport.get_extra_info('sockname')
+
+    def stop_receiving(self):
+        """Close the transport and the output file"""
+        self.running = False
+        if self._playout_timer:
+            self._playout_timer.cancel()
+            self._playout_timer = None
+        if self._nack_timer:
+            self._nack_timer.cancel()
+            self._nack_timer = None
+        if self.transport:
+            self.transport.close()
+        if self.sink:
+            self.sink.close()
+            self.sink = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            if rtcp.is_rtcp(data):
+                self._process_rtcp(data)
+            else:
+                self._process_packet(RTPPacket.decode(data), addr)
+        except Exception as e:
+            logger.warning("Error decoding RTP packet: %s", e)
+        if self.jitter_buffer:
+            self._schedule_playout()
+        self._schedule_nack()
+        now = self.clock()
+        if now >= self._next_rtcp:
+            self.send_report(now)
+        self.reporter.maybe_report(now)
+
+    def error_received(self, exc):
+        logger.error("Error in receiver loop: %s", exc)
+
+    def connection_lost(self, exc):
+        self.running = False
+
+    def _schedule_playout(self):
+        """Arm the playout timer for the next deadline"""
+        deadline = self.jitter_buffer.next_deadline()
+        if deadline is None:
+            return
+        timer = self._playout_timer
+        if timer is not None:
+            if timer.when() <= deadline:
+                return
+            timer.cancel()
+        self._playout_timer = self._loop.call_at(deadline, self._on_playout)
+
+    def _on_playout(self):
+        self._playout_timer = None
+        if not self.running:
+            return
+        self._playout()
+        self._schedule_playout()
+
+    def _schedule_nack(self):
+        """Arm the re-NACK timer for when the oldest open NACK is due"""
+        if self._nack_timer is not None or self._next_nack == float('inf'):
+            return
+        delay = max(0.0, self._next_nack - self.clock())
+        self._nack_timer = self._loop.call_later(delay, self._on_nack)
+
+    def _on_nack(self):
+        self._nack_timer = None
+        if not self.running:
+            return
+        self.resend_nacks()
+        self._schedule_nack()
@@ -0,0 +1,208 @@
+"""
+Batch RTP encoding/decoding into columnar NumPy header arrays
+"""
+
+import numpy as np
+
+from rtp.core.packet import RTPPacket
+
+# One row per datagram; ``offset``/``length`` locate the datagram and
+# ``payload_offset``/``payload_length`` its payload inside ``PacketBatch.data``
+HEADER_DTYPE = np.dtype([
+    ('offset', np.int64),
+    ('length', np.int64),
+    ('valid', np.bool_),
+    ('version', np.uint8),
+    ('padding', np.uint8),
+    ('extension', np.uint8),
+    ('cc', np.uint8),
+    ('marker', np.uint8),
+    ('payload_type', np.uint8),
+    ('seq_num', np.uint16),
+    ('timestamp', np.uint32),
+    ('ssrc', np.uint32),
+    ('payload_offset', np.int64),
+    ('payload_length', np.int64),
+])
+
+# Wire layout of the fixed 12-byte header
+_WIRE_DTYPE = np.dtype([
+    ('b0', np.uint8),
+    ('b1', np.uint8),
+    ('seq_num', '>u2'),
+    ('timestamp', '>u4'),
+    ('ssrc', '>u4'),
+])
+
+_HEADER_INDEX = np.arange(RTPPacket.HEADER_SIZE)
+
+
+class PacketBatch:
+    """A burst of RTP datagrams stored back to back in one buffer
+
+    Header fields are exposed as NumPy columns (``batch.headers['seq_num']``,
+    ``batch.headers['timestamp']``, ...) so loss detection, reordering and
+    statistics can run as array operations.
+    """
+    def __init__(self, headers, data):
+        self.headers = headers
+        self.data = data
+        self._view = memoryview(data)
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __iter__(self):
+        for i in range(len(self.headers)):
+            yield self.packet(i)
+
+    def datagram(self, index):
+        """Get the raw bytes of one datagram as a zero-copy view"""
+        offset = int(self.headers['offset'][index])
+        return self._view[offset:offset + int(self.headers['length'][index])]
+
+    def payload(self, index):
+        """Get the payload of one datagram as a zero-copy view"""
+        offset = int(self.headers['payload_offset'][index])
+        return self._view[offset:offset + int(self.headers['payload_length'][index])]
+
+    def packet(self, index):
+        """Get one datagram as an RTPPacket view"""
+        return RTPPacket.decode(self.datagram(index))
+
+    def extended_seq_nums(self):
+        """Unwrap 16-bit sequence numbers into a monotonic int64 sequence
+
+        Consecutive sequence numbers are assumed to be less than half the
+        sequence space apart, as in RFC 3550 Appendix A.1.
+        """
+        seq = self.headers['seq_num'].astype(np.int64)
+        if len(seq) == 0:
+            return seq
+        steps = (np.diff(seq) + 32768) % 65536 - 32768
+        extended = np.empty_like(seq)
+        extended[0] = seq[0]
+        np.cumsum(steps, out=extended[1:])
+        extended[1:] += seq[0]
+        return extended
+
+    def playout_order(self):
+        """Get datagram indices sorted by extended sequence number"""
+        return np.argsort(self.extended_seq_nums(), kind='stable')
+
+    def missing_seq_nums(self):
+        """Get the 16-bit sequence numbers missing from the batch's range"""
+        extended = self.extended_seq_nums()[self.headers['valid']]
+        if len(extended) == 0:
+            return np.empty(0, dtype=np.uint16)
+        expected = np.arange(extended.min(), extended.max() + 1)
+        return (np.setdiff1d(expected, extended, assume_unique=True) % 65536).astype(np.uint16)
+
+
+def decode_many(buffers):
+    """Parse a sequence of datagrams into a PacketBatch
+
+    Datagrams that are too short for their header are kept in the batch with
+    ``valid`` set to False instead of raising, so one bad datagram does not
+    discard the burst.
+    """
+    count = len(buffers)
+    lengths = np.fromiter(map(len, buffers), dtype=np.int64, count=count)
+    offsets = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+
+    # Trailing zeros keep header gathers of short datagrams in bounds
+    data = b''.join(buffers)
+    raw = np.frombuffer(data + bytes(RTPPacket.HEADER_SIZE + 4), dtype=np.uint8)
+    wire = raw[offsets[:, None] + _HEADER_INDEX].view(_WIRE_DTYPE)[:, 0]
+
+    headers = np.zeros(count, dtype=HEADER_DTYPE)
+    b0 = wire['b0']
+    b1 = wire['b1']
+    headers['offset'] = offsets
+    headers['length'] = lengths
+    headers['version'] = b0 >> 6
+    headers['padding'] = (b0 >> 5) & 0x01
+    headers['extension'] = (b0 >> 4) & 0x01
+    headers['cc'] = b0 & 0x0F
+    headers['marker'] = b1 >> 7
+    headers['payload_type'] = b1 & 0x7F
+    headers['seq_num'] = wire['seq_num']
+    headers['timestamp'] = wire['timestamp']
+    headers['ssrc'] = wire['ssrc']
+
+    ends = offsets + lengths
+    payload_offsets = offsets + RTPPacket.HEADER_SIZE + 4 * (b0 & 0x0F).astype(np.int64)
+    valid = (lengths >= RTPPacket.HEADER_SIZE) & (payload_offsets <= ends)
+
+    # Skip header extensions: 16-bit profile, 16-bit length in 32-bit words
+    has_ext = np.flatnonzero(valid & (headers['extension'] == 1))
+    if len(has_ext):
+        ext_at = payload_offsets[has_ext]
+        fits = ext_at + 4 <= ends[has_ext]
+        valid[has_ext[~fits]] = False
+        has_ext, ext_at = has_ext[fits], ext_at[fits]
+        ext_words = (raw[ext_at + 2].astype(np.int64) << 8) | raw[ext_at + 3]
+        payload_offsets[has_ext] = ext_at + 4 + 4 * ext_words
+        valid[has_ext] &= payload_offsets[has_ext] <= ends[has_ext]
+
+    # Strip padding, whose length is the last byte of the datagram
+    payload_ends = ends.copy()
+    has_pad = np.flatnonzero(valid & (headers['padding'] == 1) & (ends > payload_offsets))
+    if len(has_pad):
+        payload_ends[has_pad] = np.maximum(
+            payload_offsets[has_pad], ends[has_pad] - raw[ends[has_pad] - 1])
+
+    headers['valid'] = valid
+    headers['payload_offset'] = np.where(valid, payload_offsets, ends)
+    headers['payload_length'] = np.where(valid, payload_ends - payload_offsets, 0)
+    return PacketBatch(headers, data)
+
+
+def encode_many(packets):
+    """Encode a sequence of RTPPackets into one contiguous PacketBatch
+
+    Fixed headers are packed for the whole batch at once. Packets carrying a
+    CSRC list or header extension have those bytes encoded individually.
+    """
+    count = len(packets)
+    wire = np.array([((p.version << 6) | (p.padding << 5) | (p.extension << 4) | p.cc,
+                      (p.marker << 7) | p.payload_type, p.seq_num, p.timestamp, p.ssrc)
+                     for p in packets], dtype=_WIRE_DTYPE)
+
+    # Everything after the fixed header; CSRC/extension bytes only when present
+    bodies = [p.encode()[RTPPacket.HEADER_SIZE:] if (p.cc or p.extension) else p.payload_view
+              for p in packets]
+    body_lengths = np.fromiter(map(len, bodies), dtype=np.int64, count=count)
+    payload_lengths = np.fromiter((len(p.payload_view) for p in packets), dtype=np.int64, count=count)
+
+    lengths = body_lengths + RTPPacket.HEADER_SIZE
+    offsets = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+
+    # Interleave the packed headers with the bodies in a single join
+    size = RTPPacket.HEADER_SIZE
+    header_bytes = wire.tobytes()
+    parts = [None] * (2 * count)
+    parts[0::2] = [header_bytes[i:i + size] for i in range(0, count * size, size)]
+    parts[1::2] = bodies
+    data = b''.join(parts)
+
+    first = wire['b0']
+    second = wire['b1']
+    headers = np.zeros(count, dtype=HEADER_DTYPE)
+    headers['offset'] = offsets
+    headers['length'] = lengths
+    headers['valid'] = True
+    headers['version'] = first >> 6
+    headers['padding'] = (first >> 5) & 0x01
+    headers['extension'] = (first >> 4) & 0x01
+    headers['cc'] = first & 0x0F
+    headers['marker'] = second >> 7
+    headers['payload_type'] = second & 0x7F
+    headers['seq_num'] = wire['seq_num']
+    headers['timestamp'] = wire['timestamp']
+    headers['ssrc'] = wire['ssrc']
+    headers['payload_offset'] = offsets + lengths - payload_lengths
+    headers['payload_length'] = payload_lengths
+    return PacketBatch(headers, data)
@@ -14,7 +14,37 @@ import struct
 # |                             ....                              |
 # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
 
+# Precompiled header layouts, shared by every packet
+_HEADER = struct.Struct('!BBHII')
+_CSRC = struct.Struct('!I')
+_EXT_HEADER = struct.Struct('!HH')
+_MARKER_SEQ_TS = struct.Struct('!BHI')  # Header bytes 1-7, patched per packet
+_NACK_FCI = struct.Struct('!HH')  # Generic NACK FCI entry: PID, BLP
+
+# Sequence number offsets (1-8) set in each possible BLP byte
+_BLP_OFFSETS = [tuple(bit + 1 for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def _nack_order(seq_nums):
+    """Sort sequence numbers, keeping runs across the 65535 -> 0 wrap together"""
+    ordered = sorted(set(seq_num & 0xFFFF for seq_num in seq_nums))
+    if len(ordered) > 1 and ordered[-1] - ordered[0] > 32768:
+        # Start after the largest gap in the circular sequence space
+        gaps = [b - a for a, b in zip(ordered, ordered[1:])]
+        split = max(range(len(gaps)), key=gaps.__getitem__) + 1
+        if gaps[split - 1] > 65536 - (ordered[-1] - ordered[0]):
+            ordered = ordered[split:] + ordered[:split]
+    return ordered
+
 class RTPPacket:
+    """RTP packet.
+
+    Packets built with the constructor own their fields and payload. Packets
+    returned by ``decode`` are views over the receive buffer: the fixed header
+    is parsed once, ``payload_view`` is a zero-copy ``memoryview`` slice and
+    the CSRC list and header extension are only parsed when first accessed.
+    ``payload`` is always ``bytes``, copied from the buffer on first access.
+    """
     HEADER_SIZE = 12  # Kích thước phần header cố định (byte)
     
     # Add packet types
@@ -22,6 +52,10 @@ class RTPPacket:
     PT_NACK = 65  # NACK control packet type
     PT_FEC = 97   # FEC packet type
     PT_RTX = 98   # Retransmission packet type
+
+    __slots__ = ('version', 'padding', 'extension', 'cc', 'marker',
+                 'payload_type', 'seq_num', 'timestamp', 'ssrc',
+                 'original_seq', '_buffer', '_payload', '_csrc', '_ext')
     
     def __init__(self, payload_type=PT_AUDIO, seq_num=0, timestamp=0, ssrc=0, payload=b''):
         self.version = 2         # Phiên bản RTP (2 bits)
@@ -33,9 +67,69 @@ class RTPPacket:
         self.seq_num = seq_num   # Số thứ tự gói tin (16 bits)
         self.timestamp = timestamp  # Timestamp (32 bits)
         self.ssrc = ssrc         # SSRC identifier (32 bits)
-        self.csrc = []           # CSRC list
-        self.payload = payload   # Payload data
+        self._csrc = []          # CSRC list
+        self._ext = None         # Header extension (profile, data)
+        self._payload = payload  # Payload data
+        self._buffer = None      # Backing buffer for decoded packets
         self.original_seq = None # Original sequence number for retransmitted packets
+
+    @property
+    def csrc(self):
+        """CSRC identifiers, parsed from the buffer on first access"""
+        if self._csrc is None:
+            buf = self._buffer
+            self._csrc = [_CSRC.unpack_from(buf, 12 + i * 4)[0] for i in range(self.cc)]
+        return self._csrc
+
+    @csrc.setter
+    def csrc(self, value):
+        self._csrc = value
+
+    @property
+    def extension_header(self):
+        """Header extension as ``(profile, data)``, or None if absent"""
+        if self._ext is None and self.extension and self._buffer is not None:
+            buf = self._buffer
+            offset = self.HEADER_SIZE + self.cc * 4
+            if len(buf) >= offset + 4:
+                profile, length = _EXT_HEADER.unpack_from(buf, offset)
+                self._ext = (profile, buf[offset + 4:offset + 4 + length * 4])
+        return self._ext
+
+    @extension_header.setter
+    def extension_header(self, value):
+        self._ext = value
+        self.extension = 1 if value is not None else 0
+
+    @property
+    def payload(self):
+        """Payload data as bytes"""
+        payload = self.payload_view
+        if type(payload) is memoryview:
+            payload = self._payload = payload.tobytes()
+        return payload
+
+    @payload.setter
+    def payload(self, value):
+        self._payload = value
+
+    @property
+    def payload_view(self):
+        """Payload data; a zero-copy slice of the buffer for decoded packets
+
+        The slice is only valid while the receive buffer is not reused.
+        """
+        payload = self._payload
+        if payload is None:
+            buf = self._buffer
+            start = self.HEADER_SIZE + self.cc * 4
+            if self.extension and len(buf) >= start + 4:
+                start += 4 + _EXT_HEADER.unpack_from(buf, start)[1] * 4
+            end = len(buf)
+            if self.padding and end > start:
+                end = max(start, end - buf[-1])
+            payload = self._payload = buf[start:end]
+        return payload
     
     def encode(self):
         """Đóng gói dữ liệu thành gói tin RTP"""
@@ -46,84 +140,143 @@ class RTPPacket:
         second_byte = (self.marker << 7) | self.payload_type
         
         # Đóng gói header
-        header = struct.pack('!BBH', first_byte, second_byte, self.seq_num)
-        header += struct.pack('!II', self.timestamp, self.ssrc)
+        header = _HEADER.pack(first_byte, second_byte, self.seq_num, self.timestamp, self.ssrc)
+        if not self.cc and not self.extension:
+            return header + self.payload_view
         
-        # Thêm CSRC identifiers (nếu có)
-        for csrc in self.csrc:
-            header += struct.pack('!I', csrc)
+        # Thêm CSRC identifiers và header extension (nếu có)
+        parts = [header]
+        csrc = self.csrc
+        if csrc:
+            parts.append(struct.pack(f'!{len(csrc)}I', *csrc))
+        ext = self.extension_header if self.extension else None
+        if ext is not None:
+            profile, data = ext
+            words = (len(data) + 3) // 4
+            parts.append(_EXT_HEADER.pack(profile, words))
+            parts.append(data)
+            parts.append(bytes(words * 4 - len(data)))
+        parts.append(self.payload_view)
         
         # Kết hợp header và payload
-        return header + self.payload
+        return b''.join(parts)
     
     @classmethod
     def decode(cls, packet_bytes):
-        """Giải mã gói tin RTP"""
+        """Giải mã gói tin RTP
+
+        Only the fixed header is parsed here. The returned packet keeps a
+        ``memoryview`` of ``packet_bytes``, so the caller must not reuse that
+        buffer while the packet is alive.
+        """
         if len(packet_bytes) < cls.HEADER_SIZE:
             raise ValueError("Packet too small to be a valid RTP packet")
-            
+
         # Parse header
-        first_byte, second_byte, seq_num = struct.unpack('!BBH', packet_bytes[0:4])
-        timestamp, ssrc = struct.unpack('!II', packet_bytes[4:12])
-        
-        # Extract fields from first byte
-        version = (first_byte >> 6) & 0x03
-        padding = (first_byte >> 5) & 0x01
-        extension = (first_byte >> 4) & 0x01
+        first_byte, second_byte, seq_num, timestamp, ssrc = _HEADER.unpack_from(packet_bytes)
         cc = first_byte & 0x0F
-        
-        # Extract fields from second byte
-        marker = (second_byte >> 7) & 0x01
-        payload_type = second_byte & 0x7F
-        
-        # Extract CSRC list
-        csrc_list = []
-        for i in range(cc):
-            if 12 + i*4 < len(packet_bytes):
-                csrc, = struct.unpack('!I', packet_bytes[12+i*4:16+i*4])
-                csrc_list.append(csrc)
-        
-        # Extract payload
-        header_size = cls.HEADER_SIZE + (cc * 4)
-        payload = packet_bytes[header_size:]
-        
-        # Create RTP packet object
-        packet = cls(payload_type, seq_num, timestamp, ssrc, payload)
-        packet.version = version
-        packet.padding = padding
-        packet.extension = extension
+        if len(packet_bytes) < cls.HEADER_SIZE + cc * 4:
+            raise ValueError("Packet too small for its CSRC list")
+
+        # Create RTP packet view without running __init__
+        packet = cls.__new__(cls)
+        packet.version = first_byte >> 6
+        packet.padding = (first_byte >> 5) & 0x01
+        packet.extension = (first_byte >> 4) & 0x01
         packet.cc = cc
-        packet.marker = marker
-        packet.csrc = csrc_list
+        packet.marker = second_byte >> 7
+        packet.payload_type = second_byte & 0x7F
+        packet.seq_num = seq_num
+        packet.timestamp = timestamp
+        packet.ssrc = ssrc
+        packet.original_seq = None
+        packet._buffer = packet_bytes if type(packet_bytes) is memoryview else memoryview(packet_bytes)
+        packet._payload = None
+        packet._csrc = None if cc else []
+        packet._ext = None
         
         return packet
     
+    def detach(self):
+        """Copy a decoded packet out of the buffer it was decoded from
+
+        Call this before keeping a packet whose receive buffer will be reused,
+        such as a ``BufferPool`` slot. Packets that already own their data are
+        left as they are.
+
+        Returns:
+            The packet itself
+        """
+        buf = self._buffer
+        if buf is None or type(buf.obj) is bytes:
+            return self
+        if type(self._payload) is memoryview and self._payload.obj is buf.obj:
+            self._payload = None
+        if self._ext is not None and type(self._ext[1]) is memoryview:
+            self._ext = None
+        self._buffer = memoryview(bytes(buf))
+        return self
+
+    @classmethod
+    def decode_many(cls, buffers):
+        """Giải mã nhiều gói tin RTP cùng lúc
+
+        Returns:
+            PacketBatch with columnar NumPy header arrays
+        """
+        from rtp.core.batch import decode_many
+        return decode_many(buffers)
+
+    @classmethod
+    def encode_many(cls, packets):
+        """Đóng gói nhiều gói tin RTP vào một buffer liên tục
+
+        Returns:
+            PacketBatch holding all datagrams back to back
+        """
+        from rtp.core.batch import encode_many
+        return encode_many(packets)
+    
     def __str__(self):
         """Hiển thị thông tin gói tin"""
         return (f"RTP Packet [V={self.version}, P={self.padding}, X={self.extension}, "
                 f"CC={self.cc}, M={self.marker}, PT={self.payload_type}, "
                 f"Seq={self.seq_num}, Time={self.timestamp}, SSRC=0x{self.ssrc:08x}, "
-                f"Payload Size={len(self.payload)}]")
+                f"Payload Size={len(self.payload_view)}]")
 
     @classmethod
-    def create_nack(cls, missing_seq_nums, ssrc):
+    def create_nack(cls, missing_seq_nums, ssrc=0):
         """Create a NACK packet for requesting retransmission of missing packets
         
+        The payload is a list of RFC 4585 generic NACK FCI entries: a 16-bit
+        PID (first lost sequence number) and a 16-bit bitmask (BLP) whose
+        bit i marks PID+i+1 as lost too, so up to 17 losses fit in 4 bytes.
+        
         Args:
             missing_seq_nums: List of sequence numbers of missing packets
             ssrc: SSRC identifier of the stream
         """
-        # Pack missing sequence numbers into payload
-        payload = b''
-        for seq_num in missing_seq_nums:
-            payload += struct.pack('!H', seq_num)
+        entries = []
+        pid = None
+        blp = 0
+        for seq_num in _nack_order(missing_seq_nums):
+            if pid is not None:
+                distance = (seq_num - pid) & 0xFFFF
+                if distance <= 16:
+                    blp |= 1 << (distance - 1)
+                    continue
+                entries.append(_NACK_FCI.pack(pid, blp))
+            pid = seq_num
+            blp = 0
+        if pid is not None:
+            entries.append(_NACK_FCI.pack(pid, blp))
         
         return cls(
             payload_type=cls.PT_NACK,
             seq_num=0,  # NACK packets don't need sequence numbers
             timestamp=0,  # NACK packets don't need timestamps
             ssrc=ssrc,
-            payload=payload
+            payload=b''.join(entries)
         )
 
     def get_nack_sequence_numbers(self):
@@ -132,9 +285,14 @@ class RTPPacket:
             raise ValueError("Not a NACK packet")
         
         missing_seq_nums = []
-        for i in range(0, len(self.payload), 2):
-            seq_num, = struct.unpack('!H', self.payload[i:i+2])
-            missing_seq_nums.append(seq_num)
+        payload = self.payload_view
+        for pid, blp in _NACK_FCI.iter_unpack(payload[:len(payload) & ~3]):
+            missing_seq_nums.append(pid)
+            if blp:
+                for offset in _BLP_OFFSETS[blp & 0xFF]:
+                    missing_seq_nums.append((pid + offset) & 0xFFFF)
+                for offset in _BLP_OFFSETS[blp >> 8]:
+                    missing_seq_nums.append((pid + offset + 8) & 0xFFFF)
         return missing_seq_nums
 
     @classmethod
@@ -145,7 +303,7 @@ class RTPPacket:
             original_packet: The original RTP packet to retransmit
         """
         # Store original sequence number in payload
-        rtx_payload = struct.pack('!H', original_packet.seq_num) + original_packet.payload
+        rtx_payload = struct.pack('!H', original_packet.seq_num) + original_packet.payload_view
         
         rtx_packet = cls(
             payload_type=cls.PT_RTX,
@@ -165,10 +323,67 @@ class RTPPacket:
         """Get original sequence number from retransmission packet"""
         if not self.is_rtx_packet():
             return None
-        return struct.unpack('!H', self.payload[:2])[0]
+        return struct.unpack_from('!H', self.payload_view)[0]
 
     def get_rtx_payload(self):
         """Get original payload from retransmission packet"""
         if not self.is_rtx_packet():
             return None
-        return self.payload[2:]
\ No newline at end of file
+        return bytes(self.payload_view[2:])
+
+
+class RTPHeaderTemplate:
+    """Preallocated packet buffer for one outgoing stream
+
+    The constant header fields (version, payload type, SSRC, CSRCs) are
+    written once. Each packet only patches marker, sequence number and
+    timestamp with ``pack_into`` and copies its payload behind the header,
+    so building a packet allocates nothing.
+    """
+    __slots__ = ('buffer', 'header_size', 'payload_type', '_view')
+
+    def __init__(self, payload_type, ssrc, csrc=(), max_size=1500):
+        """
+        Args:
+            payload_type: RTP payload type of the stream
+            ssrc: SSRC identifier of the stream
+            csrc: Contributing source identifiers
+            max_size: Largest datagram the template can build
+        """
+        self.buffer = bytearray(max_size)
+        self.header_size = RTPPacket.HEADER_SIZE + len(csrc) * 4
+        self.payload_type = payload_type
+        _HEADER.pack_into(self.buffer, 0, (2 << 6) | len(csrc), payload_type, 0, 0, ssrc)
+        for i, identifier in enumerate(csrc):
+            _CSRC.pack_into(self.buffer, RTPPacket.HEADER_SIZE + i * 4, identifier)
+        self._view = memoryview(self.buffer)
+
+    def pack(self, seq_num, timestamp, payload, marker=0):
+        """Build a packet in the template's own buffer
+
+        Returns:
+            memoryview of the encoded packet, valid until the next call
+        """
+        end = self.header_size + len(payload)
+        if end > len(self.buffer):
+            raise ValueError("Payload too large for header template")
+        _MARKER_SEQ_TS.pack_into(self.buffer, 1, (marker << 7) | self.payload_type,
+                                 seq_num, timestamp)
+        self.buffer[self.header_size:end] = payload
+        return self._view[:end]
+
+    def pack_into(self, buffer, seq_num, timestamp, payload, marker=0):
+        """Build a packet at the start of a caller-provided writable buffer
+
+        Returns:
+            Number of bytes written
+        """
+        header_size = self.header_size
+        end = header_size + len(payload)
+        if end > len(buffer):
+            raise ValueError("Buffer too small for packet")
+        buffer[:header_size] = self._view[:header_size]
+        _MARKER_SEQ_TS.pack_into(buffer, 1, (marker << 7) | self.payload_type,
+                                 seq_num, timestamp)
+        buffer[header_size:end] = payload
+        return end
@@ -1,109 +1,269 @@
+import logging
+import random
 import socket
 import threading
 import time
-import wave
+from rtp.core import rtcp
 from rtp.core.packet import RTPPacket
-from collections import defaultdict
-from rtp.utils.fec import FECHandler
-from rtp.utils.retransmission import RetransmissionHandler
+from rtp.utils.fec import FECHandler, FECRecoveryIndex
+from rtp.utils.reorder_buffer import ReorderBuffer
+from rtp.utils.jitter_buffer import JitterBuffer
+from rtp.utils.socket_io import BufferPool, recv_batch
+from rtp.utils.metrics import MetricsRegistry, MetricsReporter
+from rtp.utils.sinks import ThreadedSink, WaveFileSink
+from rtp.utils.codecs import PT_CN
+
+logger = logging.getLogger(__name__)
+
+# stats key -> exported counter
+RECEIVER_COUNTERS = (
+    ('packets_received', 'rtp_packets_received_total', 'Media packets received or recovered'),
+    ('lost_packets', 'rtp_packets_lost_total', 'Sequence numbers missing on arrival'),
+    ('out_of_order', 'rtp_packets_out_of_order_total', 'Late or duplicate packets dropped'),
+    ('nacks_sent', 'rtp_nacks_sent_total', 'NACK packets sent'),
+    ('retransmissions_received', 'rtp_retransmissions_received_total',
+     'Missing packets filled by a late or retransmitted packet'),
+    ('fec_recovered', 'rtp_fec_recovered_total', 'Packets recovered by FEC'),
+    ('comfort_noise_received', 'rtp_comfort_noise_received_total',
+     'Comfort noise packets received during suppressed silence'),
+    ('concealed_frames', 'rtp_concealed_frames_total',
+     'Lost packets the sink filled with concealment or silence'),
+    ('rtcp_sent', 'rtp_receiver_reports_sent_total', 'RTCP receiver reports sent'),
+)
 
 class RTPReceiver:
-    def __init__(self, bind_ip, bind_port, expected_ssrc=None, buffer_size=1000, group_size=4):
+    def __init__(self, bind_ip, bind_port, expected_ssrc=None, buffer_size=1000, group_size=4,
+                 use_jitter_buffer=False, min_delay=0.02, max_delay=0.5, reuse_port=False,
+                 metrics=None, stats_interval=1.0, rtcp_interval=5.0, clock=time.monotonic,
+                 rng=None):
         self.bind_ip = bind_ip
         self.bind_port = bind_port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.bind((bind_ip, bind_port))
+        self.reuse_port = reuse_port  # Share the port with other processes (SO_REUSEPORT)
+        self.socket = self._open_socket()
         self.running = False
-        self.audio_writer = None
+        self.sink = None  # Where played-out audio goes, see rtp.utils.sinks
+        self.clock = clock  # Time source for NACK, RTCP and playout timing
         self.stats = {
             'packets_received': 0,
             'last_seq': None,
             'lost_packets': 0,
             'out_of_order': 0,
             'nacks_sent': 0,
-            'retransmissions_received': 0
+            'retransmissions_received': 0,
+            'fec_recovered': 0,
+            'comfort_noise_received': 0,
+            'concealed_frames': 0,
+            'rtcp_sent': 0
         }
         self.sender_addr = None
-        self.missing_packets = set()  # Track missing sequence numbers
-        self.received_packets = {}  # Buffer for out-of-order packets
         self.last_nack_time = {}  # Track when NACK was last sent for each sequence number
         self.nack_timeout = 0.1  # Wait 100ms before resending NACK
+        self._next_nack = float('inf')  # When the oldest open NACK is due again
         self.max_packet_buffer = 1000  # Maximum number of packets to buffer
+        # Without a jitter buffer: packets held behind a hole before it is given up
+        # and the sink conceals it, instead of stalling until the window is full
+        self.max_reorder = 50
+        self.recv_batch_size = 64  # Datagrams drained per receive batch
+        # Out-of-order packets and missing/received state, bounded to max_packet_buffer
+        self.reorder_buffer = ReorderBuffer(self.max_packet_buffer)
+        # Optional timestamp-driven playout; it then owns the reorder buffer
+        self.jitter_buffer = None
+        if use_jitter_buffer:
+            self.jitter_buffer = JitterBuffer(min_delay=min_delay, max_delay=max_delay,
+                                              capacity=self.max_packet_buffer, clock=clock)
+            self.reorder_buffer = self.jitter_buffer.buffer
         
         self.expected_ssrc = expected_ssrc
-        self.fec_packets = {}  # group_start_seq -> fec_packet
-        self.next_seq = 0  # Next expected sequence number
         self.buffer_size = buffer_size
         
         self.fec_handler = FECHandler(group_size=group_size)
-        self.rtx_handler = RetransmissionHandler(buffer_size=buffer_size)
+        self.fec_index = FECRecoveryIndex()  # Decodes FEC groups as symbols arrive
+        self.fec_active = False  # Set by the first FEC packet received
         
         self.lock = threading.Lock()
+        
+        # RTCP: receiver reports every rtcp_interval seconds to the sender
+        self.rng = rng or random  # SSRC and RTCP timing, seeded in simulations
+        self.ssrc = self.rng.randint(1, 2**32 - 1)  # Our SSRC in receiver reports
+        self.cname = f"{self.ssrc:08x}@{socket.gethostname()}"
+        self.clock_rate = 8000
+        self.rtcp_interval = rtcp_interval
+        self.reception = None  # ReceptionStats of the sender, from the first packet
+        self._next_rtcp = (clock() + rtcp.report_interval(rtcp_interval, self.rng)
+                           if rtcp_interval else float('inf'))
+        
+        # Counters are read from self.stats when collected, so the packet
+        # path only bumps dict entries; nothing is printed per packet
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.reporter = MetricsReporter(self._register_metrics(self.metrics), logger, stats_interval,
+                                        clock=clock)
+    
+    def _register_metrics(self, registry):
+        """Register the receiver metrics and return them"""
+        stats = self.stats
+        metrics = [registry.counter(name, help, fn=lambda key=key: stats[key])
+                   for key, name, help in RECEIVER_COUNTERS]
+        metrics.append(registry.gauge('rtp_loss_ratio', 'Lost / (received + lost)',
+                                      fn=self._loss_ratio))
+        metrics.append(registry.gauge('rtp_reorder_buffer_packets', 'Packets held in the reorder buffer',
+                                      fn=lambda: len(self.reorder_buffer)))
+        if self.jitter_buffer:
+            jitter_buffer = self.jitter_buffer
+            metrics.append(registry.gauge('rtp_jitter_seconds', 'Interarrival jitter estimate',
+                                          fn=lambda: jitter_buffer.jitter))
+            metrics.append(registry.gauge('rtp_playout_delay_seconds', 'Current playout delay',
+                                          fn=lambda: jitter_buffer.delay))
+        self.batch_sizes = registry.histogram('rtp_receive_batch_size', 'Datagrams per receive batch',
+                                              buckets=(1, 2, 4, 8, 16, 32, 64))
+        metrics.append(self.batch_sizes)
+        return metrics
+    
+    def _loss_ratio(self):
+        expected = self.stats['packets_received'] + self.stats['lost_packets']
+        return self.stats['lost_packets'] / expected if expected else 0.0
+    
+    def _open_socket(self):
+        """Create the bound UDP socket"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.bind_ip, self.bind_port))
+        return sock
+
+    def _sendto(self, data, addr):
+        """Send one datagram, used for NACKs"""
+        self.socket.sendto(data, addr)
     
-    def start_receiving(self):
-        """Bắt đầu luồng nhận gói tin RTP"""
-        self.audio_writer = wave.open("received.wav", "wb")
-        self.audio_writer.setnchannels(1)
-        self.audio_writer.setsampwidth(2)
-        self.audio_writer.setframerate(8000)
+    def _open_sink(self, path):
+        """Default sink: a WAV file written in batches off the receive thread"""
+        return ThreadedSink(WaveFileSink(path, sample_rate=self.clock_rate))
+    
+    def start_receiving(self, output_path="received.wav", sink=None):
+        """Bắt đầu luồng nhận gói tin RTP
+        
+        Args:
+            output_path: WAV file received audio is written to, None to
+                discard it
+            sink: Sink to write the audio to instead of output_path, such
+                as a NullSink to measure the receive path alone
+        """
+        if sink is None and output_path:
+            sink = self._open_sink(output_path)
+        self.sink = sink
         self.running = True
         self.receiver_thread = threading.Thread(target=self._receiver_loop)
         self.receiver_thread.daemon = True
         self.receiver_thread.start()
-        print(f"Receiver started on {self.bind_ip}:{self.bind_port}")
+        logger.info("Receiver started on %s:%d", self.bind_ip, self.bind_port)
     
     def stop_receiving(self):
         """Dừng luồng nhận gói tin"""
         self.running = False
         if hasattr(self, 'receiver_thread'):
+            # Let the loop finish its batch before closing the output
+            self.receiver_thread.join(timeout=2.0)
             self.socket.close()
-            self.audio_writer.close()
-            self.receiver_thread.join(timeout=1.0)
+            if self.sink:
+                self.sink.close()
+                self.sink = None
     
     def _receiver_loop(self):
         """Vòng lặp nhận gói tin"""
-        self.socket.settimeout(1.0)  # Timeout 1 giây
+        self.socket.settimeout(None)  # recv_batch waits with select
+        pool = BufferPool(self.recv_batch_size)
+        reporter = self.reporter
         
         while self.running:
+            timeout = 1.0  # Timeout 1 giây
+            if self.jitter_buffer:
+                # Wake up in time for the next playout deadline
+                self._playout()
+                timeout = self._playout_timeout()
+            if self._next_nack < float('inf'):
+                # ...and in time to NACK open holes again
+                timeout = min(timeout, max(0.001, self._next_nack - self.clock()))
             try:
-                # Nhận gói tin
-                packet_bytes, addr = self.socket.recvfrom(2048)
-                
+                # Nhận cả loạt gói tin vào các slot dựng sẵn
+                batch = recv_batch(self.socket, pool, timeout)
+            except Exception as e:
+                if not self.running:
+                    break
+                logger.error("Error in receiver loop: %s", e)
+                continue
+            
+            if batch:
+                self.batch_sizes.observe(len(batch))
+            for packet_bytes, addr in batch:
                 # Giải mã gói RTP
                 try:
+                    if rtcp.is_rtcp(packet_bytes):
+                        self._process_rtcp(packet_bytes)
+                        continue
                     rtp_packet = RTPPacket.decode(packet_bytes)
                     self._process_packet(rtp_packet, addr)
                 except Exception as e:
-                    print(f"Error decoding RTP packet: {e}")
-            
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"Error in receiver loop: {e}")
-                if not self.running:
-                    break
+                    logger.warning("Error decoding RTP packet: %s", e)
+            now = self.clock()
+            if now >= self._next_nack:
+                self.resend_nacks(now)
+            if now >= self._next_rtcp:
+                self.send_report(now)
+            reporter.maybe_report(now)
         
-        print("Receiver stopped")
+        logger.info("Receiver stopped")
     
+    def _playout_timeout(self):
+        """Socket timeout until the next playout deadline"""
+        deadline = self.jitter_buffer.next_deadline()
+        if deadline is None:
+            return 0.02
+        return min(0.02, max(0.001, deadline - self.clock()))
+
+    def _playout(self):
+        """Play the frames whose deadline has passed"""
+        for packet in self.jitter_buffer.pop_due():
+            if packet is not None:
+                self._write_packet(packet)
+                self.last_nack_time.pop(packet.seq_num, None)
+        self.stats.update(self.jitter_buffer.stats())
+
     def _send_nack(self, missing_seq_nums):
         """Send NACK packet for missing sequence numbers"""
         if not self.sender_addr:
             return
         
-        current_time = time.time()
+        current_time = self.clock()
         # Filter sequence numbers that haven't been NACKed recently
         seq_nums_to_nack = []
         for seq_num in missing_seq_nums:
             if (seq_num not in self.last_nack_time or 
-                current_time - self.last_nack_time[seq_num] > self.nack_timeout):
+                self.last_nack_time[seq_num] + self.nack_timeout <= current_time):
                 seq_nums_to_nack.append(seq_num)
                 self.last_nack_time[seq_num] = current_time
         
         if seq_nums_to_nack:
+            self._next_nack = min(self._next_nack, current_time + self.nack_timeout)
             nack_packet = RTPPacket.create_nack(seq_nums_to_nack, self.stats.get('ssrc', 0))
-            self.socket.sendto(nack_packet.encode(), self.sender_addr)
+            self._sendto(nack_packet.encode(), self.sender_addr)
             self.stats['nacks_sent'] += 1
-            print(f"Sent NACK for sequences: {seq_nums_to_nack}")
+            logger.debug("Sent NACK for sequences: %s", seq_nums_to_nack)
+
+    def resend_nacks(self, now=None):
+        """NACK again the holes whose last NACK is nack_timeout old
+
+        Holes that were filled or given up are forgotten. Called from the
+        receive loop, or a timer, whenever ``_next_nack`` has passed.
+        """
+        if now is None:
+            now = self.clock()
+        missing = [ext & 0xFFFF for ext in self.reorder_buffer.missing()]
+        times = self.last_nack_time
+        times = self.last_nack_time = {seq: times[seq] for seq in missing if seq in times}
+        self._next_nack = float('inf')
+        if times:
+            self._send_nack([seq for seq, sent in times.items()
+                             if sent + self.nack_timeout <= now])
+            self._next_nack = min(times.values()) + self.nack_timeout
 
     def _process_packet(self, packet, addr):
         """Xử lý gói tin RTP nhận được"""
@@ -116,143 +276,171 @@ class RTPReceiver:
         if packet.payload_type == RTPPacket.PT_NACK:
             return
 
+        # FEC packets only feed the recovery index
+        if packet.payload_type == RTPPacket.PT_FEC:
+            self.fec_active = True
+            for recovered in self.fec_index.add_fec(packet):
+                self._process_recovered_packet(recovered)
+            return
+
+        if packet.payload_type == PT_CN:
+            # Sequenced like media; the sink turns it into noise until the next packet
+            self.stats['comfort_noise_received'] += 1
+
+        # The index keeps (copies of) media packets, so only feed it once the
+        # stream has carried FEC
+        recovered_packets = self.fec_index.add_media(packet) if self.fec_active else []
+        self._process_media_packet(packet)
+        for recovered in recovered_packets:
+            self._process_recovered_packet(recovered)
+
+    def _process_rtcp(self, data):
+        """Handle an RTCP packet: remember the sender reports for LSR/DLSR"""
+        arrival = self.clock()
+        for report in rtcp.parse(data):
+            if isinstance(report, rtcp.SenderReport) and self.reception \
+                    and report.ssrc == self.reception.ssrc:
+                self.reception.on_sender_report(report, arrival)
+
+    def send_report(self, now=None):
+        """Send an RTCP receiver report (RR + SDES) to the sender"""
+        if now is None:
+            now = self.clock()
+        if self.rtcp_interval:
+            self._next_rtcp = now + rtcp.report_interval(self.rtcp_interval, self.rng)
+        if not self.sender_addr or self.reception is None:
+            return
+        report = rtcp.ReceiverReport(self.ssrc, [self.reception.report_block(now)])
+        self._sendto(rtcp.encode_compound(report, self.cname), self.sender_addr)
+        self.stats['rtcp_sent'] += 1
+
+    def rtcp_stats(self):
+        """Reception figures reported over RTCP
+
+        Returns:
+            Dict with packets_lost, highest_seq, jitter_ms and the sender's
+            packet and octet counts from its last SR, empty before any media
+        """
+        return self.reception.stats() if self.reception else {}
+
+    def _process_recovered_packet(self, packet):
+        """Xử lý gói tin được khôi phục bằng FEC"""
+        buffer = self.reorder_buffer
+        ext = buffer.extend(packet.seq_num)
+        if buffer.head is not None and (ext < buffer.head or buffer.has(ext)):
+            # Already accepted (received before the index saw the stream, as
+            # media before the first FEC packet is) or past playout: nothing new
+            return
+        self.stats['fec_recovered'] += 1
+        self._process_media_packet(packet, recovered=True)
+
+    def _process_media_packet(self, packet, recovered=False):
+        """Xử lý gói tin media theo thứ tự"""
         self.stats['packets_received'] += 1
+        if not recovered:
+            reception = self.reception
+            if reception is None:
+                reception = self.reception = rtcp.ReceptionStats(packet.ssrc, self.clock_rate)
+            reception.update(packet.seq_num, packet.timestamp, self.clock())
+        buffer = self.reorder_buffer
+        ext = buffer.extend(packet.seq_num)
         
         # Kiểm tra thứ tự gói tin
-        if self.stats['last_seq'] is not None:
-            expected_seq = (self.stats['last_seq'] + 1) % 65536
-            
-            # If packet is in sequence
-            if packet.seq_num == expected_seq:
-                self._write_packet(packet)
-                # Process any buffered packets that are now in sequence
-                self._process_buffered_packets()
-            
-            # If packet is out of order
-            else:
-                if ((packet.seq_num < expected_seq and not (expected_seq > 60000 and packet.seq_num < 5000)) or
-                    (expected_seq < 5000 and packet.seq_num > 60000)):
-                    # Late packet - check if it was missing
-                    if packet.seq_num in self.missing_packets:
-                        self.missing_packets.remove(packet.seq_num)
-                        self.stats['retransmissions_received'] += 1
-                    else:
-                        self.stats['out_of_order'] += 1
-                    # Buffer the packet
-                    self.received_packets[packet.seq_num] = packet
-                else:
-                    # Gap in sequence numbers - mark packets as missing
-                    if packet.seq_num > expected_seq:
-                        missing_range = range(expected_seq, packet.seq_num)
-                    else:  # Sequence number wrapped around
-                        missing_range = list(range(expected_seq, 65536)) + list(range(0, packet.seq_num))
-                    
-                    for seq in missing_range:
-                        if seq not in self.received_packets:  # Don't mark buffered packets as missing
-                            self.missing_packets.add(seq)
-                    
-                    self.stats['lost_packets'] += len(missing_range)
-                    # Send NACK for missing packets
-                    self._send_nack(missing_range)
-                    # Buffer the current packet
-                    self.received_packets[packet.seq_num] = packet
-        else:
+        if buffer.head is None:
             # First packet
-            self._write_packet(packet)
-        
-        self.stats['last_seq'] = packet.seq_num
-        
-        # Clean up old buffered packets
-        if len(self.received_packets) > self.max_packet_buffer:
-            oldest_seq = min(self.received_packets.keys())
-            del self.received_packets[oldest_seq]
-            if oldest_seq in self.missing_packets:
-                self.missing_packets.remove(oldest_seq)
+            self._insert(ext, packet)
+        elif ext < buffer.head or buffer.has(ext):
+            # Already played out, skipped or duplicated
+            self.stats['out_of_order'] += 1
+            if self.jitter_buffer and ext < buffer.head:
+                self.jitter_buffer.put(packet, ext)  # Counted as a late drop
+        elif ext <= buffer.highest:
+            # Late packet filling a hole that was NACKed
+            if not recovered:
+                self.stats['retransmissions_received'] += 1
+            self._deliver(self._insert(ext, packet))
+        else:
+            # Gap in sequence numbers - the packets in between are missing
+            gap = ext - buffer.highest - 1
+            if gap:
+                self.stats['lost_packets'] += gap
+                # Only NACK what still fits in the reorder window
+                first = max(buffer.highest + 1, ext - buffer.capacity + 1)
+                self._send_nack([seq & 0xFFFF for seq in range(first, ext)])
+            self._deliver(self._insert(ext, packet))
         
-        # Print stats
-        loss_rate = self.stats['lost_packets'] / (self.stats['packets_received'] + self.stats['lost_packets']) * 100 if (self.stats['packets_received'] + self.stats['lost_packets']) > 0 else 0
-        print(f"Stats: Received={self.stats['packets_received']}, Lost={self.stats['lost_packets']}, "
-              f"Out-of-order={self.stats['out_of_order']}, Loss Rate={loss_rate:.2f}%, "
-              f"NACKs Sent={self.stats['nacks_sent']}, "
-              f"Retransmissions={self.stats['retransmissions_received']}")
+        if not self.jitter_buffer:
+            self._deliver(buffer.pop_ready())
+            if buffer.highest - buffer.head >= self.max_reorder:
+                # FEC and NACK had their chance: skip the hole and play on
+                self._deliver(buffer.advance(buffer.highest - self.max_reorder + 1))
+                self._deliver(buffer.pop_ready())
+        self.stats['last_seq'] = buffer.highest & 0xFFFF
+
+    def _insert(self, ext, packet):
+        """Buffer a packet, through the jitter buffer when enabled
+
+        Returns:
+            Packets pushed out of the reorder window
+        """
+        buffer = self.reorder_buffer
+        if self.jitter_buffer or (buffer.head is not None and ext != buffer.head):
+            # Kept past this batch: copy it out of the receive buffer
+            packet.detach()
+        if self.jitter_buffer:
+            return self.jitter_buffer.put(packet, ext)
+        return buffer.insert(ext, packet)
+
+    def _deliver(self, packets):
+        """Write in-order packets and forget their NACK state"""
+        for packet in packets:
+            self._write_packet(packet)
+            self.last_nack_time.pop(packet.seq_num, None)
 
     def _write_packet(self, packet):
-        """Write packet payload to audio file and update state"""
-        if self.audio_writer:
-            self.audio_writer.writeframes(packet.payload)
-        print(f"Processed packet: {packet}")
+        """Write packet payload to the sink"""
+        sink = self.sink
+        if sink:
+            sink.write(packet)
+            self.stats['concealed_frames'] = sink.concealed_frames
 
-    def _process_buffered_packets(self):
-        """Process any buffered packets that are now in sequence"""
-        while True:
-            next_seq = (self.stats['last_seq'] + 1) % 65536
-            if next_seq in self.received_packets:
-                packet = self.received_packets.pop(next_seq)
-                self._write_packet(packet)
-                self.stats['last_seq'] = next_seq
-                if next_seq in self.missing_packets:
-                    self.missing_packets.remove(next_seq)
-            else:
-                break
+    @property
+    def missing_packets(self):
+        """Sequence numbers currently missing from the reorder window"""
+        return set(ext & 0xFFFF for ext in self.reorder_buffer.missing())
 
     def process_packet(self, packet):
         """Process received packet and attempt recovery if needed"""
         with self.lock:
             if packet.payload_type == RTPPacket.PT_FEC:
-                # Store FEC packet
-                group_start = self._get_group_start(packet.seq_num)
-                self.fec_packets[group_start] = packet
-                return self._try_fec_recovery(group_start)
+                # Decode as soon as the group has enough symbols
+                return self._store_recovered(self.fec_index.add_fec(packet))
                 
             elif packet.payload_type == RTPPacket.PT_RTX:
                 # Handle retransmitted packet
-                original_payload = self.rtx_handler.process_rtx_packet(packet)
+                original_payload = packet.get_rtx_payload()
                 if original_payload:
                     seq_num = packet.get_original_seq_num()
-                    if seq_num in self.missing_packets:
-                        self.missing_packets.remove(seq_num)
-                        self.received_packets[seq_num] = original_payload
-                        return [original_payload]
+                    ext = self.reorder_buffer.extend(seq_num)
+                    if self.reorder_buffer.head is not None and ext <= self.reorder_buffer.highest \
+                            and ext >= self.reorder_buffer.head and not self.reorder_buffer.has(ext):
+                        original = RTPPacket(packet.payload_type, seq_num, packet.timestamp,
+                                             packet.ssrc, original_payload)
+                        self.reorder_buffer.insert(ext, original)
+                        return [original]
                 return []
                 
             else:
                 # Regular packet
-                self.received_packets[packet.seq_num] = packet
-                self._update_missing_packets(packet.seq_num)
-                return [packet]
-    
-    def _get_group_start(self, seq_num):
-        """Get the starting sequence number for the FEC group"""
-        return (seq_num // self.fec_handler.group_size) * self.fec_handler.group_size
-    
-    def _update_missing_packets(self, seq_num):
-        """Update the set of missing packets"""
-        if seq_num > self.next_seq:
-            # Add all missing sequence numbers
-            self.missing_packets.update(range(self.next_seq, seq_num))
-        self.next_seq = max(self.next_seq, seq_num + 1)
+                self.reorder_buffer.insert(self.reorder_buffer.extend(packet.seq_num), packet)
+                return [packet] + self._store_recovered(self.fec_index.add_media(packet))
     
-    def _try_fec_recovery(self, group_start):
-        """Try to recover missing packets using FEC"""
-        fec_packet = self.fec_packets.get(group_start)
-        if not fec_packet:
-            return []
-            
-        # Get available packets in the group
-        group_end = group_start + self.fec_handler.group_size
-        available_packets = []
-        for seq in range(group_start, group_end):
-            if seq in self.received_packets:
-                available_packets.append(self.received_packets[seq])
-        
-        # Try recovery
-        recovered_packet = self.fec_handler.recover_packet(fec_packet, available_packets)
-        if recovered_packet:
-            self.received_packets[recovered_packet.seq_num] = recovered_packet
-            self.missing_packets.remove(recovered_packet.seq_num)
-            return [recovered_packet]
-        
-        return []
+    def _store_recovered(self, recovered_packets):
+        """Store packets recovered by FEC"""
+        for packet in recovered_packets:
+            self.reorder_buffer.insert(self.reorder_buffer.extend(packet.seq_num), packet)
+            self.stats['fec_recovered'] += 1
+        return recovered_packets
     
     def request_retransmission(self):
         """Create NACK packet for missing packets"""
@@ -270,9 +458,4 @@ class RTPReceiver:
     def get_ordered_packets(self):
         """Get received packets in order"""
         with self.lock:
-            ordered = []
-            current_seq = min(self.received_packets.keys())
-            while current_seq in self.received_packets:
-                ordered.append(self.received_packets[current_seq])
-                current_seq += 1
-            return ordered
\ No newline at end of file
+            return self.reorder_buffer.peek_ready()
@@ -0,0 +1,329 @@
+"""
+RTCP sender and receiver reports (RFC 3550 section 6)
+
+RTCP travels on the RTP socket (RFC 5761 multiplexing, like the NACKs):
+``is_rtcp`` tells the two apart from the second byte of a datagram.
+
+The sender sends a compound SR + SDES(CNAME) packet every reporting
+interval. The receiver answers with RR + SDES. Its report block carries
+fraction lost, cumulative loss, the highest sequence number, interarrival
+jitter, and LSR/DLSR. The sender derives the round-trip time from these.
+``ReceptionStats`` keeps the per-source state in a few slots and updates
+it in O(1) per packet, so thousands of streams can run it.
+"""
+
+import random
+import struct
+import time
+
+PT_SR = 200
+PT_RR = 201
+PT_SDES = 202
+PT_BYE = 203
+
+SDES_CNAME = 1
+
+# Seconds between 1900-01-01 (NTP epoch) and 1970-01-01 (Unix epoch)
+NTP_EPOCH_OFFSET = 2208988800
+
+_HEADER = struct.Struct('!BBHI')  # V|P|RC, PT, length in words - 1, SSRC
+_SENDER_INFO = struct.Struct('!IIIII')  # NTP msw, NTP lsw, RTP ts, packets, octets
+_REPORT_BLOCK = struct.Struct('!IIIIII')  # SSRC, lost, highest seq, jitter, LSR, DLSR
+
+
+def is_rtcp(data):
+    """Check whether a datagram on the RTP socket is RTCP (RFC 5761)"""
+    return len(data) >= 8 and 192 <= data[1] <= 223
+
+
+def ntp_time(t=None):
+    """64-bit NTP timestamp of a Unix time, now by default"""
+    if t is None:
+        t = time.time()
+    return int((t + NTP_EPOCH_OFFSET) * 4294967296.0) & 0xFFFFFFFFFFFFFFFF
+
+
+def ntp_middle(ntp):
+    """Middle 32 bits of an NTP timestamp, as used by LSR"""
+    return (ntp >> 16) & 0xFFFFFFFF
+
+
+def report_interval(interval, rng=random):
+    """Randomize a reporting interval over [0.5, 1.5] x interval
+
+    Keeps the reports of many streams started together from staying in step.
+    ``rng`` is a seeded random.Random for reproducible runs.
+    """
+    return interval * rng.uniform(0.5, 1.5)
+
+
+class ReportBlock:
+    """Reception report about one source"""
+    __slots__ = ('ssrc', 'fraction_lost', 'packets_lost', 'highest_seq', 'jitter', 'lsr', 'dlsr')
+
+    def __init__(self, ssrc, fraction_lost=0, packets_lost=0, highest_seq=0, jitter=0, lsr=0, dlsr=0):
+        """
+        Args:
+            ssrc: Source the report is about
+            fraction_lost: Loss since the previous report, in 1/256
+            packets_lost: Cumulative number of packets lost (signed)
+            highest_seq: Extended highest sequence number received
+            jitter: Interarrival jitter in timestamp units
+            lsr: Middle 32 bits of the last SR NTP timestamp, 0 if none
+            dlsr: Delay since that SR in 1/65536 seconds
+        """
+        self.ssrc = ssrc
+        self.fraction_lost = fraction_lost
+        self.packets_lost = packets_lost
+        self.highest_seq = highest_seq
+        self.jitter = jitter
+        self.lsr = lsr
+        self.dlsr = dlsr
+
+    def pack_into(self, buffer, offset):
+        lost = max(-0x800000, min(0x7FFFFF, self.packets_lost)) & 0xFFFFFF
+        _REPORT_BLOCK.pack_into(buffer, offset, self.ssrc, (self.fraction_lost << 24) | lost,
+                                self.highest_seq & 0xFFFFFFFF, self.jitter & 0xFFFFFFFF,
+                                self.lsr, self.dlsr & 0xFFFFFFFF)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset):
+        ssrc, lost, highest_seq, jitter, lsr, dlsr = _REPORT_BLOCK.unpack_from(buffer, offset)
+        packets_lost = lost & 0xFFFFFF
+        if packets_lost & 0x800000:
+            packets_lost -= 0x1000000
+        return cls(ssrc, lost >> 24, packets_lost, highest_seq, jitter, lsr, dlsr)
+
+
+class ReceiverReport:
+    """RTCP RR: reception report blocks from a receiver"""
+    packet_type = PT_RR
+
+    def __init__(self, ssrc, blocks=()):
+        self.ssrc = ssrc
+        self.blocks = list(blocks)
+
+    def _body_size(self):
+        return 0
+
+    def _pack_body(self, buffer, offset):
+        pass
+
+    def encode(self):
+        """Encode as one RTCP packet"""
+        if len(self.blocks) > 31:
+            raise ValueError("At most 31 report blocks fit in one RTCP packet")
+        size = _HEADER.size + self._body_size() + len(self.blocks) * _REPORT_BLOCK.size
+        buffer = bytearray(size)
+        _HEADER.pack_into(buffer, 0, 0x80 | len(self.blocks), self.packet_type, size // 4 - 1,
+                          self.ssrc)
+        self._pack_body(buffer, _HEADER.size)
+        offset = _HEADER.size + self._body_size()
+        for block in self.blocks:
+            block.pack_into(buffer, offset)
+            offset += _REPORT_BLOCK.size
+        return bytes(buffer)
+
+
+class SenderReport(ReceiverReport):
+    """RTCP SR: sender info plus optional report blocks"""
+    packet_type = PT_SR
+
+    def __init__(self, ssrc, ntp_timestamp, rtp_timestamp, packet_count, octet_count, blocks=()):
+        """
+        Args:
+            ssrc: Sender SSRC
+            ntp_timestamp: 64-bit NTP wallclock time of the report
+            rtp_timestamp: RTP timestamp matching that time
+            packet_count: Media packets sent so far
+            octet_count: Payload octets sent so far
+            blocks: Report blocks about the sources the sender receives
+        """
+        super().__init__(ssrc, blocks)
+        self.ntp_timestamp = ntp_timestamp
+        self.rtp_timestamp = rtp_timestamp
+        self.packet_count = packet_count
+        self.octet_count = octet_count
+
+    def _body_size(self):
+        return _SENDER_INFO.size
+
+    def _pack_body(self, buffer, offset):
+        _SENDER_INFO.pack_into(buffer, offset, self.ntp_timestamp >> 32,
+                               self.ntp_timestamp & 0xFFFFFFFF, self.rtp_timestamp & 0xFFFFFFFF,
+                               self.packet_count & 0xFFFFFFFF, self.octet_count & 0xFFFFFFFF)
+
+
+def encode_sdes(ssrc, cname):
+    """RTCP SDES packet with one CNAME item"""
+    text = cname.encode()[:255]
+    chunk = struct.pack('!IBB', ssrc, SDES_CNAME, len(text)) + text
+    chunk += bytes(4 - len(chunk) % 4)  # Null item ends the chunk and pads it
+    return struct.pack('!BBH', 0x81, PT_SDES, len(chunk) // 4) + chunk
+
+
+def encode_compound(report, cname):
+    """Compound packet: the SR or RR followed by SDES CNAME, as RFC 3550 requires"""
+    return report.encode() + encode_sdes(report.ssrc, cname)
+
+
+def parse(data):
+    """Parse a (compound) RTCP packet
+
+    Returns:
+        SenderReport and ReceiverReport objects, other packet types skipped
+
+    Raises:
+        ValueError: If the packet is truncated or not RTCP version 2
+    """
+    reports = []
+    offset = 0
+    end = len(data)
+    while offset < end:
+        if end - offset < 4:
+            raise ValueError("Truncated RTCP header")
+        first_byte, packet_type, length = struct.unpack_from('!BBH', data, offset)
+        if first_byte >> 6 != 2:
+            raise ValueError("Not an RTCP version 2 packet")
+        size = (length + 1) * 4
+        if offset + size > end:
+            raise ValueError("RTCP packet longer than the datagram")
+        count = first_byte & 0x1F
+        if packet_type in (PT_SR, PT_RR):
+            body = offset + _HEADER.size
+            if packet_type == PT_SR:
+                body += _SENDER_INFO.size
+            if body + count * _REPORT_BLOCK.size > offset + size:
+                raise ValueError("RTCP report blocks exceed the packet length")
+            ssrc = _HEADER.unpack_from(data, offset)[3]
+            blocks = [ReportBlock.unpack_from(data, body + i * _REPORT_BLOCK.size)
+                      for i in range(count)]
+            if packet_type == PT_SR:
+                msw, lsw, rtp_ts, packets, octets = _SENDER_INFO.unpack_from(data, offset + _HEADER.size)
+                reports.append(SenderReport(ssrc, (msw << 32) | lsw, rtp_ts, packets, octets, blocks))
+            else:
+                reports.append(ReceiverReport(ssrc, blocks))
+        offset += size
+    return reports
+
+
+class ReceptionStats:
+    """Reception state of one source for RR report blocks
+
+    Implements the RFC 3550 A.1 sequence extension, the A.3 loss
+    computation and the A.8 incremental jitter estimate. Jitter is only
+    updated by packets that advance the sequence. Retransmitted packets
+    carry old timestamps and would inflate it.
+    """
+    __slots__ = ('ssrc', 'clock_rate', 'base_seq', 'max_seq', 'received', 'expected_prior',
+                 'received_prior', 'jitter', '_transit', 'lsr', 'lsr_arrival',
+                 'sender_packets', 'sender_octets')
+
+    def __init__(self, ssrc, clock_rate=8000):
+        """
+        Args:
+            ssrc: Source SSRC
+            clock_rate: RTP timestamp units per second
+        """
+        self.ssrc = ssrc
+        self.clock_rate = clock_rate
+        self.base_seq = None  # Extended sequence numbers, first cycle is 0
+        self.max_seq = None
+        self.received = 0
+        self.expected_prior = 0
+        self.received_prior = 0
+        self.jitter = 0.0  # Timestamp units
+        self._transit = None
+        self.lsr = 0
+        self.lsr_arrival = 0.0
+        self.sender_packets = 0
+        self.sender_octets = 0
+
+    def update(self, seq_num, timestamp, arrival):
+        """Account for one received media packet
+
+        Args:
+            seq_num: 16-bit RTP sequence number
+            timestamp: RTP timestamp
+            arrival: Arrival time in seconds (monotonic clock)
+        """
+        self.received += 1
+        max_seq = self.max_seq
+        if max_seq is None:
+            self.base_seq = self.max_seq = seq_num
+        else:
+            ext = max_seq + ((seq_num - max_seq + 32768) & 0xFFFF) - 32768
+            if ext <= max_seq:
+                if ext < self.base_seq:
+                    self.base_seq = ext
+                return
+            self.max_seq = ext
+
+        transit = arrival * self.clock_rate - timestamp
+        previous = self._transit
+        self._transit = transit
+        if previous is not None:
+            # Timestamps wrap at 2^32
+            d = (transit - previous + 2147483648.0) % 4294967296.0 - 2147483648.0
+            if d < 0:
+                d = -d
+            self.jitter += (d - self.jitter) / 16.0
+
+    def on_sender_report(self, report, arrival):
+        """Remember the last SR for LSR/DLSR"""
+        self.lsr = ntp_middle(report.ntp_timestamp)
+        self.lsr_arrival = arrival
+        self.sender_packets = report.packet_count
+        self.sender_octets = report.octet_count
+
+    @property
+    def packets_lost(self):
+        if self.max_seq is None:
+            return 0
+        return self.max_seq - self.base_seq + 1 - self.received
+
+    def report_block(self, now):
+        """Build the report block and start a new loss interval
+
+        Args:
+            now: Current time on the clock used for arrivals
+        """
+        expected = self.max_seq - self.base_seq + 1 if self.max_seq is not None else 0
+        expected_interval = expected - self.expected_prior
+        received_interval = self.received - self.received_prior
+        self.expected_prior = expected
+        self.received_prior = self.received
+        lost_interval = expected_interval - received_interval
+        fraction = 0
+        if expected_interval > 0 and lost_interval > 0:
+            fraction = min(255, (lost_interval << 8) // expected_interval)
+        dlsr = int((now - self.lsr_arrival) * 65536) if self.lsr else 0
+        return ReportBlock(self.ssrc, fraction, expected - self.received,
+                           self.max_seq or 0, int(self.jitter), self.lsr, dlsr)
+
+    def stats(self):
+        """Reception figures: loss, jitter and the last SR counters"""
+        return {
+            'packets_lost': self.packets_lost,
+            'highest_seq': (self.max_seq or 0) & 0xFFFFFFFF,
+            'jitter_ms': self.jitter * 1000.0 / self.clock_rate,
+            'sender_packets': self.sender_packets,
+            'sender_octets': self.sender_octets,
+        }
+
+
+def round_trip_time(block, arrival_ntp=None):
+    """RTT in seconds from a report block about our SR, None if unknown
+
+    Args:
+        block: ReportBlock received from the remote receiver
+        arrival_ntp: NTP time the report arrived, now by default
+    """
+    if not block.lsr:
+        return None
+    if arrival_ntp is None:
+        arrival_ntp = ntp_time()
+    rtt = (ntp_middle(arrival_ntp) - block.lsr - block.dlsr) & 0xFFFFFFFF
+    if rtt >= 0x80000000:
+        return None  # Clock went backwards or garbage
+    return rtt / 65536.0
@@ -1,63 +1,166 @@
+import logging
 import socket
 import threading
 import time
 import random
-import wave
-from rtp.core.packet import RTPPacket
+from rtp.core import rtcp
+from rtp.core.packet import RTPPacket, RTPHeaderTemplate
 from rtp.utils.fec import FECHandler
 from rtp.utils.retransmission import RetransmissionHandler
+from rtp.utils.packet_history import PacketHistory
+from rtp.utils.media import WaveSource
+from rtp.utils.codecs import PT_CN, PT_PCM16, get_codec
+from rtp.utils.vad import encode_comfort_noise
+from rtp.utils.packetizer import IP_UDP_OVERHEAD, Packetizer
+from rtp.utils.socket_io import BufferPool, recv_batch, send_batch
+from rtp.utils.metrics import MetricsRegistry, MetricsReporter
+
+logger = logging.getLogger(__name__)
+
+# stats key -> exported counter
+SENDER_COUNTERS = (
+    ('packets_sent', 'rtp_packets_sent_total', 'Media packets sent'),
+    ('bytes_sent', 'rtp_bytes_sent_total', 'Media bytes sent, headers included'),
+    ('fec_sent', 'rtp_fec_packets_sent_total', 'FEC packets sent'),
+    ('frames_suppressed', 'rtp_frames_suppressed_total', 'Silent frames not sent (DTX)'),
+    ('comfort_noise_sent', 'rtp_comfort_noise_sent_total', 'Comfort noise packets sent'),
+    ('nacks_received', 'rtp_nacks_received_total', 'NACK packets received'),
+    ('retransmissions_sent', 'rtp_retransmissions_sent_total', 'Packets retransmitted'),
+    ('rtcp_sent', 'rtp_sender_reports_sent_total', 'RTCP sender reports sent'),
+    ('rtcp_received', 'rtp_receiver_reports_received_total', 'RTCP receiver reports received'),
+)
 
 class RTPSender:
-    def __init__(self, dest_ip, dest_port, payload_type=RTPPacket.PT_AUDIO, ssrc=None, initial_seq_num=0, group_size=4):
+    def __init__(self, dest_ip, dest_port, payload_type=RTPPacket.PT_AUDIO, ssrc=None, initial_seq_num=0, group_size=4,
+                 history_size=1000, history_ms=None, send_fec=False, metrics=None,
+                 stats_interval=1.0, rtcp_interval=5.0, clock=time.monotonic, rng=None, ptime=20,
+                 mtu=1500, vad=None, cn_interval=0.5):
         self.dest_ip = dest_ip
         self.dest_port = dest_port
         self.payload_type = payload_type
+        self.codec = get_codec(payload_type)  # Encodes audio frames, None to send them raw
         self.seq_num = initial_seq_num
         self.timestamp = 0
-        self.ssrc = ssrc if ssrc else random.randint(0, 2**32-1)
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rng = rng or random  # SSRC and RTCP timing, seeded in simulations
+        self.ssrc = ssrc if ssrc else self.rng.randint(0, 2**32-1)
+        self.socket = self._open_socket()
         self.running = False
-        self.timestamp_increment = 160  # Tăng mỗi gói (ví dụ cho 20ms audio @ 8kHz)
-        self.audio_file = None
+        self.packet_count = 0  # Frames sent by tick()
+        self.clock_rate = 8000
+        # ptime of audio per packet within the MTU, leaving room for FEC and RTX headers
+        self.packetizer = Packetizer(self.codec, ptime, mtu, fec=True, rtx=True,
+                                     clock_rate=self.clock_rate)
+        self.timestamp_increment = self.packetizer.samples_per_packet  # 160 = 20ms @ 8kHz
+        self._talkspurt = True  # The next packet starts a talkspurt and gets the marker bit
         
-        # For packet retransmission
-        self.packet_history = {}  # Store recent packets for retransmission
-        self.history_size = 1000  # Number of packets to keep in history
-        self.lock = threading.Lock()  # For thread-safe access to packet history
+        # Silence suppression: frames the VAD finds silent are not sent; a comfort
+        # noise packet goes out when the silence starts and every cn_interval seconds
+        self.vad = vad
+        self.cn_interval = cn_interval
+        self._frames_since_cn = None  # None while talking
+        self.audio_source = None  # WaveSource the payloads are read from
+        self.clock = clock  # Time source for RTCP and stats, virtual in simulations
+        self._wall_offset = time.time() - clock()  # clock() -> wall time for NTP timestamps
+        self.header_template = RTPHeaderTemplate(payload_type, self.ssrc)
+        self._header_templates = {payload_type: self.header_template}
+        
+        # For packet retransmission: ring of recently sent packets, read
+        # without locking by the NACK listener. Slots hold the largest
+        # datagram the MTU allows, not a fixed 1500 bytes
+        self.history_size = history_size  # Number of packets to keep in history
+        self.packet_history = PacketHistory(history_size, slot_size=mtu - IP_UDP_OVERHEAD,
+                                            retention_ms=history_ms, clock=clock)
         
         self.fec_handler = FECHandler(group_size=group_size)
-        self.rtx_handler = RetransmissionHandler()
+        self.send_fec = send_fec  # Send FEC packets alongside the media stream
+        self._nack_pool = None  # Receive buffers for NACKs, created on first poll
+        self.rtx_handler = RetransmissionHandler(history=self.packet_history)  # Same ring
+        
+        # RTCP: sender reports every rtcp_interval seconds, receiver reports
+        # come back on the same socket as the NACKs
+        self.rtcp_interval = rtcp_interval
+        self.cname = f"{self.ssrc:08x}@{socket.gethostname()}"
+        self.feedback = {}  # Latest receiver report about this stream
+        self._next_rtcp = (clock() + rtcp.report_interval(rtcp_interval, self.rng)
+                           if rtcp_interval else float('inf'))
+        
+        self.stats = {key: 0 for key, _, _ in SENDER_COUNTERS}
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.reporter = MetricsReporter(self._register_metrics(self.metrics), logger, stats_interval,
+                                        clock=clock)
+
+    def _register_metrics(self, registry):
+        """Register the sender metrics and return them"""
+        stats = self.stats
+        metrics = [registry.counter(name, help, fn=lambda key=key: stats[key])
+                   for key, name, help in SENDER_COUNTERS]
+        # Filled by the drift-free sender loop
+        self.send_lateness = registry.histogram('rtp_send_lateness_seconds',
+                                                'Delay of each send after its deadline')
+        metrics.append(self.send_lateness)
+        metrics.append(registry.gauge('rtp_rtt_seconds', 'Round-trip time from RTCP',
+                                      fn=lambda: self.feedback.get('rtt_ms', 0.0) / 1000.0))
+        metrics.append(registry.gauge('rtp_remote_fraction_lost', 'Loss reported by the receiver',
+                                      fn=lambda: self.feedback.get('fraction_lost', 0.0)))
+        return metrics
+
+    def _open_socket(self):
+        """Create the UDP socket used for sending and NACKs"""
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-    def set_audio_file(self, wav_path):
-        self.audio_file = wave.open(wav_path, "rb")
-        assert self.audio_file.getnchannels() == 1
-        assert self.audio_file.getframerate() == 8000
-        assert self.audio_file.getsampwidth() == 2
+    def _send_batch(self, datagrams):
+        """Send the datagrams produced in one tick to the destination"""
+        send_batch(self.socket, datagrams, (self.dest_ip, self.dest_port))
+
+    def set_audio_file(self, wav_path, cache_dir=None):
+        """Stream a WAV file, converted to 16-bit mono at the RTP clock rate
+        
+        Args:
+            wav_path: WAV file in any rate, channel count or PCM format
+            cache_dir: Directory where converted audio is kept between runs
+        """
+        self.audio_source = WaveSource(wav_path, sample_rate=self.clock_rate,
+                                       frame_samples=self.timestamp_increment, cache_dir=cache_dir)
     
-    def create_packet(self, payload, payload_type=RTPPacket.PT_AUDIO):
-        """Create a new RTP packet"""
+    def create_packet(self, payload, payload_type=None, marker=0, samples=None):
+        """Create a new RTP packet
+        
+        Args:
+            payload: Encoded payload
+            payload_type: Payload type, the stream's if None
+            marker: Marker bit, set on the first packet of a talkspurt
+            samples: Samples in the payload, counted from its length if None
+        """
         packet = RTPPacket(
-            payload_type=payload_type,
+            payload_type=self.payload_type if payload_type is None else payload_type,
             seq_num=self.seq_num,
             timestamp=self.timestamp,
             ssrc=self.ssrc,
             payload=payload
         )
-        self.seq_num += 1
-        self.timestamp += len(payload)  # Simple timestamp increment
+        packet.marker = marker
+        if samples is None:
+            samples = len(payload) // self.packetizer.codec.bytes_per_sample
+        self.seq_num = (self.seq_num + 1) % 65536
+        self.timestamp = (self.timestamp + samples) % (2**32)
         return packet
+
+    def _next_marker(self):
+        """Marker bit of the next packet: set once at the start of a talkspurt"""
+        marker = 1 if self._talkspurt else 0
+        self._talkspurt = False
+        return marker
         
     def process_packet(self, packet):
         """Process packet before sending, including FEC and retransmission handling"""
         # Store packet for potential retransmission
         self.rtx_handler.add_packet(packet)
         
-        # Generate FEC packet if group is complete
-        fec_packet = self.fec_handler.add_packet(packet)
+        # Generate FEC packets if group is complete
+        fec_packets = self.fec_handler.add_packet(packet)
         
         packets_to_send = [packet]
-        if fec_packet:
-            packets_to_send.append(fec_packet)
+        packets_to_send.extend(fec_packets)
             
         return packets_to_send
         
@@ -65,56 +168,73 @@ class RTPSender:
         """Handle NACK packet and return retransmission packets"""
         return self.rtx_handler.handle_nack(nack_packet)
     
-    def send_audio(self, audio_data, chunk_size=1024):
-        """Send audio data in chunks"""
-        packets = []
+    def send_audio(self, audio_data):
+        """Packetize 16-bit PCM into packets of one ptime, fragmented to the MTU
         
-        # Split audio data into chunks
-        for i in range(0, len(audio_data), chunk_size):
-            chunk = audio_data[i:i + chunk_size]
-            packet = self.create_packet(chunk)
-            processed_packets = self.process_packet(packet)
-            packets.extend(processed_packets)
-            
+        Returns:
+            The media packets followed by any FEC packets they completed
+        """
+        packets = []
+        for payload, samples in self.packetizer.split(audio_data):
+            packet = self.create_packet(payload, marker=self._next_marker(), samples=samples)
+            packets.extend(self.process_packet(packet))
         return packets
     
-    def send_packet(self, payload):
-        """Gửi một gói tin RTP với payload được cung cấp"""
-        packet = RTPPacket(
-            payload_type=self.payload_type,
-            seq_num=self.seq_num,
-            timestamp=self.timestamp,
-            ssrc=self.ssrc,
-            payload=payload
-        )
+    def send_packet(self, payload, marker=0, samples=None, payload_type=None):
+        """Gửi một gói tin RTP với payload được cung cấp
         
-        # Đóng gói và gửi
-        packet_bytes = packet.encode()
-        self.socket.sendto(packet_bytes, (self.dest_ip, self.dest_port))
-        
-        # Store packet for potential retransmission
-        with self.lock:
-            self.packet_history[self.seq_num] = packet_bytes
-            # Remove old packets if history is too large
-            if len(self.packet_history) > self.history_size:
-                oldest_seq = min(self.packet_history.keys())
-                del self.packet_history[oldest_seq]
+        Args:
+            payload: Encoded payload
+            marker: Marker bit
+            samples: Samples in the payload, one ptime if None
+            payload_type: Payload type, the stream's if None
+
+        Returns:
+            Sequence number of the packet sent. Earlier versions returned
+            the RTPPacket; none is built here unless FEC needs one, so use
+            ``create_packet`` for a packet object.
+        """
+        if payload_type is None:
+            payload_type = self.payload_type
+        template = self._header_templates.get(payload_type)
+        if template is None:
+            template = self._header_templates[payload_type] = RTPHeaderTemplate(payload_type,
+                                                                                self.ssrc)
+        # Đóng gói thẳng vào slot của history rồi gửi (không copy trung gian)
+        seq_num = self.seq_num
+        slot = self.packet_history.reserve(seq_num)
+        length = template.pack_into(slot, seq_num, self.timestamp, payload, marker)
+        self.packet_history.commit(seq_num, length)
+        datagrams = [slot[:length]]
         
-        print(f"Sent: {packet}")
+        if self.send_fec:
+            # The FEC encoder takes packets; only build one when it needs it
+            packet = RTPPacket(payload_type, seq_num, self.timestamp, self.ssrc, payload)
+            packet.marker = marker
+            datagrams.extend(fec_packet.encode() for fec_packet in self.fec_handler.add_packet(packet))
+            self.stats['fec_sent'] += len(datagrams) - 1
+        self._send_batch(datagrams)
+        stats = self.stats
+        stats['packets_sent'] += 1
+        stats['bytes_sent'] += length
         
         # Cập nhật số thứ tự và timestamp
-        self.seq_num = (self.seq_num + 1) % 65536
-        self.timestamp = (self.timestamp + self.timestamp_increment) % (2**32)
+        self.seq_num = (seq_num + 1) % 65536
+        if samples is None:
+            samples = self.timestamp_increment
+        self.timestamp = (self.timestamp + samples) % (2**32)
         
-        return packet
+        return seq_num
     
-    def start_sending(self, interval=0.02, duration=None):
+    def start_sending(self, interval=None, duration=None):
         """Bắt đầu luồng gửi gói tin RTP theo chu kỳ
         
         Args:
-            interval: Khoảng thời gian giữa các gói tin (giây)
+            interval: Khoảng thời gian giữa các gói tin (giây), ptime nếu None
             duration: Thời gian chạy (giây), None để chạy vô hạn
         """
+        if interval is None:
+            interval = self.packetizer.ptime / 1000
         self.running = True
         # Start sender thread
         self.sender_thread = threading.Thread(target=self._sender_loop, args=(interval, duration))
@@ -134,52 +254,159 @@ class RTPSender:
         if hasattr(self, 'nack_thread'):
             self.nack_thread.join(timeout=1.0)
     
+    def _next_payload(self, packet_count):
+        """Payload to send when there is no audio file, or None to stop
+
+        The payload is sent as is, with payload type PT_PCM16, not encoded
+        with the stream's codec.
+        """
+        return f"Packet {packet_count} data".encode()
+
+    def _send_frame(self, frame):
+        """Send one ptime of 16-bit PCM, or suppress it if the VAD finds it silent"""
+        samples = len(frame) // 2
+        if self.vad is not None and not self.vad.is_active(frame):
+            self._suppress_frame(samples)
+            return
+        self._frames_since_cn = None
+        payload = self.codec.encode(frame) if self.codec is not None else frame
+        for fragment, fragment_samples in self.packetizer.fragment(payload, samples):
+            self.send_packet(fragment, self._next_marker(), fragment_samples)
+
+    def _suppress_frame(self, samples):
+        """Skip a silent frame, sending comfort noise at the start and then periodically"""
+        frames = self._frames_since_cn
+        if frames is None or frames * self.packetizer.ptime >= self.cn_interval * 1000:
+            self.send_packet(encode_comfort_noise(self.vad.level), samples=0,
+                             payload_type=PT_CN)
+            self.stats['comfort_noise_sent'] += 1
+            frames = 0
+        self._frames_since_cn = frames + 1
+        self._talkspurt = True  # Speech resuming after this gets the marker bit
+        self.timestamp = (self.timestamp + samples) % (2**32)
+        self.stats['frames_suppressed'] += 1
+
+    def tick(self):
+        """Send the next packet, for use by a scheduler
+        
+        Returns:
+            False once there is nothing left to send
+        """
+        if self.audio_source:
+            frame = self.audio_source.read()
+            if frame is None:
+                return False
+            self._send_frame(frame)
+        else:
+            payload = self._next_payload(self.packet_count)
+            if payload is None:
+                return False
+            # Synthetic payloads advance the timestamp by one ptime. They are
+            # not audio in the stream's codec, so they go out as raw PCM16
+            # rather than as PCMU the receiver would decode into noise
+            for fragment, samples in self.packetizer.fragment(payload):
+                self.send_packet(fragment, self._next_marker(), samples, payload_type=PT_PCM16)
+        self.packet_count += 1
+        now = self.clock()
+        if now >= self._next_rtcp:
+            self.send_report(now)
+        self.reporter.maybe_report(now)
+        return True
+
+    def send_report(self, now=None):
+        """Send an RTCP sender report (SR + SDES) to the destination"""
+        if now is None:
+            now = self.clock()
+        stats = self.stats
+        header_size = self.header_template.header_size
+        report = rtcp.SenderReport(self.ssrc, rtcp.ntp_time(now + self._wall_offset), self.timestamp,
+                                   stats['packets_sent'],
+                                   stats['bytes_sent'] - stats['packets_sent'] * header_size)
+        self._send_batch([rtcp.encode_compound(report, self.cname)])
+        stats['rtcp_sent'] += 1
+        if self.rtcp_interval:
+            self._next_rtcp = now + rtcp.report_interval(self.rtcp_interval, self.rng)
+
+    def _handle_rtcp(self, data):
+        """Take RTT, loss and jitter from the receiver reports about this stream"""
+        arrival_ntp = rtcp.ntp_time(self.clock() + self._wall_offset)
+        for report in rtcp.parse(data):
+            for block in report.blocks:
+                if block.ssrc != self.ssrc:
+                    continue
+                self.stats['rtcp_received'] += 1
+                feedback = {
+                    'fraction_lost': block.fraction_lost / 256.0,
+                    'packets_lost': block.packets_lost,
+                    'highest_seq': block.highest_seq,
+                    'jitter_ms': block.jitter * 1000.0 / self.clock_rate,
+                }
+                rtt = rtcp.round_trip_time(block, arrival_ntp)
+                if rtt is not None:
+                    feedback['rtt_ms'] = rtt * 1000.0
+                elif 'rtt_ms' in self.feedback:
+                    feedback['rtt_ms'] = self.feedback['rtt_ms']
+                self.feedback = feedback
+
     def _sender_loop(self, interval, duration):
-        start_time = time.time()
-        packet_count = 0
+        # Deadlines are absolute so the time spent sending does not add up as drift
+        start_time = time.monotonic()
+        first_count = self.packet_count
+        next_time = start_time
+        lateness = self.send_lateness
         while self.running:
-            if self.audio_file:
-                frame = self.audio_file.readframes(160)
-                if not frame:
-                    break
-                payload = frame
-            else:
-                payload = f"Packet {packet_count} data".encode()
-            self.send_packet(payload)
-            packet_count += 1
-            if duration and (time.time() - start_time) >= duration:
+            lateness.observe(max(0.0, time.monotonic() - next_time))
+            if not self.tick():
+                break
+            next_time = start_time + (self.packet_count - first_count) * interval
+            if duration and next_time - start_time >= duration:
                 break
-            time.sleep(interval)
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
         self.running = False
-        print(f"Sender stopped after {packet_count} packets")
+        logger.info("Sender stopped after %d packets", self.packet_count)
 
     def _nack_listener(self):
         """Listen for and handle NACK packets"""
-        self.socket.settimeout(0.1)  # 100ms timeout
         while self.running:
             try:
-                data, addr = self.socket.recvfrom(2048)
-                try:
-                    packet = RTPPacket.decode(data)
-                    if packet.payload_type == RTPPacket.PT_NACK:
-                        self._handle_nack(packet, addr)
-                except Exception as e:
-                    print(f"Error processing NACK: {e}")
-            except socket.timeout:
-                continue
+                self.poll_nacks(0.1)  # 100ms timeout
             except Exception as e:
                 if self.running:
-                    print(f"Error in NACK listener: {e}")
+                    logger.error("Error in NACK listener: %s", e)
+
+    def poll_nacks(self, timeout=0.0):
+        """Handle the NACK and RTCP packets waiting on the socket
+        
+        Args:
+            timeout: Seconds to wait for the first packet
+        """
+        if self._nack_pool is None:
+            self.socket.settimeout(None)  # recv_batch waits with select
+            self._nack_pool = BufferPool(16)
+        for data, addr in recv_batch(self.socket, self._nack_pool, timeout):
+            try:
+                if rtcp.is_rtcp(data):
+                    self._handle_rtcp(data)
+                    continue
+                packet = RTPPacket.decode(data)
+                if packet.payload_type == RTPPacket.PT_NACK:
+                    self._handle_nack(packet, addr)
+            except Exception as e:
+                logger.warning("Error processing NACK: %s", e)
     
     def _handle_nack(self, nack_packet, addr):
         """Handle NACK packet by retransmitting requested packets"""
         missing_seq_nums = nack_packet.get_nack_sequence_numbers()
-        print(f"Received NACK for sequences: {missing_seq_nums}")
-        
-        with self.lock:
-            for seq_num in missing_seq_nums:
-                if seq_num in self.packet_history:
-                    # Retransmit the packet
-                    packet_data = self.packet_history[seq_num]
-                    self.socket.sendto(packet_data, (self.dest_ip, self.dest_port))
-                    print(f"Retransmitted packet {seq_num}")
\ No newline at end of file
+        logger.debug("Received NACK for sequences: %s", missing_seq_nums)
+        
+        retransmissions = []
+        for seq_num in missing_seq_nums:
+            packet_data = self.packet_history.get(seq_num)
+            if packet_data is not None:
+                retransmissions.append(packet_data)
+        # Retransmit the packets in one batch
+        self._send_batch(retransmissions)
+        self.stats['nacks_received'] += 1
+        self.stats['retransmissions_sent'] += len(retransmissions)
\ No newline at end of file
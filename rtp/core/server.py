@@ -0,0 +1,281 @@
+import logging
+import socket
+import threading
+import time
+from rtp.core import rtcp
+from rtp.core.packet import RTPPacket
+from rtp.utils.reorder_buffer import ReorderBuffer
+from rtp.utils.socket_io import BufferPool, recv_batch
+from rtp.utils.metrics import MetricsRegistry, MetricsReporter
+
+logger = logging.getLogger(__name__)
+
+
+class RTPStream:
+    """State of one inbound stream of an RTPServer
+
+    Memory is bounded per stream: the reorder buffer has a fixed number of
+    slots and NACK times are only kept for packets inside its window. A hole
+    is given up once ``max_reorder`` later packets are buffered behind it, so
+    a packet that never comes back does not stall playout until the window
+    is full; the sink fills in what was lost.
+    """
+    __slots__ = ('ssrc', 'addr', 'sink', 'buffer', 'max_reorder', 'nack_times', 'last_seen',
+                 'received', 'lost', 'out_of_order', 'nacks_sent', 'retransmissions')
+
+    def __init__(self, ssrc, addr, sink=None, capacity=256, now=0.0, max_reorder=50):
+        self.ssrc = ssrc
+        self.addr = addr  # Latest source address, NACKs go there
+        self.sink = sink
+        self.buffer = ReorderBuffer(capacity)
+        self.max_reorder = max_reorder
+        self.nack_times = {}  # Extended seq -> time of the last NACK
+        self.last_seen = now
+        self.received = 0
+        self.lost = 0
+        self.out_of_order = 0
+        self.nacks_sent = 0
+        self.retransmissions = 0
+
+    def receive(self, packet, now, nack_timeout=0.1):
+        """Process a media packet of this stream
+
+        Returns:
+            Sequence numbers to NACK, empty if none
+        """
+        self.received += 1
+        self.last_seen = now
+        buffer = self.buffer
+        ext = buffer.extend(packet.seq_num)
+        to_nack = []
+
+        if buffer.head is None:
+            buffer.insert(ext, packet)
+        elif ext < buffer.head or buffer.has(ext):
+            # Already played out, skipped or duplicated
+            self.out_of_order += 1
+            return to_nack
+        else:
+            if ext <= buffer.highest:
+                self.retransmissions += 1
+            elif ext > buffer.highest + 1:
+                self.lost += ext - buffer.highest - 1
+                # NACK what still fits in the reorder window
+                first = max(buffer.highest + 1, ext - buffer.capacity + 1)
+                nack_times = self.nack_times
+                for missing in range(first, ext):
+                    if now - nack_times.get(missing, -nack_timeout) >= nack_timeout:
+                        nack_times[missing] = now
+                        to_nack.append(missing & 0xFFFF)
+            if ext != buffer.head:
+                packet.detach()  # Kept past this batch
+            self._write(buffer.insert(ext, packet))
+
+        self._write(buffer.pop_ready())
+        if buffer.highest - buffer.head >= self.max_reorder:
+            # NACKs had their chance: skip the hole and play on
+            self._write(buffer.advance(buffer.highest - self.max_reorder + 1))
+            self._write(buffer.pop_ready())
+        if len(self.nack_times) > buffer.capacity:
+            head = buffer.head
+            self.nack_times = {ext: t for ext, t in self.nack_times.items() if ext >= head}
+        if to_nack:
+            self.nacks_sent += 1
+        return to_nack
+
+    def _write(self, packets):
+        nack_times = self.nack_times
+        sink = self.sink
+        for packet in packets:
+            if nack_times:
+                nack_times.pop(self.buffer.extend(packet.seq_num), None)
+            if sink is not None:
+                sink.write(packet)
+
+    def close(self):
+        """Flush the buffered packets in order and close the sink"""
+        buffer = self.buffer
+        if buffer.head is not None:
+            self._write(buffer.advance(buffer.highest + 1))
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+
+    def stats(self):
+        """Counters of this stream"""
+        return {
+            'ssrc': self.ssrc,
+            'packets_received': self.received,
+            'lost_packets': self.lost,
+            'out_of_order': self.out_of_order,
+            'nacks_sent': self.nacks_sent,
+            'retransmissions_received': self.retransmissions,
+            'buffered': len(self.buffer),
+        }
+
+
+class RTPServer:
+    """Receives many RTP streams on one socket, demultiplexed by SSRC
+
+    Every SSRC gets an RTPStream with its own sequence tracking, reorder
+    buffer, NACK state, counters and sink. Streams that stay silent for
+    ``idle_timeout`` seconds are flushed and dropped.
+
+    A sink is any object with ``write(packet)`` and ``close()``; the
+    ``sink_factory(ssrc, addr)`` callback creates one per new stream.
+    """
+    def __init__(self, bind_ip, bind_port, sink_factory=None, idle_timeout=30.0,
+                 reorder_capacity=256, max_streams=10000, clock=time.monotonic, metrics=None,
+                 stats_interval=1.0, max_reorder=50):
+        """
+        Args:
+            bind_ip: Address to listen on
+            bind_port: Port to listen on, 0 for any
+            sink_factory: Callable (ssrc, addr) -> sink, None to discard media
+            idle_timeout: Seconds without packets before a stream is dropped
+            reorder_capacity: Reorder window per stream in packets
+            max_streams: Streams beyond this number are ignored
+            clock: Time source in seconds
+            metrics: MetricsRegistry to register the server metrics in
+            stats_interval: Seconds between logged stats snapshots, None for none
+            max_reorder: Packets buffered behind a hole before it is given up
+        """
+        self.bind_ip = bind_ip
+        self.bind_port = bind_port
+        self.sink_factory = sink_factory
+        self.idle_timeout = idle_timeout
+        self.reorder_capacity = reorder_capacity
+        self.max_reorder = max_reorder
+        self.max_streams = max_streams
+        self.clock = clock
+        self.nack_timeout = 0.1  # Wait 100ms before resending NACK
+        self.recv_batch_size = 64
+        self.streams = {}  # SSRC -> RTPStream
+        self.stats = {
+            'streams_opened': 0,
+            'streams_expired': 0,
+            'streams_rejected': 0,
+            'invalid_packets': 0,
+            'ignored_packets': 0,
+        }
+        self.running = False
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((bind_ip, bind_port))
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.reporter = MetricsReporter(self._register_metrics(self.metrics), logger,
+                                        stats_interval, clock=clock)
+
+    def _register_metrics(self, registry):
+        """Register the server metrics and return them"""
+        stats = self.stats
+        metrics = [registry.counter(f'rtp_server_{key}_total', fn=lambda key=key: stats[key])
+                   for key in stats]
+        metrics.append(registry.gauge('rtp_server_streams', 'Active streams',
+                                      fn=lambda: len(self.streams)))
+        # Stream counters are summed when collected; expired streams drop out
+        for attr, name in (('received', 'rtp_server_packets_received'),
+                           ('lost', 'rtp_server_packets_lost'),
+                           ('nacks_sent', 'rtp_server_nacks_sent')):
+            metrics.append(registry.gauge(name, f'Sum over active streams of {attr}',
+                                          fn=lambda attr=attr: self._sum_streams(attr)))
+        return metrics
+
+    def _sum_streams(self, attr):
+        return sum(getattr(stream, attr) for stream in list(self.streams.values()))
+
+    @property
+    def local_address(self):
+        """Address the socket is bound to"""
+        return self.socket.getsockname()
+
+    def start(self):
+        """Start the receive thread"""
+        self.running = True
+        self.server_thread = threading.Thread(target=self._serve)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        logger.info("RTP server started on %s:%d", self.bind_ip, self.local_address[1])
+
+    def stop(self):
+        """Stop receiving and close every stream"""
+        self.running = False
+        if hasattr(self, 'server_thread'):
+            self.server_thread.join(timeout=1.0)
+        self.socket.close()
+        for stream in self.streams.values():
+            stream.close()
+        self.streams.clear()
+
+    def _serve(self):
+        self.socket.settimeout(None)  # recv_batch waits with select
+        pool = BufferPool(self.recv_batch_size)
+        next_expiry = self.clock() + 1.0
+        while self.running:
+            try:
+                batch = recv_batch(self.socket, pool, 0.5)
+            except Exception as e:
+                if not self.running:
+                    break
+                logger.error("Error in server loop: %s", e)
+                continue
+            now = self.clock()
+            for data, addr in batch:
+                self.handle_datagram(data, addr, now)
+            if now >= next_expiry:
+                self.expire_idle(now)
+                next_expiry = now + 1.0
+            self.reporter.maybe_report(now)
+
+    def handle_datagram(self, data, addr, now=None):
+        """Route one received datagram to its stream"""
+        if rtcp.is_rtcp(data):
+            self.stats['ignored_packets'] += 1
+            return
+        try:
+            packet = RTPPacket.decode(data)
+        except ValueError:
+            self.stats['invalid_packets'] += 1
+            return
+        if packet.payload_type in (RTPPacket.PT_NACK, RTPPacket.PT_FEC):
+            self.stats['ignored_packets'] += 1
+            return
+        if now is None:
+            now = self.clock()
+
+        stream = self.streams.get(packet.ssrc)
+        if stream is None:
+            if len(self.streams) >= self.max_streams:
+                self.stats['streams_rejected'] += 1
+                return
+            sink = self.sink_factory(packet.ssrc, addr) if self.sink_factory else None
+            stream = self.streams[packet.ssrc] = RTPStream(
+                packet.ssrc, addr, sink, self.reorder_capacity, now, self.max_reorder)
+            self.stats['streams_opened'] += 1
+        stream.addr = addr
+
+        to_nack = stream.receive(packet, now, self.nack_timeout)
+        if to_nack:
+            nack_packet = RTPPacket.create_nack(to_nack, packet.ssrc)
+            try:
+                self.socket.sendto(nack_packet.encode(), addr)
+            except OSError as e:
+                logger.warning("Error sending NACK: %s", e)
+
+    def expire_idle(self, now=None):
+        """Flush and drop the streams idle for longer than idle_timeout
+
+        Returns:
+            SSRCs of the dropped streams
+        """
+        if now is None:
+            now = self.clock()
+        deadline = now - self.idle_timeout
+        expired = [ssrc for ssrc, stream in self.streams.items() if stream.last_seen < deadline]
+        for ssrc in expired:
+            self.streams.pop(ssrc).close()
+        self.stats['streams_expired'] += len(expired)
+        return expired
+
+    def stream_stats(self):
+        """Counters of every active stream keyed by SSRC"""
+        return {ssrc: stream.stats() for ssrc, stream in list(self.streams.items())}
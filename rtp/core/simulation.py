@@ -0,0 +1,345 @@
+"""
+In-process discrete-event simulation of a call
+
+An RTPSender and an RTPReceiver are wired together through two
+SimulatedLinks, one per direction, that apply the same impairment models
+as ``SimulatedNetwork``. Everything runs on a virtual clock: events are
+taken from a heap in time order and the clock jumps to each one, so a
+one-hour call takes seconds and the real NACK, FEC, jitter buffer and RTCP
+code paths run with their timing intact.
+
+Example:
+    call = CallSimulation(duration=3600, drop_rate=0.05, burst_length=2.0,
+                          fec_group_size=4, seed=1)
+    results = call.run()
+    print(results['residual_loss'])
+"""
+
+import heapq
+import random
+from rtp.config import default_config
+from rtp.core import rtcp
+from rtp.core.packet import RTPPacket
+from rtp.core.sender import RTPSender
+from rtp.core.receiver import RTPReceiver
+from rtp.utils.impairments import NetworkModel
+
+SENDER_ADDR = ('sender', 0)
+RECEIVER_ADDR = ('receiver', 0)
+
+
+class _Event:
+    """Scheduled callback, cancellable like an asyncio TimerHandle"""
+    __slots__ = ('_when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when, callback, args):
+        self._when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def when(self):
+        return self._when
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Simulation:
+    """Discrete-event loop on a virtual clock
+
+    The instance is callable and returns the current virtual time, so it
+    can be passed as the ``clock`` of senders, receivers and buffers.
+    """
+    def __init__(self, start=0.0):
+        self.now = start
+        self.events = 0  # Callbacks run so far
+        self._heap = []
+        self._counter = 0  # Keeps events at the same time in FIFO order
+
+    def __call__(self):
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        """Run callback(*args) at virtual time when
+
+        Returns:
+            Handle with ``cancel()`` and ``when()``
+        """
+        event = _Event(max(when, self.now), callback, args)
+        heapq.heappush(self._heap, (event._when, self._counter, event))
+        self._counter += 1
+        return event
+
+    def call_later(self, delay, callback, *args):
+        """Run callback(*args) delay seconds from now"""
+        return self.call_at(self.now + delay, callback, *args)
+
+    def run(self, until=None):
+        """Run events in time order
+
+        Args:
+            until: Stop before the first event after this time and leave the
+                clock there, None to run until no events are left
+        """
+        heap = self._heap
+        while heap:
+            when, _, event = heap[0]
+            if until is not None and when > until:
+                break
+            heapq.heappop(heap)
+            if event.cancelled:
+                continue
+            self.now = when
+            event.callback(*event.args)
+            self.events += 1
+        if until is not None:
+            self.now = max(self.now, until)
+
+
+class SimulatedLink:
+    """One direction of a simulated network path
+
+    Every datagram sent goes through the NetworkModel and is delivered to
+    ``deliver(data, addr)`` after ``latency`` plus the delay the model gives
+    each copy.
+
+    Attributes:
+        stats: sent, dropped, duplicated and delivered datagram counts
+    """
+    def __init__(self, simulation, deliver, model, latency=0.0, source=None):
+        """
+        Args:
+            simulation: Simulation scheduling the deliveries
+            deliver: Called with (data, source) for every delivered copy
+            model: NetworkModel impairing the datagrams
+            latency: Fixed one-way delay in seconds
+            source: Address reported as the sender of the datagrams
+        """
+        self.simulation = simulation
+        self.deliver = deliver
+        self.model = model
+        self.latency = latency
+        self.source = source
+        self.stats = {'sent': 0, 'dropped': 0, 'duplicated': 0, 'delivered': 0}
+
+    def send(self, data):
+        """Send one datagram"""
+        stats = self.stats
+        stats['sent'] += 1
+        copies = self.model.schedule(1)
+        if not copies:
+            stats['dropped'] += 1
+            return
+        stats['duplicated'] += len(copies) - 1
+        data = bytes(data)  # The sender's history slot is reused later
+        for _, delay in copies:
+            self.simulation.call_later(self.latency + delay, self._deliver, data)
+
+    def _deliver(self, data):
+        self.stats['delivered'] += 1
+        self.deliver(data, self.source)
+
+
+class SimulatedSender(RTPSender):
+    """RTPSender sending through a SimulatedLink instead of a socket"""
+    def __init__(self, *args, payload_size=160, packet_limit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.link = None
+        self.payload = bytes(payload_size)
+        self.packet_limit = packet_limit
+
+    def _open_socket(self):
+        return None
+
+    def _send_batch(self, datagrams):
+        for data in datagrams:
+            self.link.send(data)
+
+    def _next_payload(self, packet_count):
+        if self.packet_limit is not None and packet_count >= self.packet_limit:
+            return None
+        return self.payload
+
+    def datagram_received(self, data, addr):
+        """Handle a NACK or RTCP packet from the reverse link"""
+        try:
+            if rtcp.is_rtcp(data):
+                self._handle_rtcp(data)
+                return
+            packet = RTPPacket.decode(data)
+        except ValueError:
+            return
+        if packet.payload_type == RTPPacket.PT_NACK:
+            self._handle_nack(packet, addr)
+
+
+class SimulatedReceiver(RTPReceiver):
+    """RTPReceiver fed by a SimulatedLink, with playout on simulation events
+
+    Attributes:
+        accepted: Media packets taken into the reorder or jitter buffer, each
+            sequence number once: received, retransmitted or recovered in time
+    """
+    def __init__(self, simulation, *args, **kwargs):
+        super().__init__('127.0.0.1', 0, *args, clock=simulation, **kwargs)
+        self.simulation = simulation
+        self.link = None
+        self.accepted = 0
+        self._playout_timer = None
+        self._nack_timer = None
+
+    def _open_socket(self):
+        return None
+
+    def _sendto(self, data, addr):
+        self.link.send(data)
+
+    def _write_packet(self, packet):
+        pass
+
+    def _insert(self, ext, packet):
+        self.accepted += 1
+        return super()._insert(ext, packet)
+
+    def datagram_received(self, data, addr):
+        if rtcp.is_rtcp(data):
+            self._process_rtcp(data)
+        else:
+            self._process_packet(RTPPacket.decode(data), addr)
+        if self.jitter_buffer:
+            self._schedule_playout()
+        self._schedule_nack()
+        now = self.simulation.now
+        if now >= self._next_rtcp:
+            self.send_report(now)
+
+    def _schedule_playout(self):
+        """Arm the playout event for the next deadline"""
+        deadline = self.jitter_buffer.next_deadline()
+        if deadline is None:
+            return
+        timer = self._playout_timer
+        if timer is not None:
+            if timer.when() <= deadline:
+                return
+            timer.cancel()
+        self._playout_timer = self.simulation.call_at(deadline, self._on_playout)
+
+    def _on_playout(self):
+        self._playout_timer = None
+        self._playout()
+        self._schedule_playout()
+
+    def _schedule_nack(self):
+        """Arm the re-NACK event for when the oldest open NACK is due"""
+        if self._nack_timer is None and self._next_nack != float('inf'):
+            self._nack_timer = self.simulation.call_at(self._next_nack, self._on_nack)
+
+    def _on_nack(self):
+        self._nack_timer = None
+        self.resend_nacks()
+        self._schedule_nack()
+
+
+class CallSimulation:
+    """One sender streaming to one receiver over simulated links
+
+    Network parameters default to ``RTPConfig``'s ``SimulatedNetwork``
+    settings and are applied to both directions, each with its own random
+    generator derived from ``seed``.
+    """
+    def __init__(self, duration=60.0, interval=0.02, drop_rate=default_config.drop_rate,
+                 max_delay=default_config.max_delay, reorder_rate=default_config.reorder_rate,
+                 duplicate_rate=default_config.duplicate_rate, burst_length=default_config.burst_length,
+                 latency=0.02, fec_group_size=None, history_size=default_config.history_size,
+                 history_ms=None, nack_timeout=0.1, use_jitter_buffer=False, rtcp_interval=default_config.rtcp_interval,
+                 payload_size=160, seed=None):
+        """
+        Args:
+            duration: Call length in virtual seconds
+            interval: Time between media packets in seconds
+            latency: Fixed one-way delay added to the model's delay
+            fec_group_size: Media packets per XOR FEC group, None for no FEC
+            history_size: Packets the sender keeps for retransmission
+            history_ms: Virtual milliseconds a packet stays retransmittable,
+                None to keep it until its slot is reused
+            nack_timeout: Seconds before the receiver NACKs a sequence again
+            use_jitter_buffer: Play out through the adaptive jitter buffer,
+                so packets arriving after their deadline count as lost
+            rtcp_interval: Seconds between RTCP reports, None to disable
+            seed: Seed for the network models, None for a random run
+        """
+        self.duration = duration
+        self.interval = interval
+        self.simulation = Simulation()
+        rng = random.Random(seed)
+
+        def model():
+            return NetworkModel.from_rates(drop_rate, max_delay, reorder_rate, duplicate_rate,
+                                           burst_length, seed=rng.getrandbits(64))
+
+        self.sender = SimulatedSender(
+            RECEIVER_ADDR[0], RECEIVER_ADDR[1], rng=random.Random(rng.getrandbits(64)),
+            group_size=fec_group_size or 4, history_size=history_size, history_ms=history_ms,
+            send_fec=bool(fec_group_size), stats_interval=None, rtcp_interval=rtcp_interval,
+            clock=self.simulation, payload_size=payload_size,
+            packet_limit=int(round(duration / interval)))
+        self.receiver = SimulatedReceiver(self.simulation, group_size=fec_group_size or 4,
+                                          use_jitter_buffer=use_jitter_buffer,
+                                          stats_interval=None, rtcp_interval=rtcp_interval,
+                                          rng=random.Random(rng.getrandbits(64)))
+        self.receiver.nack_timeout = nack_timeout
+        self.forward = SimulatedLink(self.simulation, self.receiver.datagram_received, model(),
+                                     latency, source=SENDER_ADDR)
+        self.reverse = SimulatedLink(self.simulation, self.sender.datagram_received, model(),
+                                     latency, source=RECEIVER_ADDR)
+        self.sender.link = self.forward
+        self.receiver.link = self.reverse
+
+    def _tick(self):
+        """Send one packet and schedule the next on the exact deadline"""
+        if self.sender.tick():
+            self.simulation.call_at(self.sender.packet_count * self.interval, self._tick)
+
+    def run(self, drain=2.0):
+        """Run the call, then drain packets in flight for drain seconds
+
+        Returns:
+            Dict of results, see ``results``
+        """
+        self.simulation.call_at(0.0, self._tick)
+        self.simulation.run(until=self.duration + drain)
+        if self.receiver.jitter_buffer:
+            self.receiver._playout()
+        return self.results()
+
+    def results(self):
+        """Stream outcome so far
+
+        Returns:
+            Dict with the sender and receiver stats, residual_loss (media
+            never accepted by the receiver in time), network_loss (datagrams
+            dropped on the forward link), overhead (FEC and retransmissions
+            per media packet), rtt_ms from RTCP and the number of events run
+        """
+        sender_stats = self.sender.stats
+        receiver_stats = self.receiver.stats
+        sent = sender_stats['packets_sent']
+        forward = self.forward.stats
+        return {
+            'packets_sent': sent,
+            'accepted': self.receiver.accepted,
+            'residual_loss': 1.0 - self.receiver.accepted / sent if sent else 0.0,
+            'network_loss': forward['dropped'] / forward['sent'] if forward['sent'] else 0.0,
+            'overhead': ((sender_stats['fec_sent'] + sender_stats['retransmissions_sent']) / sent
+                         if sent else 0.0),
+            'nacks_sent': receiver_stats['nacks_sent'],
+            'retransmissions_sent': sender_stats['retransmissions_sent'],
+            'retransmissions_received': receiver_stats['retransmissions_received'],
+            'fec_sent': sender_stats['fec_sent'],
+            'fec_recovered': receiver_stats['fec_recovered'],
+            'late_drops': receiver_stats.get('late_drops', 0),
+            'rtt_ms': self.sender.feedback.get('rtt_ms'),
+            'events': self.simulation.events,
+        }
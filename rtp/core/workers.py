@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import sys
+from rtp.core.receiver import RTPReceiver, RECEIVER_COUNTERS
+from rtp.utils.sinks import MmapWaveSink, NullSink
+
+logger = logging.getLogger(__name__)
+
+# Receiver counters that add up across workers
+SUMMED_STATS = ('packets_received', 'lost_packets', 'out_of_order', 'nacks_sent',
+                'retransmissions_received', 'fec_recovered', 'late_drops', 'deadline_losses',
+                'rtcp_sent', 'comfort_noise_received', 'concealed_frames')
+SINKS = ('wave', 'mmap', 'null')
+
+
+def _worker_main(index, bind_ip, bind_port, output_path, sink, options, stop_event,
+                 stats_queue, stats_interval, quiet):
+    """Run one RTPReceiver until stop_event is set, reporting its stats"""
+    # The parent handles Ctrl+C and asks the workers to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+        logging.getLogger('rtp').setLevel(logging.WARNING)
+
+    receiver = RTPReceiver(bind_ip, bind_port, reuse_port=True, **options)
+    receiver.start_receiving(output_path, sink=_open_sink(sink, output_path, receiver.clock_rate))
+    while not stop_event.wait(stats_interval):
+        stats_queue.put((index, False, _snapshot(receiver.stats)))
+    # stop_receiving flushes and closes the output before the final report
+    receiver.stop_receiving()
+    stats_queue.put((index, True, _snapshot(receiver.stats)))
+
+
+def _open_sink(sink, output_path, sample_rate):
+    """Sink of one worker, None for the receiver's default WAV writer"""
+    if sink == 'null':
+        return NullSink(sample_rate=sample_rate)
+    if sink == 'mmap' and output_path:
+        return MmapWaveSink(output_path, sample_rate=sample_rate)
+    return None
+
+
+def _snapshot(stats):
+    while True:
+        try:
+            return dict(stats)
+        except RuntimeError:
+            continue  # Receiver thread added a key while copying
+
+
+class ReceiverWorkers:
+    """RTPReceiver sharded over worker processes with SO_REUSEPORT
+
+    Every worker binds the same port, so the kernel spreads flows across them
+    by address hash, and runs the regular RTPReceiver in its own process and
+    GIL. Workers report their counters over a queue; ``stats()`` merges them
+    into one view. ``stop()`` lets each worker flush and close its output.
+    """
+    def __init__(self, bind_ip, bind_port, workers, output_pattern="received-{worker}.wav",
+                 sink='wave', stats_interval=0.5, quiet=False, **receiver_options):
+        """
+        Args:
+            bind_ip: Address to listen on
+            bind_port: Port shared by every worker
+            workers: Number of worker processes
+            output_pattern: WAV path per worker, formatted with ``worker``,
+                None to discard audio
+            sink: Output of each worker: 'wave' (WAV written in the
+                background), 'mmap' (memory-mapped WAV) or 'null'
+            stats_interval: Seconds between stats reports of each worker
+            quiet: Silence the workers' console output
+            receiver_options: Extra RTPReceiver arguments
+        """
+        if workers < 1:
+            raise ValueError("Need at least one worker")
+        if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+            raise ValueError("SO_REUSEPORT is not supported on this platform")
+        if bind_port == 0 and workers > 1:
+            raise ValueError("Workers must share an explicit port")
+        if sink not in SINKS:
+            raise ValueError(f"Unknown sink {sink!r}, expected one of {', '.join(SINKS)}")
+        self.bind_ip = bind_ip
+        self.bind_port = bind_port
+        self.workers = workers
+        self.output_pattern = output_pattern
+        self.sink = sink
+        self.stats_interval = stats_interval
+        self.quiet = quiet
+        self.receiver_options = receiver_options
+        self.worker_stats = [{} for _ in range(workers)]
+        self.finished = [False] * workers
+        self._stop_event = multiprocessing.Event()
+        self._stats_queue = multiprocessing.Queue()
+        self._processes = []
+
+    def start(self):
+        """Start the worker processes"""
+        for index in range(self.workers):
+            output_path = self.output_pattern.format(worker=index) if self.output_pattern else None
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, self.bind_ip, self.bind_port, output_path, self.sink,
+                      self.receiver_options, self._stop_event, self._stats_queue, self.stats_interval, self.quiet),
+                daemon=True)
+            process.start()
+            self._processes.append(process)
+        logger.info("Started %d receiver workers on %s:%d", self.workers, self.bind_ip, self.bind_port)
+
+    def poll_stats(self, timeout=0.0):
+        """Collect the stats reports waiting in the queue"""
+        while True:
+            try:
+                index, final, stats = self._stats_queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            self.worker_stats[index] = stats
+            if final:
+                self.finished[index] = True
+            timeout = 0.0
+
+    def stats(self):
+        """Counters summed over every worker, plus the per-worker view"""
+        self.poll_stats()
+        total = {key: sum(stats.get(key, 0) for stats in self.worker_stats)
+                 for key in SUMMED_STATS}
+        total['workers'] = self.workers
+        total['per_worker'] = [dict(stats) for stats in self.worker_stats]
+        return total
+
+    def register_metrics(self, registry):
+        """Export the summed worker counters in a MetricsRegistry"""
+        names = {key: (name, help) for key, name, help in RECEIVER_COUNTERS}
+        for key in SUMMED_STATS:
+            name, help = names.get(key, (f'rtp_{key}_total', ''))
+            registry.counter(name, help, fn=lambda key=key: self.stats()[key])
+
+    def stop(self, timeout=5.0):
+        """Ask every worker to flush and exit, then collect their final stats"""
+        self._stop_event.set()
+        deadline = timeout
+        while not all(self.finished) and deadline > 0:
+            self.poll_stats(timeout=0.1)
+            deadline -= 0.1
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self.poll_stats()
+        return self.stats()
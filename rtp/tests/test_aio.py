@@ -0,0 +1,77 @@
+"""
+Tests for the asyncio sender and receiver
+"""
+
+import asyncio
+import contextlib
+import io
+import unittest
+from ..core.aio import AsyncRTPSender, AsyncRTPReceiver
+from ..core.packet import RTPPacket
+
+class TestAsyncStreams(unittest.TestCase):
+    def _run(self, coro):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(coro)
+
+    def test_stream_with_nack(self):
+        """Test a lost packet is NACKed and retransmitted on the event loop"""
+        async def scenario():
+            receiver = AsyncRTPReceiver("127.0.0.1", 0)
+            written = []
+            receiver._write_packet = lambda packet: written.append(packet.seq_num)
+            await receiver.start()
+
+            sender = AsyncRTPSender("127.0.0.1", receiver.local_address[1], ssrc=1)
+            send = sender._send_batch
+            dropped = []
+
+            def lossy_send_batch(datagrams):
+                # Drop the first copy of packet 3
+                if sender.seq_num == 3 and not dropped:
+                    dropped.append(3)
+                    return
+                send(datagrams)
+
+            sender._send_batch = lossy_send_batch
+            await sender.start(interval=0.005)
+            for _ in range(200):
+                if len(written) >= 10:
+                    break
+                await asyncio.sleep(0.01)
+            sender.stop_sending()
+            await sender.wait_closed()
+            receiver.stop_receiving()
+            return written[:10], receiver.stats
+
+        written, stats = self._run(scenario())
+        self.assertEqual(written, list(range(10)))
+        self.assertEqual(stats['nacks_sent'], 1)
+        self.assertEqual(stats['retransmissions_received'], 1)
+
+    def test_duration_stops_sender(self):
+        """Test the sender stops itself after the requested duration"""
+        async def scenario():
+            sender = AsyncRTPSender("127.0.0.1", 9, ssrc=1)
+            await sender.start(interval=0.01, duration=0.05)
+            await asyncio.wait_for(sender.wait_closed(), 1.0)
+            return sender.packet_count
+
+        self.assertEqual(self._run(scenario()), 5)
+
+    def test_receiver_reports_on_injected_clock(self):
+        """Test RTCP timing in datagram_received follows the receiver's clock"""
+        now = [1000.0]
+        receiver = AsyncRTPReceiver("127.0.0.1", 0, clock=lambda: now[0], rtcp_interval=5.0,
+                                    stats_interval=None)
+        reports = []
+        receiver.send_report = reports.append
+        packet = RTPPacket(seq_num=0, timestamp=0, ssrc=1, payload=bytes(160))
+        receiver.datagram_received(packet.encode(), ('127.0.0.1', 9))
+        self.assertEqual(reports, [])
+        now[0] = receiver._next_rtcp
+        receiver.datagram_received(packet.encode(), ('127.0.0.1', 9))
+        self.assertEqual(reports, [now[0]])
+
+if __name__ == '__main__':
+    unittest.main()
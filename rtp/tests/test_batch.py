@@ -0,0 +1,51 @@
+"""
+Tests for batch RTP encoding/decoding
+"""
+
+import unittest
+import numpy as np
+from ..core.packet import RTPPacket
+
+class TestPacketBatch(unittest.TestCase):
+    def setUp(self):
+        self.packets = [
+            RTPPacket(seq_num=(65534 + i) % 65536, timestamp=i * 160,
+                      ssrc=0x1234, payload=bytes([i]) * (10 + i))
+            for i in range(6)
+        ]
+        self.packets[2].marker = 1
+        self.packets[3].csrc = [7, 8]
+        self.packets[3].cc = 2
+    
+    def test_encode_many_matches_encode(self):
+        """Test batch encoding produces the same datagrams as encode"""
+        batch = RTPPacket.encode_many(self.packets)
+        
+        self.assertEqual(len(batch), len(self.packets))
+        for i, packet in enumerate(self.packets):
+            self.assertEqual(bytes(batch.datagram(i)), packet.encode())
+            self.assertEqual(batch.payload(i), packet.payload)
+    
+    def test_decode_many_columns(self):
+        """Test batch decoding fills the header columns"""
+        batch = RTPPacket.decode_many([p.encode() for p in self.packets] + [b"short"])
+        headers = batch.headers
+        
+        self.assertEqual(list(headers['seq_num'][:6]), [p.seq_num for p in self.packets])
+        self.assertEqual(list(headers['timestamp'][:6]), [p.timestamp for p in self.packets])
+        self.assertEqual(list(headers['marker'][:6]), [0, 0, 1, 0, 0, 0])
+        self.assertEqual(list(headers['valid']), [True] * 6 + [False])
+        self.assertEqual(batch.payload(3), self.packets[3].payload)
+        self.assertEqual(batch.packet(3).csrc, [7, 8])
+    
+    def test_loss_and_reorder_helpers(self):
+        """Test sequence unwrapping, loss detection and ordering"""
+        order = [0, 2, 1, 5, 4]  # packet 3 lost, wraps at 65535 -> 0
+        batch = RTPPacket.decode_many([self.packets[i].encode() for i in order])
+        
+        self.assertEqual(list(batch.extended_seq_nums()), [65534, 65536, 65535, 65539, 65538])
+        self.assertEqual(list(batch.missing_seq_nums()), [1])
+        self.assertEqual([order[i] for i in batch.playout_order()], [0, 1, 2, 4, 5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the G.711 codecs
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+import numpy as np
+from ..core.packet import RTPPacket
+from ..core.sender import RTPSender
+from ..utils.codecs import PCMA, PCMU, PCM16, get_codec
+from ..utils.sinks import NullSink
+
+class TestCodecs(unittest.TestCase):
+    def test_g711_reference_values(self):
+        """Test known G.711 codes and that decoding inverts encoding within a step"""
+        samples = np.array([0, 32767, -32768, 1000, -1000], dtype='<i2')
+        self.assertEqual(PCMU.encode(samples.tobytes()), bytes([0xFF, 0x80, 0x00, 0xCE, 0x4E]))
+        self.assertEqual(PCMA.encode(samples.tobytes()), bytes([0xD5, 0xAA, 0x2A, 0xFA, 0x7A]))
+
+        ramp = np.arange(-32768, 32768, 7, dtype='<i2')
+        for codec in (PCMU, PCMA):
+            decoded = np.frombuffer(codec.decode(codec.encode(ramp.tobytes())), dtype='<i2')
+            error = np.abs(decoded.astype(int) - ramp)
+            # Quantization steps grow with the magnitude, up to 1024 in the top segment
+            self.assertTrue(np.all(error <= np.maximum(64, np.abs(ramp.astype(int)) // 16)))
+            codes = bytes(range(256))
+            if codec is PCMU:
+                codes = codes.replace(b'\x7f', b'\xff')  # -0 and +0 both decode to 0
+            self.assertEqual(codec.encode(codec.decode(bytes(range(256)))), codes)
+
+    def test_registry(self):
+        """Test codecs are found by payload type and case-insensitive name"""
+        self.assertIs(get_codec(0), PCMU)
+        self.assertIs(get_codec('pcma'), PCMA)
+        self.assertIs(get_codec(RTPPacket.PT_AUDIO), PCM16)
+        self.assertIsNone(get_codec(RTPPacket.PT_FEC))
+
+    def test_sender_encodes_and_sink_decodes(self):
+        """Test a PCMU sender halves the payload and a sink restores 16-bit PCM"""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'tone.wav')
+            tone = np.rint(np.sin(np.arange(1600) / 10) * 8000).astype('<i2')
+            with wave.open(path, 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(8000)
+                w.writeframes(tone.tobytes())
+            sender = RTPSender('127.0.0.1', 9, payload_type=0, stats_interval=None,
+                               rtcp_interval=None)
+            sender.socket.close()
+            sent = []
+            sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+            sender.set_audio_file(path)
+            while sender.tick():
+                pass
+        finally:
+            shutil.rmtree(directory)
+
+        packets = [RTPPacket.decode(data) for data in sent]
+        self.assertEqual(len(packets), 10)
+        self.assertTrue(all(p.payload_type == 0 and len(p.payload) == 160 for p in packets))
+        sink = NullSink()
+        frames = []
+        sink.write_frames = frames.append
+        for packet in packets:
+            sink.write(packet)
+        decoded = np.frombuffer(b''.join(frames), dtype='<i2')
+        self.assertEqual(len(decoded), 1600)
+        self.assertLess(np.abs(decoded.astype(int) - tone).max(), 300)
+
+    def test_synthetic_payloads_are_not_sent_as_the_codec(self):
+        """Test a PCMU sender without audio sends its fallback payloads as raw PCM16"""
+        sender = RTPSender('127.0.0.1', 9, payload_type=0, stats_interval=None,
+                           rtcp_interval=None)
+        sender.socket.close()
+        sent = []
+        sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+        sender.tick()
+        sender.tick()
+
+        packets = [RTPPacket.decode(data) for data in sent]
+        self.assertEqual([p.payload_type for p in packets], [PCM16.payload_type] * 2)
+        self.assertEqual(packets[1].payload, b"Packet 1 data")
+        self.assertEqual(packets[1].timestamp, 160)  # Still one ptime per packet
+
+if __name__ == '__main__':
+    unittest.main()
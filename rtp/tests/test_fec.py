@@ -0,0 +1,133 @@
+"""
+Tests for FEC encoding and recovery
+"""
+
+import unittest
+from ..core.packet import RTPPacket
+from ..core.sender import RTPSender
+from ..utils.fec import FECHandler, FECRecoveryIndex
+
+class TestFECHandler(unittest.TestCase):
+    def setUp(self):
+        self.handler = FECHandler(group_size=4)
+        self.packets = [
+            RTPPacket(seq_num=65534 + i if i < 2 else i - 2, timestamp=1000 + i * 160,
+                      ssrc=0x1234, payload=bytes([i + 1]) * (20 + 7 * i))
+            for i in range(4)
+        ]
+        self.packets[1].marker = 1
+    
+    def _protect(self, handler):
+        fec_packets = []
+        for p in self.packets:
+            fec_packets += handler.add_packet(p)
+        return fec_packets
+    
+    def test_fec_packet_generated_per_group(self):
+        """Test an FEC packet is emitted once the group is complete"""
+        results = [self.handler.add_packet(p) for p in self.packets]
+        
+        self.assertEqual(results[:3], [[], [], []])
+        self.assertEqual(len(results[3]), 1)
+        self.assertEqual(results[3][0].payload_type, RTPPacket.PT_FEC)
+        self.assertEqual(FECHandler.get_protected_seq_nums(results[3][0]), [65534, 65535, 0, 1])
+    
+    def test_recover_any_single_loss(self):
+        """Test recovery of each packet including length, marker and timestamp"""
+        fec_packet = self._protect(self.handler)[0]
+        fec_packet = RTPPacket.decode(fec_packet.encode())
+        
+        for lost in range(4):
+            available = [p for i, p in enumerate(self.packets) if i != lost]
+            recovered = self.handler.recover_packet(fec_packet, available)
+            original = self.packets[lost]
+            self.assertEqual(recovered.seq_num, original.seq_num)
+            self.assertEqual(recovered.timestamp, original.timestamp)
+            self.assertEqual(recovered.marker, original.marker)
+            self.assertEqual(recovered.payload_type, original.payload_type)
+            self.assertEqual(recovered.payload, original.payload)
+    
+    def test_no_recovery_for_multiple_losses(self):
+        """Test XOR parity gives up when two packets are missing"""
+        fec_packet = self._protect(self.handler)[0]
+        
+        self.assertIsNone(self.handler.recover_packet(fec_packet, self.packets[:2]))
+    
+    def test_reed_solomon_recovers_up_to_repair_count(self):
+        """Test RS(4, 6) recovers any two losses"""
+        handler = FECHandler(group_size=4, scheme='rs', repair_count=2)
+        fec_packets = self._protect(handler)
+        self.assertEqual(len(fec_packets), 2)
+        
+        for lost in [(0, 1), (1, 3), (2, 3)]:
+            available = [p for i, p in enumerate(self.packets) if i not in lost]
+            recovered = handler.recover_packets(fec_packets, available)
+            self.assertEqual([p.seq_num for p in recovered], [self.packets[i].seq_num for i in lost])
+            for packet, i in zip(recovered, lost):
+                self.assertEqual(packet.payload, self.packets[i].payload)
+                self.assertEqual(packet.timestamp, self.packets[i].timestamp)
+        
+        # One repair is not enough for two losses
+        self.assertEqual(handler.recover_packets(fec_packets[:1], self.packets[:2]), [])
+    
+    def test_2d_parity_recovers_column_burst(self):
+        """Test 2x2 row/column parity recovers a burst of two"""
+        handler = FECHandler(group_size=4, scheme='2d')
+        fec_packets = self._protect(handler)
+        self.assertEqual(len(fec_packets), 4)
+        
+        recovered = handler.recover_packets(fec_packets, self.packets[2:])
+        self.assertEqual([p.payload for p in recovered], [p.payload for p in self.packets[:2]])
+    
+    def test_recovery_index_decodes_when_enough_symbols(self):
+        """Test the index recovers as soon as the last needed symbol arrives"""
+        handler = FECHandler(group_size=4, scheme='rs', repair_count=2)
+        fec_packets = self._protect(handler)
+        index = FECRecoveryIndex()
+        
+        self.assertEqual(index.add_fec(fec_packets[0]), [])
+        self.assertEqual(index.add_media(self.packets[0]), [])
+        recovered = index.add_media(self.packets[3])
+        self.assertEqual(recovered, [])
+        recovered = index.add_fec(fec_packets[1])
+        self.assertEqual([p.seq_num for p in recovered], [65535, 0])
+        self.assertEqual(index.recovered_count, 2)
+
+    def test_recovery_index_survives_receive_buffer_reuse(self):
+        """Test a stored repair symbol does not change when its receive slot is reused"""
+        handler = FECHandler(group_size=4)
+        fec_packet = self._protect(handler)[0]
+        index = FECRecoveryIndex()
+        index.add_media(self.packets[0])
+        index.add_media(self.packets[3])
+
+        slot = bytearray(2048)  # A BufferPool slot
+        data = fec_packet.encode()
+        slot[:len(data)] = data
+        self.assertEqual(index.add_fec(RTPPacket.decode(memoryview(slot)[:len(data)])), [])
+        slot[:len(data)] = bytes(len(data))  # The next batch lands in the same slot
+
+        recovered = index.add_media(self.packets[2])
+        self.assertEqual([p.seq_num for p in recovered], [self.packets[1].seq_num])
+        self.assertEqual(recovered[0].payload, self.packets[1].payload)
+
+    def test_sender_fec_protects_template_packets(self):
+        """Test send_fec builds FEC from the packets send_packet packs into its history"""
+        sender = RTPSender('127.0.0.1', 9, payload_type=96, send_fec=True, group_size=4,
+                           stats_interval=None, rtcp_interval=None)
+        sender.socket.close()
+        sent = []
+        sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+        seqs = [sender.send_packet(bytes([i]) * (40 + i), marker=int(i == 0)) for i in range(4)]
+        self.assertEqual(seqs, [0, 1, 2, 3])
+        self.assertEqual(len(sent), 5)
+        self.assertEqual(sender.stats['fec_sent'], 1)
+
+        index = FECRecoveryIndex()
+        for data in sent[:1] + sent[2:4]:  # Sequence number 1 lost
+            index.add_media(RTPPacket.decode(data))
+        recovered = index.add_fec(RTPPacket.decode(sent[4]))
+        self.assertEqual([p.encode() for p in recovered], [sent[1]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for the adaptive jitter buffer
+"""
+
+import unittest
+from ..core.packet import RTPPacket
+from ..utils.codecs import PT_CN
+from ..utils.jitter_buffer import JitterBuffer
+
+class TestJitterBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = JitterBuffer(min_delay=0.04, max_delay=0.2)
+
+    def _put(self, seq_num, arrival):
+        packet = RTPPacket(seq_num=seq_num, timestamp=seq_num * 160, ssrc=1, payload=b"x")
+        return self.buffer.put(packet, arrival=arrival)
+
+    def _pop(self, now):
+        return [p.seq_num if p else None for p in self.buffer.pop_due(now)]
+
+    def test_playout_follows_timestamps(self):
+        """Test packets play at their timestamp plus the playout delay"""
+        self._put(0, 1.00)
+        self._put(2, 1.04)
+        self._put(1, 1.05)  # Reordered
+
+        self.assertEqual(self.buffer.occupancy, 3)
+        self.assertEqual(self._pop(1.039), [])
+        self.assertEqual(self._pop(1.041), [0])
+        self.assertEqual(self._pop(1.2), [1, 2])
+        self.assertEqual(self.buffer.occupancy, 0)
+
+    def test_missing_packet_skipped_at_deadline(self):
+        """Test a lost packet does not block later audio"""
+        self._put(0, 1.00)
+        self._put(2, 1.04)
+
+        self.assertEqual(self._pop(1.05), [0])
+        self.assertEqual(self._pop(1.07), [None])
+        self.assertEqual(self._pop(1.09), [2])
+        self.assertEqual(self.buffer.lost, 1)
+
+        # The missing packet shows up after its deadline
+        self._put(1, 1.08)
+        self.assertEqual(self.buffer.late_drops, 1)
+        self.assertEqual(self._pop(1.2), [])
+
+    def test_delay_tracks_jitter(self):
+        """Test the playout delay grows with interarrival jitter"""
+        for seq in range(50):
+            self._put(seq, seq * 0.02)
+        self.assertAlmostEqual(self.buffer.delay, 0.04)
+
+        for seq in range(50, 200):
+            self._put(seq, seq * 0.02 + (0.03 if seq % 2 else 0.0))
+        self.assertGreater(self.buffer.delay, 0.08)
+        self.assertLessEqual(self.buffer.delay, 0.2)
+
+    def test_frame_size_ignores_silence_jumps(self):
+        """Test a comfort noise pause does not inflate the frame size used for holes"""
+        for seq, timestamp, payload_type in ((0, 0, 0), (1, 160, 0), (2, 320, PT_CN),
+                                             (3, 8320, 0), (5, 8640, 0)):  # 1 s pause, 4 lost
+            packet = RTPPacket(payload_type=payload_type, seq_num=seq, timestamp=timestamp,
+                               ssrc=1, payload=b"x")
+            self.buffer.put(packet, arrival=timestamp / 8000)
+        self.assertEqual(self._pop(1.09), [0, 1, 2, 3])
+        self.assertEqual(self.buffer.frame_samples, 160)
+        # The hole plays one frame after packet 3
+        self.assertAlmostEqual(self.buffer.next_deadline(), 8480 / 8000 + 0.04)
+
+if __name__ == '__main__':
+    unittest.main()
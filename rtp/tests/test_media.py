@@ -0,0 +1,101 @@
+"""
+Tests for the memory-mapped audio sources
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+import numpy as np
+from ..utils.media import WaveSource, clear_cache, load_pcm
+
+class TestMedia(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        clear_cache()
+
+    def tearDown(self):
+        clear_cache()
+        shutil.rmtree(self.dir)
+
+    def _wave(self, name, data, rate, channels, width):
+        path = os.path.join(self.dir, name)
+        with wave.open(path, 'wb') as w:
+            w.setnchannels(channels)
+            w.setsampwidth(width)
+            w.setframerate(rate)
+            w.writeframes(data)
+        return path
+
+    def test_matching_format_is_served_from_the_map(self):
+        """Test an 8 kHz mono 16-bit file is sliced from the mmap without copying"""
+        samples = np.arange(400, dtype='<i2')
+        path = self._wave('mono.wav', samples.tobytes(), 8000, 1, 2)
+        source = WaveSource(path)
+        self.assertIsInstance(source.pcm.obj, mmap.mmap)
+        self.assertIs(load_pcm(path), source.pcm)
+
+        frames = [source.read(), source.read(), source.read()]
+        self.assertIsNone(source.read())
+        self.assertEqual([len(frame) for frame in frames], [320, 320, 160])
+        self.assertEqual(b''.join(frames), samples.tobytes())
+
+        looping = WaveSource(path, loop=True)
+        for _ in range(3):
+            looping.read()
+        self.assertEqual(looping.read(), samples[:160].tobytes())
+
+    def test_converts_rate_channels_and_width(self):
+        """Test 16 kHz 3-channel 24-bit PCM is downmixed, resampled and requantized"""
+        ramp = np.linspace(-0.5, 0.5, 1600, endpoint=False)
+        left = np.rint(ramp * (1 << 23)).astype(np.int32)
+        right = -left  # Mono mix of left and -left is silence
+        frames = np.column_stack([left, left, right]).reshape(-1)
+        data = frames.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        path = self._wave('3ch24.wav', data, 16000, 3, 3)
+
+        pcm = np.frombuffer(load_pcm(path), dtype='<i2')
+        expected = np.rint(ramp[::2] * 32768 / 3).astype('<i2')  # Every second sample, mixed
+        self.assertEqual(len(pcm), 800)
+        # The anti-aliasing filter keeps a ramp, except within its reach of the file's ends
+        self.assertLessEqual(np.abs(pcm.astype(int) - expected)[16:-16].max(), 1)
+
+    def test_downsampling_filters_above_the_new_nyquist(self):
+        """Test a 48 kHz tone above 4 kHz is attenuated instead of aliasing into 8 kHz audio"""
+        t = np.arange(48000) / 48000
+        def level(frequency):
+            tone = np.rint(np.sin(2 * np.pi * frequency * t) * 16000).astype('<i2')
+            path = self._wave(f'{frequency}.wav', tone.tobytes(), 48000, 1, 2)
+            pcm = np.frombuffer(load_pcm(path), dtype='<i2')[100:-100].astype(float)
+            return np.sqrt(np.mean(pcm * pcm))
+
+        passband = level(1000)
+        self.assertAlmostEqual(passband, 16000 / np.sqrt(2), delta=200)
+        self.assertLess(level(5000), passband / 1000)  # Would alias to 3 kHz: over -60 dB
+        self.assertLess(level(7000), passband / 1000)
+
+    def test_float_file_is_cached_on_disk(self):
+        """Test float PCM is converted once and reused from cache_dir"""
+        samples = np.full(8000, 0.25, dtype='<f4')
+        path = os.path.join(self.dir, 'float.wav')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + samples.nbytes, b'WAVE',
+                                b'fmt ', 16, 3, 1, 8000, 32000, 4, 32, b'data', samples.nbytes))
+            f.write(samples.tobytes())
+        cache_dir = os.path.join(self.dir, 'cache')
+
+        pcm = load_pcm(path, sample_width=1, cache_dir=cache_dir)
+        self.assertEqual(bytes(pcm), bytes([160]) * 8000)  # 128 + 0.25 * 128, unsigned
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        clear_cache()
+        self.assertIsInstance(load_pcm(path, sample_width=1, cache_dir=cache_dir).obj, mmap.mmap)
+
+        with self.assertRaises(ValueError):
+            load_pcm(os.path.join(self.dir, 'cache', os.listdir(cache_dir)[0]))
+
+if __name__ == '__main__':
+    unittest.main()
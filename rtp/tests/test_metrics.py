@@ -0,0 +1,75 @@
+"""
+Tests for the metrics registry, reporter and Prometheus endpoint
+"""
+
+import logging
+import unittest
+import urllib.request
+from ..core.packet import RTPPacket
+from ..core.receiver import RTPReceiver
+from ..utils.metrics import MetricsRegistry, MetricsReporter, MetricsServer
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_prometheus_text(self):
+        """Test counters, gauges and histograms render in the exposition format"""
+        registry = MetricsRegistry()
+        sent = registry.counter('rtp_packets_sent_total', 'Media packets sent')
+        registry.gauge('rtp_streams', fn=lambda: 3)
+        lateness = registry.histogram('rtp_lateness_seconds', buckets=(0.001, 0.01))
+        sent.inc()
+        sent.inc(2)
+        for value in (0.0005, 0.005, 0.5):
+            lateness.observe(value)
+
+        text = registry.to_prometheus()
+        self.assertIn("# HELP rtp_packets_sent_total Media packets sent\n", text)
+        self.assertIn("# TYPE rtp_packets_sent_total counter\nrtp_packets_sent_total 3\n", text)
+        self.assertIn("rtp_streams 3\n", text)
+        self.assertIn('rtp_lateness_seconds_bucket{le="0.001"} 1\n', text)
+        self.assertIn('rtp_lateness_seconds_bucket{le="0.01"} 2\n', text)
+        self.assertIn('rtp_lateness_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn("rtp_lateness_seconds_count 3\n", text)
+        self.assertEqual(lateness.quantile(0.5), 0.01)
+
+        with self.assertRaises(ValueError):
+            registry.counter('rtp_streams')
+
+    def test_reporter_rate_limited(self):
+        """Test snapshots are logged at most once per interval"""
+        now = [0.0]
+        registry = MetricsRegistry()
+        registry.counter('rtp_packets_received_total').inc(5)
+        reporter = MetricsReporter(registry, logging.getLogger('rtp.test'), interval=1.0,
+                                   clock=lambda: now[0])
+        with self.assertLogs('rtp.test', logging.INFO) as logs:
+            for step in range(25):
+                now[0] = step * 0.1
+                reporter.maybe_report()
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("rtp_packets_received_total=5", logs.output[0])
+
+class TestReceiverMetrics(unittest.TestCase):
+    def test_receiver_counters_served(self):
+        """Test receiver stats are exported over HTTP without per-packet output"""
+        receiver = RTPReceiver("127.0.0.1", 0, stats_interval=None)
+        receiver._write_packet = lambda packet: None
+        server = MetricsServer(receiver.metrics)
+        server.start()
+        try:
+            for seq in (0, 1, 3):
+                receiver._process_packet(RTPPacket(seq_num=seq, ssrc=1, payload=b"x"),
+                                         ("127.0.0.1", 9))
+            url = "http://%s:%d/metrics" % server.address[:2]
+            with urllib.request.urlopen(url, timeout=2) as response:
+                text = response.read().decode()
+        finally:
+            server.stop()
+            receiver.socket.close()
+
+        self.assertIn("rtp_packets_received_total 3\n", text)
+        self.assertIn("rtp_packets_lost_total 1\n", text)
+        self.assertIn("rtp_nacks_sent_total 1\n", text)
+        self.assertIn("rtp_loss_ratio 0.25\n", text)
+
+if __name__ == '__main__':
+    unittest.main()
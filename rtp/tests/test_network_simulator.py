@@ -0,0 +1,66 @@
+"""
+Tests for impairment models and the simulated network
+"""
+
+import socket
+import time
+import unittest
+from ..utils.impairments import GilbertElliottLoss, NetworkModel, Reorder
+from ..utils.network_simulator import SimulatedNetwork
+
+class TestImpairments(unittest.TestCase):
+    def test_seeded_model_is_reproducible(self):
+        """Test the same seed gives the same drops, delays and duplicates"""
+        def run(seed):
+            model = NetworkModel.from_rates(0.1, 0.05, 0.2, 0.05, burst_length=3.0, seed=seed)
+            return [tuple(model()) for _ in range(1000)]
+        self.assertEqual(run(7), run(7))
+        self.assertNotEqual(run(7), run(8))
+
+    def test_gilbert_elliott_loss_and_bursts(self):
+        """Test mean loss and mean burst length match the parameters"""
+        model = NetworkModel([GilbertElliottLoss(0.1, 4.0)], seed=1)
+        lost = [not model() for _ in range(200000)]
+        bursts = sum(1 for prev, cur in zip([False] + lost, lost) if cur and not prev)
+        self.assertAlmostEqual(sum(lost) / len(lost), 0.1, delta=0.01)
+        self.assertAlmostEqual(sum(lost) / bursts, 4.0, delta=0.3)
+
+        with self.assertRaises(ValueError):
+            GilbertElliottLoss(0.1, 0.5)
+
+    def test_reorder_skips_delay(self):
+        """Test reordered packets are sent with no delay"""
+        model = NetworkModel.from_rates(max_delay=0.05, reorder_rate=0.3, seed=2)
+        delays = [model()[0] for _ in range(1000)]
+        self.assertAlmostEqual(delays.count(0.0) / 1000, 0.3, delta=0.05)
+        self.assertTrue(all(0.0 <= d <= 0.05 for d in delays))
+        self.assertEqual(NetworkModel([Reorder(0.0)])(), [0.0])
+
+class TestSimulatedNetwork(unittest.TestCase):
+    def test_forwards_in_due_order(self):
+        """Test datagrams are forwarded over loopback, reordered by their delays"""
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(("127.0.0.1", 0))
+        sink.settimeout(1.0)
+        network = SimulatedNetwork(0, "127.0.0.1", sink.getsockname()[1], drop_rate=0.0,
+                                   max_delay=0.05, reorder_rate=0.0, duplicate_rate=0.0, seed=1,
+                                   listen_ip="127.0.0.1")
+        network.start()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for i in range(50):
+                sender.sendto(bytes([i]), network.local_address)
+                time.sleep(0.001)
+            received = [sink.recv(16)[0] for _ in range(50)]
+        finally:
+            network.stop()
+            sender.close()
+            sink.close()
+
+        self.assertEqual(sorted(received), list(range(50)))
+        self.assertNotEqual(received, list(range(50)))
+        self.assertEqual(network.stats['forwarded'], 50)
+        self.assertGreater(network.stats['reordered'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ Tests for RTP packet implementation
 """
 
 import unittest
-from ..core.packet import RTPPacket
+from ..core.packet import RTPPacket, RTPHeaderTemplate
 
 class TestRTPPacket(unittest.TestCase):
     def setUp(self):
@@ -35,6 +35,56 @@ class TestRTPPacket(unittest.TestCase):
         self.assertEqual(decoded.ssrc, self.packet.ssrc)
         self.assertEqual(decoded.payload, self.packet.payload)
     
+    def test_decode_is_zero_copy_view(self):
+        """Test decoded payload_view is a view over the receive buffer"""
+        buffer = bytearray(self.packet.encode())
+        decoded = RTPPacket.decode(buffer)
+        
+        self.assertIsInstance(decoded.payload_view, memoryview)
+        buffer[-1] = ord('X')
+        self.assertEqual(bytes(decoded.payload_view), b"test payloaX")
+
+    def test_decoded_payload_is_bytes(self):
+        """Test payload is bytes that survive reuse of the receive buffer"""
+        buffer = bytearray(self.packet.encode())
+        decoded = RTPPacket.decode(buffer)
+        
+        payload = decoded.payload
+        self.assertIs(type(payload), bytes)
+        self.assertEqual(payload.upper(), b"TEST PAYLOAD")  # bytes methods work
+        buffer[-1] = ord('X')
+        self.assertEqual(decoded.payload, self.payload)
+        self.assertEqual(decoded.encode(), self.packet.encode())
+    
+    def test_lazy_csrc_extension_padding(self):
+        """Test CSRC list, header extension and padding handling"""
+        self.packet.csrc = [1, 2]
+        self.packet.cc = 2
+        self.packet.extension_header = (0xBEDE, b"\x10\x20\x30\x40")
+        encoded = self.packet.encode()
+        
+        decoded = RTPPacket.decode(encoded)
+        self.assertEqual(decoded.csrc, [1, 2])
+        self.assertEqual(decoded.extension_header[0], 0xBEDE)
+        self.assertEqual(bytes(decoded.extension_header[1]), b"\x10\x20\x30\x40")
+        self.assertEqual(decoded.payload, self.payload)
+        self.assertEqual(decoded.encode(), encoded)
+        
+        padded = bytearray(self.packet.encode() + b"\x00\x00\x03")
+        padded[0] |= 0x20
+        self.assertEqual(RTPPacket.decode(bytes(padded)).payload, self.payload)
+    
+    def test_header_template(self):
+        """Test template-built packets match encode"""
+        template = RTPHeaderTemplate(RTPPacket.PT_AUDIO, 0x12345678)
+        self.assertEqual(bytes(template.pack(12345, 67890, self.payload)), self.packet.encode())
+        
+        self.packet.marker = 1
+        self.packet.seq_num = 1
+        buffer = bytearray(64)
+        length = template.pack_into(buffer, 1, 67890, self.payload, marker=1)
+        self.assertEqual(bytes(buffer[:length]), self.packet.encode())
+    
     def test_nack_packet(self):
         """Test NACK packet creation and parsing"""
         missing_seq_nums = [12345, 12346, 12347]
@@ -42,6 +92,19 @@ class TestRTPPacket(unittest.TestCase):
         
         self.assertEqual(nack_packet.payload_type, RTPPacket.PT_NACK)
         self.assertEqual(nack_packet.get_nack_sequence_numbers(), missing_seq_nums)
+    
+    def test_nack_coalescing(self):
+        """Test NACK ranges are coalesced into PID+BLP entries"""
+        burst = list(range(1000, 1300))
+        nack_packet = RTPPacket.decode(RTPPacket.create_nack(burst, 0x1234).encode())
+        
+        self.assertEqual(len(nack_packet.payload), 4 * 18)  # ceil(300 / 17) entries
+        self.assertEqual(nack_packet.get_nack_sequence_numbers(), burst)
+        
+        wrapped = [65534, 65535, 0, 1, 17, 30]
+        nack_packet = RTPPacket.create_nack(list(reversed(wrapped)))
+        self.assertEqual(len(nack_packet.payload), 8)
+        self.assertEqual(nack_packet.get_nack_sequence_numbers(), wrapped)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
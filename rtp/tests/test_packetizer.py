@@ -0,0 +1,72 @@
+"""
+Tests for ptime and MTU-aware packetization
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+from ..core.packet import RTPPacket
+from ..core.sender import RTPSender
+from ..utils.codecs import PCM16, PCMU
+from ..utils.packetizer import Packetizer
+
+class TestPacketizer(unittest.TestCase):
+    def test_fragments_on_sample_boundaries(self):
+        """Test frames over the MTU budget are split evenly into whole samples"""
+        packetizer = Packetizer(PCM16, ptime=60, mtu=576, fec=True)
+        self.assertEqual(packetizer.samples_per_packet, 480)
+        self.assertEqual(packetizer.max_payload, 576 - 28 - 12 - 14)
+
+        fragments = packetizer.split(bytes(range(256)) * 4)  # 512 samples: 480 + 32
+        self.assertEqual([samples for _, samples in fragments], [240, 240, 32])
+        self.assertEqual(b''.join(payload for payload, _ in fragments), bytes(range(256)) * 4)
+
+        # G.711 has half the bytes per sample, so 60 ms fits in one packet
+        self.assertEqual(len(Packetizer(PCMU, ptime=60, mtu=576).split(bytes(960))), 1)
+        with self.assertRaises(ValueError):
+            Packetizer(ptime=0.1)
+
+    def test_send_audio_timestamps_and_marker(self):
+        """Test send_audio packs one ptime per packet with sample timestamps, wrapping"""
+        sender = RTPSender('127.0.0.1', 9, payload_type=0, initial_seq_num=65534, ptime=40,
+                           stats_interval=None, rtcp_interval=None)
+        sender.socket.close()
+        sender.timestamp = 2**32 - 320
+        packets = [p for p in sender.send_audio(bytes(2 * 1000)) if p.payload_type == 0]
+
+        self.assertEqual([p.seq_num for p in packets], [65534, 65535, 0, 1])
+        self.assertEqual([p.timestamp for p in packets], [2**32 - 320, 0, 320, 640])
+        self.assertEqual([len(p.payload) for p in packets], [320, 320, 320, 40])
+        self.assertEqual([p.marker for p in packets], [1, 0, 0, 0])
+        self.assertEqual(sender.timestamp, 680)
+
+    def test_tick_fragments_to_the_mtu(self):
+        """Test tick() sends a frame too large for the MTU as several packets"""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'audio.wav')
+            with wave.open(path, 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(8000)
+                w.writeframes(bytes(2 * 960))  # Two 60 ms frames of 16-bit PCM
+            sender = RTPSender('127.0.0.1', 9, ptime=60, mtu=576, stats_interval=None,
+                               rtcp_interval=None)
+            sender.socket.close()
+            sent = []
+            sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+            sender.set_audio_file(path)
+            while sender.tick():
+                pass
+        finally:
+            shutil.rmtree(directory)
+
+        packets = [RTPPacket.decode(data) for data in sent]
+        self.assertEqual([p.timestamp for p in packets], [0, 240, 480, 720])
+        self.assertTrue(all(len(data) <= 576 - 28 for data in sent))
+        self.assertEqual(sender.packet_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for packet loss concealment
+"""
+
+import unittest
+import numpy as np
+from ..core.packet import RTPPacket
+from ..core.receiver import RTPReceiver
+from ..utils.plc import PacketLossConcealer
+from ..utils.sinks import AudioSink
+
+def _voice(samples, period=64):
+    # A fundamental and two harmonics, periodic in period samples
+    t = 2 * np.pi * np.arange(samples) / period
+    signal = 6000 * np.sin(t) + 3000 * np.sin(2 * t + 1) + 1500 * np.sin(3 * t + 2)
+    return np.rint(signal).astype('<i2')
+
+class _ListSink(AudioSink):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = []
+
+    def write_frames(self, data):
+        self.frames.append(bytes(data))
+
+class TestPlc(unittest.TestCase):
+    def test_pitch_repetition_and_fade(self):
+        """Test the gap continues the waveform at its pitch and fades to silence after 60 ms"""
+        voice = _voice(2000)
+        plc = PacketLossConcealer()
+        self.assertEqual(plc.update(voice[:800].tobytes()), voice[:800].tobytes())
+
+        out = np.frombuffer(plc.conceal(640), dtype='<i2').astype(float)
+        self.assertEqual(plc.pitch_period, 64)
+        expected = voice[800:880].astype(float)  # First 10 ms, at full gain
+        self.assertLessEqual(np.abs(out[:80] - expected).max(), 1)
+        self.assertLess(np.abs(out[200:240]).max(), np.abs(expected).max())  # Fading
+        self.assertFalse(out[480:].any())  # Silent after 60 ms
+
+    def test_crossfade_into_next_frame(self):
+        """Test the frame after a short loss starts from the concealed signal"""
+        voice = _voice(1200)
+        plc = PacketLossConcealer()
+        plc.update(voice[:800].tobytes())
+        plc.conceal(160)
+        after = np.frombuffer(plc.update(voice[960:1120].tobytes()), dtype='<i2')
+        self.assertLessEqual(np.abs(after.astype(int) - voice[960:1120]).max(), 1000)
+        self.assertEqual(after[16:].tobytes(), voice[976:1120].tobytes())  # Quarter period
+
+        # Without enough history there is nothing to repeat
+        self.assertEqual(PacketLossConcealer().conceal(160), bytes(320))
+
+    def test_receiver_reports_concealed_frames(self):
+        """Test a lost packet is concealed by the sink and counted in the receiver stats"""
+        receiver = RTPReceiver('127.0.0.1', 0, stats_interval=None, rtcp_interval=None)
+        receiver.socket.close()
+        receiver._sendto = lambda data, addr: None  # NACKs
+        receiver.max_reorder = 2  # Give up on the hole two packets later
+        receiver.sink = _ListSink()
+        voice = _voice(160 * 8)
+        for seq in (0, 1, 2, 3, 5, 6, 7):  # 4 lost
+            packet = RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload_type=96,
+                               payload=voice[seq * 160:(seq + 1) * 160].tobytes())
+            receiver._process_packet(RTPPacket.decode(packet.encode()), ('127.0.0.1', 9))
+
+        self.assertEqual(receiver.stats['concealed_frames'], 1)
+        self.assertEqual(receiver.sink.concealed_samples, 160)
+        audio = np.frombuffer(b''.join(receiver.sink.frames), dtype='<i2')
+        self.assertEqual(len(audio), len(voice))
+        self.assertGreater(np.abs(audio[640:800]).max(), 5000)  # Not a hole of silence
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the reorder buffer and RTPReceiver packet ordering
+"""
+
+import socket
+import unittest
+from ..core.packet import RTPPacket
+from ..core.receiver import RTPReceiver
+from ..utils.fec import FECHandler
+from ..utils.reorder_buffer import ReorderBuffer
+
+class TestReorderBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = ReorderBuffer(capacity=8)
+    
+    def _insert(self, seq_num):
+        return self.buffer.insert(self.buffer.extend(seq_num), seq_num)
+    
+    def test_in_order_drain_across_wrap(self):
+        """Test packets drain in order across the sequence wrap"""
+        for seq in (65534, 0, 65535, 2):
+            self._insert(seq)
+        
+        self.assertEqual(self.buffer.pop_ready(), [65534, 65535, 0])
+        self.assertEqual([ext & 0xFFFF for ext in self.buffer.missing()], [1])
+        self._insert(1)
+        self.assertEqual(self.buffer.pop_ready(), [1, 2])
+        self.assertEqual(len(self.buffer), 0)
+    
+    def test_window_overflow_evicts_in_order(self):
+        """Test inserting beyond the window skips the oldest holes"""
+        for seq in (0, 2, 3):
+            self._insert(seq)
+        self.buffer.pop_ready()
+        
+        evicted = self._insert(10)
+        self.assertEqual(evicted, [2])
+        self.assertEqual(self.buffer.head & 0xFFFF, 3)
+        self.assertEqual(self.buffer.pop_ready(), [3])
+        self.assertEqual([ext & 0xFFFF for ext in self.buffer.missing()], [4, 5, 6, 7, 8, 9])
+
+class TestRTPReceiverOrdering(unittest.TestCase):
+    def setUp(self):
+        self.receiver = RTPReceiver("127.0.0.1", 0)
+        self.written = []
+        self.receiver._write_packet = lambda packet: self.written.append(packet.seq_num)
+        self.sender_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender_socket.bind(("127.0.0.1", 0))
+        self.addr = self.sender_socket.getsockname()
+    
+    def tearDown(self):
+        self.receiver.socket.close()
+        self.sender_socket.close()
+    
+    def _receive(self, seq_num):
+        packet = RTPPacket(seq_num=seq_num, timestamp=seq_num * 160, ssrc=1, payload=b"x")
+        self.receiver._process_packet(RTPPacket.decode(packet.encode()), self.addr)
+    
+    def test_reordering_loss_and_nack(self):
+        """Test out-of-order packets are written in order and gaps NACKed"""
+        for seq in (65535, 0, 3, 1, 2, 2):
+            self._receive(seq)
+        
+        self.assertEqual(self.written, [65535, 0, 1, 2, 3])
+        self.assertEqual(self.receiver.stats['lost_packets'], 2)
+        self.assertEqual(self.receiver.stats['retransmissions_received'], 2)
+        self.assertEqual(self.receiver.stats['out_of_order'], 1)
+        self.assertEqual(self.receiver.stats['last_seq'], 3)
+        self.assertEqual(self.receiver.missing_packets, set())
+        
+        nack = RTPPacket.decode(self.sender_socket.recv(2048))
+        self.assertEqual(nack.get_nack_sequence_numbers(), [1, 2])
+    
+    def test_fec_does_not_recover_accepted_packets(self):
+        """Test media received before the first FEC packet is not recovered again"""
+        handler = FECHandler(group_size=4, scheme='rs', repair_count=2)
+        packets = [RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1, payload=b"x")
+                   for seq in range(4)]
+        fec_packets = [fec for packet in packets for fec in handler.add_packet(packet)]
+        self._receive(0)
+        self._receive(1)  # Not indexed: no FEC seen yet
+        for fec in fec_packets:
+            self.receiver._process_packet(RTPPacket.decode(fec.encode()), self.addr)
+        self._receive(3)
+        self._receive(2)  # 2 and 3 with both repairs decode 0 and 1
+
+        self.assertEqual(self.written, [0, 1, 2, 3])
+        self.assertEqual(self.receiver.stats['fec_recovered'], 0)
+        self.assertEqual(self.receiver.stats['packets_received'], 4)
+        self.assertEqual(self.receiver.stats['out_of_order'], 0)
+
+    def test_jitter_buffer_playout(self):
+        """Test the jitter buffer holds packets until their playout time"""
+        self.receiver.socket.close()
+        self.receiver = RTPReceiver("127.0.0.1", 0, use_jitter_buffer=True, min_delay=0.04)
+        self.receiver._write_packet = lambda packet: self.written.append(packet.seq_num)
+        now = [10.0]
+        self.receiver.jitter_buffer.clock = lambda: now[0]
+        for seq in (0, 2):
+            self._receive(seq)
+            now[0] += 0.04
+        self.assertEqual(self.written, [])
+        
+        now[0] = 10.2
+        self.receiver._playout()
+        self.assertEqual(self.written, [0, 2])
+        self.assertEqual(self.receiver.stats['deadline_losses'], 1)
+        self.assertEqual(self.receiver.stats['buffer_occupancy'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the packet history ring and retransmission handling
+"""
+
+import unittest
+from ..core.packet import RTPPacket
+from ..core.sender import RTPSender
+from ..utils.packet_history import PacketHistory
+from ..utils.retransmission import RetransmissionHandler
+
+class TestPacketHistory(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.history = PacketHistory(capacity=8, slot_size=64, clock=lambda: self.now)
+    
+    def test_store_and_get_across_wrap(self):
+        """Test lookups stay valid across the 16-bit sequence wrap"""
+        for seq in range(65530, 65536 + 2):
+            self.history.store(seq % 65536, bytes([seq % 256]) * 4)
+        
+        self.assertEqual(self.history.get(65535), b"\xff" * 4)
+        self.assertEqual(self.history.get(1), b"\x01" * 4)
+        self.assertIn(65530, self.history)
+        self.assertEqual(len(self.history), 8)
+    
+    def test_overwritten_slots_are_invalid(self):
+        """Test packets evicted by newer ones are not returned"""
+        for seq in range(20):
+            self.history.store(seq, bytes([seq]))
+        
+        self.assertIsNone(self.history.get(11))
+        self.assertNotIn(11, self.history)
+        self.assertEqual(self.history.get(12), bytes([12]))
+        self.assertIsNone(self.history.get(30))
+    
+    def test_time_based_retention(self):
+        """Test packets older than the retention window expire"""
+        history = PacketHistory(capacity=8, retention_ms=100, clock=lambda: self.now)
+        history.store(1, b"old")
+        self.now = 0.05
+        history.store(2, b"new")
+        self.now = 0.12
+        
+        self.assertIsNone(history.get(1))
+        self.assertEqual(history.get(2), b"new")
+
+class TestRetransmissionHandler(unittest.TestCase):
+    def test_handle_nack(self):
+        """Test NACKed packets come back as RTX packets"""
+        handler = RetransmissionHandler(buffer_size=4)
+        for seq in range(6):
+            handler.add_packet(RTPPacket(seq_num=seq, timestamp=seq * 160, ssrc=1,
+                                         payload=bytes([seq]) * 3))
+        
+        rtx_packets = handler.handle_nack(RTPPacket.create_nack([0, 3, 5], 1))
+        self.assertEqual([p.get_original_seq_num() for p in rtx_packets], [3, 5])
+        self.assertEqual(rtx_packets[0].get_rtx_payload(), b"\x03" * 3)
+        self.assertEqual(handler.get_missing_packets(0, 3), [0, 1])
+
+    def test_sender_keeps_one_history(self):
+        """Test the sender serves NACKs from one history sized from the MTU"""
+        sender = RTPSender('127.0.0.1', 9, payload_type=96, history_size=8, mtu=576,
+                           stats_interval=None, rtcp_interval=None)
+        sender.socket.close()
+        sender._send_batch = lambda datagrams: None
+        self.assertIs(sender.rtx_handler.packet_buffer, sender.packet_history)
+        self.assertEqual(sender.packet_history.slot_size, 576 - 28)
+        self.assertEqual(len(sender.packet_history._storage), 8 * (576 - 28))
+
+        self.assertEqual(sender.send_packet(b"\x07" * 10), 0)  # Returns the seq sent
+        rtx_packets = sender.handle_nack(RTPPacket.create_nack([0], 1))
+        self.assertEqual([p.get_rtx_payload() for p in rtx_packets], [b"\x07" * 10])
+
+if __name__ == '__main__':
+    unittest.main()
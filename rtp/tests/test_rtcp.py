@@ -0,0 +1,80 @@
+"""
+Tests for RTCP sender/receiver reports
+"""
+
+import time
+import unittest
+from ..core import rtcp
+from ..core.receiver import RTPReceiver
+from ..core.sender import RTPSender
+
+class TestRTCPPackets(unittest.TestCase):
+    def test_compound_round_trip(self):
+        """Test SR and RR survive encoding in compound packets with SDES"""
+        block = rtcp.ReportBlock(0x1234, fraction_lost=64, packets_lost=-3, highest_seq=70000,
+                                 jitter=80, lsr=0xABCD0000, dlsr=65536)
+        sr = rtcp.SenderReport(0x1234, rtcp.ntp_time(1.5), 16000, 100, 16000, [block])
+        data = rtcp.encode_compound(sr, "alice@host") + rtcp.encode_compound(
+            rtcp.ReceiverReport(0x5678, [block]), "bob@host")
+        self.assertTrue(rtcp.is_rtcp(data))
+
+        reports = rtcp.parse(data)
+        self.assertEqual([type(r) for r in reports], [rtcp.SenderReport, rtcp.ReceiverReport])
+        self.assertEqual(reports[0].ntp_timestamp, sr.ntp_timestamp)
+        self.assertEqual((reports[0].packet_count, reports[0].octet_count), (100, 16000))
+        parsed = reports[1].blocks[0]
+        self.assertEqual((parsed.ssrc, parsed.fraction_lost, parsed.packets_lost, parsed.highest_seq),
+                         (0x1234, 64, -3, 70000))
+        self.assertEqual((parsed.jitter, parsed.lsr, parsed.dlsr), (80, 0xABCD0000, 65536))
+
+        with self.assertRaises(ValueError):
+            rtcp.parse(data[:30])
+
+    def test_round_trip_time_from_lsr_dlsr(self):
+        """Test RTT is arrival - LSR - DLSR"""
+        sent = rtcp.ntp_time(1000.0)
+        block = rtcp.ReportBlock(1, lsr=rtcp.ntp_middle(sent), dlsr=int(0.25 * 65536))
+        rtt = rtcp.round_trip_time(block, rtcp.ntp_time(1000.3))
+        self.assertAlmostEqual(rtt, 0.05, places=3)
+        self.assertIsNone(rtcp.round_trip_time(rtcp.ReportBlock(1)))
+
+class TestReceptionStats(unittest.TestCase):
+    def test_loss_and_jitter(self):
+        """Test loss per interval across the wrap and incremental jitter"""
+        stats = rtcp.ReceptionStats(1, clock_rate=8000)
+        for i, seq in enumerate((65533, 65534, 0, 1)):  # 65535 lost
+            # Every other packet arrives 10 ms late: |D| = 80 units each time
+            stats.update(seq, i * 160 + (160 if seq >= 65534 else 0),
+                         i * 0.02 + (0.01 if i % 2 else 0.0))
+        block = stats.report_block(now=1.0)
+        self.assertEqual(block.packets_lost, 1)
+        self.assertEqual(block.fraction_lost, 256 // 5)
+        self.assertEqual(block.highest_seq, 65536 + 1)
+        self.assertGreater(stats.jitter, 0)
+
+        stats.update(2, 800, 0.1)
+        self.assertEqual(stats.report_block(now=1.1).fraction_lost, 0)
+
+class TestRTCPExchange(unittest.TestCase):
+    def test_sender_gets_feedback(self):
+        """Test SR/RR over loopback give the sender RTT and loss figures"""
+        receiver = RTPReceiver("127.0.0.1", 0, rtcp_interval=0.05, stats_interval=None)
+        receiver.start_receiving(None)
+        sender = RTPSender("127.0.0.1", receiver.socket.getsockname()[1], ssrc=7,
+                           rtcp_interval=0.05, stats_interval=None)
+        try:
+            deadline = time.monotonic() + 3.0
+            while 'rtt_ms' not in sender.feedback and time.monotonic() < deadline:
+                sender.tick()
+                sender.poll_nacks(0.01)
+        finally:
+            receiver.stop_receiving()
+            sender.socket.close()
+
+        self.assertIn('rtt_ms', sender.feedback)
+        self.assertLess(sender.feedback['rtt_ms'], 1000)
+        self.assertEqual(sender.feedback['packets_lost'], 0)
+        self.assertGreater(receiver.rtcp_stats()['sender_packets'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
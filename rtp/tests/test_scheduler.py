@@ -0,0 +1,100 @@
+"""
+Tests for the pacing scheduler
+"""
+
+import contextlib
+import io
+import socket
+import time
+import unittest
+from ..core.packet import RTPPacket
+from ..core.sender import RTPSender
+from ..utils.scheduler import PacingScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestPacingScheduler(unittest.TestCase):
+    def _scheduler(self, policy):
+        self.clock = FakeClock()
+        self.runs = []
+        scheduler = PacingScheduler(policy=policy, max_catch_up=2, clock=self.clock)
+        scheduler.add(lambda: self.runs.append(self.clock.now), 0.02, start=0.0)
+        return scheduler
+
+    def test_deadlines_do_not_drift(self):
+        """Test late runs keep the absolute cadence"""
+        scheduler = self._scheduler(PacingScheduler.CATCH_UP)
+        for now in (0.0, 0.005, 0.025, 0.041, 0.059, 0.06):
+            self.clock.now = now
+            scheduler.run_pending()
+        self.assertEqual(self.runs, [0.0, 0.025, 0.041, 0.06])
+        self.assertAlmostEqual(scheduler.next_deadline(), 0.08)
+
+    def test_catch_up_is_bounded(self):
+        """Test a stall replays at most max_catch_up missed ticks"""
+        scheduler = self._scheduler(PacingScheduler.CATCH_UP)
+        scheduler.run_pending()
+        self.clock.now = 0.1  # Deadlines 0.02 .. 0.1 are due
+        scheduler.run_pending()
+        self.assertEqual(len(self.runs), 4)
+        self.assertEqual(scheduler.skipped, 2)
+        self.assertAlmostEqual(scheduler.next_deadline(), 0.12)
+
+    def test_skip_resumes_at_next_deadline(self):
+        """Test the skip policy drops the missed ticks"""
+        scheduler = self._scheduler(PacingScheduler.SKIP)
+        scheduler.run_pending()
+        self.clock.now = 0.1
+        scheduler.run_pending()
+        self.assertEqual(len(self.runs), 2)
+        self.assertEqual(scheduler.skipped, 4)
+        self.assertAlmostEqual(scheduler.next_deadline(), 0.12)
+        self.assertAlmostEqual(scheduler.lateness_percentiles((50, 100))[100], 80.0)
+
+    def test_duration_and_on_stop(self):
+        """Test a task ends after its duration and reports it once"""
+        self.clock = FakeClock()
+        stopped = []
+        scheduler = PacingScheduler(clock=self.clock)
+        scheduler.add(lambda: None, 0.02, start=0.0, duration=0.05,
+                      on_stop=lambda: stopped.append(True))
+        for step in range(10):
+            self.clock.now = step * 0.02
+            scheduler.run_pending()
+        self.assertEqual(stopped, [True])
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_drives_senders_and_nacks(self):
+        """Test one scheduler thread paces several senders and serves NACKs"""
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(1.0)
+        port = receiver.getsockname()[1]
+        senders = [RTPSender("127.0.0.1", port, ssrc=ssrc) for ssrc in (1, 2)]
+        scheduler = PacingScheduler()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.monotonic()
+                for sender in senders:
+                    scheduler.add_sender(sender, interval=0.01, start=start, duration=0.05)
+                scheduler.run(until=start + 0.03)
+                nack = RTPPacket.create_nack([0], ssrc=1)
+                receiver.sendto(nack.encode(), senders[0].socket.getsockname())
+                scheduler.run()
+
+            received = [RTPPacket.decode(receiver.recv(2048)) for _ in range(11)]
+            self.assertEqual(sorted((p.ssrc, p.seq_num) for p in received),
+                             sorted([(1, 0)] + [(ssrc, seq) for ssrc in (1, 2) for seq in range(5)]))
+            self.assertFalse(any(sender.running for sender in senders))
+        finally:
+            receiver.close()
+            for sender in senders:
+                sender.socket.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for the SSRC-demultiplexing RTP server
+"""
+
+import socket
+import unittest
+from ..core.packet import RTPPacket
+from ..core.server import RTPServer
+
+class ListSink:
+    def __init__(self):
+        self.seq_nums = []
+        self.closed = False
+
+    def write(self, packet):
+        self.seq_nums.append(packet.seq_num)
+
+    def close(self):
+        self.closed = True
+
+class TestRTPServer(unittest.TestCase):
+    def setUp(self):
+        self.sinks = {}
+
+        def sink_factory(ssrc, addr):
+            sink = self.sinks[ssrc] = ListSink()
+            return sink
+
+        self.server = RTPServer("127.0.0.1", 0, sink_factory=sink_factory, idle_timeout=5.0)
+        self.client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client.bind(("127.0.0.1", 0))
+        self.addr = self.client.getsockname()
+
+    def tearDown(self):
+        self.server.stop()
+        self.client.close()
+
+    def _receive(self, ssrc, seq_num, now=0.0):
+        packet = RTPPacket(seq_num=seq_num, timestamp=seq_num * 160, ssrc=ssrc, payload=b"x")
+        self.server.handle_datagram(packet.encode(), self.addr, now)
+
+    def test_demux_by_ssrc(self):
+        """Test interleaved streams are ordered and NACKed independently"""
+        for ssrc, seq in [(1, 10), (2, 500), (1, 12), (2, 501), (1, 11), (2, 501)]:
+            self._receive(ssrc, seq)
+
+        self.assertEqual(self.sinks[1].seq_nums, [10, 11, 12])
+        self.assertEqual(self.sinks[2].seq_nums, [500, 501])
+        stats = self.server.stream_stats()
+        self.assertEqual(stats[1]['lost_packets'], 1)
+        self.assertEqual(stats[1]['retransmissions_received'], 1)
+        self.assertEqual(stats[2]['out_of_order'], 1)
+
+        nack = RTPPacket.decode(self.client.recv(2048))
+        self.assertEqual(nack.ssrc, 1)
+        self.assertEqual(nack.get_nack_sequence_numbers(), [11])
+
+    def test_idle_expiry_flushes_sink(self):
+        """Test idle streams are flushed, closed and forgotten"""
+        self._receive(1, 0, now=0.0)
+        self._receive(1, 2, now=0.0)
+        self._receive(2, 0, now=4.0)
+
+        self.assertEqual(self.server.expire_idle(now=6.0), [1])
+        self.assertEqual(self.sinks[1].seq_nums, [0, 2])
+        self.assertTrue(self.sinks[1].closed)
+        self.assertEqual(list(self.server.streams), [2])
+        self.assertEqual(self.server.stats['streams_expired'], 1)
+
+    def test_hole_given_up_after_max_reorder(self):
+        """Test a packet that never arrives stops holding back playout"""
+        self.server.max_reorder = 3
+        for seq in (0, 1, 3, 4):  # 2 lost
+            self._receive(1, seq)
+        self.assertEqual(self.sinks[1].seq_nums, [0, 1])
+        self._receive(1, 5)
+        self.assertEqual(self.sinks[1].seq_nums, [0, 1, 3, 4, 5])
+        self._receive(1, 2)  # Too late
+        self.assertEqual(self.server.streams[1].out_of_order, 1)
+
+    def test_max_streams(self):
+        """Test streams beyond the limit are rejected"""
+        self.server.max_streams = 2
+        for ssrc in (1, 2, 3):
+            self._receive(ssrc, 0)
+        self.assertEqual(sorted(self.server.streams), [1, 2])
+        self.assertEqual(self.server.stats['streams_rejected'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
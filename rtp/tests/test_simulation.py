@@ -0,0 +1,70 @@
+"""
+Tests for the virtual-clock call simulation
+"""
+
+import unittest
+from ..core.simulation import CallSimulation, Simulation
+
+class TestSimulation(unittest.TestCase):
+    def test_events_run_in_time_order(self):
+        """Test events run in time then FIFO order and can be cancelled"""
+        simulation = Simulation()
+        order = []
+        simulation.call_at(2.0, order.append, 'c')
+        simulation.call_at(1.0, order.append, 'a')
+        simulation.call_at(1.0, order.append, 'b')
+        simulation.call_at(1.5, order.append, 'x').cancel()
+        simulation.call_at(5.0, order.append, 'late')
+        simulation.run(until=3.0)
+        self.assertEqual(order, ['a', 'b', 'c'])
+        self.assertEqual(simulation(), 3.0)
+
+class TestCallSimulation(unittest.TestCase):
+    def test_clean_network_delivers_everything(self):
+        """Test every packet is accepted without impairments"""
+        results = CallSimulation(duration=10, drop_rate=0.0, max_delay=0.0, reorder_rate=0.0,
+                                 duplicate_rate=0.0, rtcp_interval=1.0, seed=1).run()
+        self.assertEqual(results['packets_sent'], 500)
+        self.assertEqual(results['residual_loss'], 0.0)
+        self.assertEqual(results['nacks_sent'], 0)
+        self.assertAlmostEqual(results['rtt_ms'], 40.0, delta=1.0)
+
+    def test_seeded_runs_repeat_and_recover_loss(self):
+        """Test a seed reproduces a run and NACK + FEC recover most losses"""
+        def run():
+            results = CallSimulation(duration=60, drop_rate=0.1, burst_length=2.0,
+                                     fec_group_size=4, seed=5).run()
+            results.pop('rtt_ms')  # Quantized NTP times depend on the wall clock
+            return results
+        results = run()
+        self.assertEqual(results, run())
+        self.assertGreater(results['network_loss'], 0.05)
+        self.assertLess(results['residual_loss'], results['network_loss'] / 2)
+        self.assertGreater(results['retransmissions_received'], 0)
+        self.assertGreater(results['fec_recovered'], 0)
+
+    def test_history_expires_on_virtual_time(self):
+        """Test a NACK arriving after history_ms of virtual time gets no retransmission"""
+        def run(history_ms):
+            # 60 ms each way: a NACK reaches the sender over 120 ms after the packet was sent
+            return CallSimulation(duration=10, drop_rate=0.1, latency=0.06, max_delay=0.0,
+                                  reorder_rate=0.0, duplicate_rate=0.0, history_ms=history_ms,
+                                  rtcp_interval=None, seed=3).run()
+        expired = run(100)
+        self.assertGreater(expired['nacks_sent'], 0)
+        self.assertEqual(expired['retransmissions_sent'], 0)
+        self.assertGreater(run(500)['retransmissions_sent'], 0)
+
+    def test_nack_timeout_resends_open_holes(self):
+        """Test holes are NACKed again every nack_timeout until they are filled"""
+        def run(nack_timeout):
+            return CallSimulation(duration=30, drop_rate=0.1, burst_length=2.0,
+                                  nack_timeout=nack_timeout, seed=1).run()
+        fast, slow = run(0.05), run(1.0)
+        self.assertGreater(fast['nacks_sent'], slow['nacks_sent'])
+        self.assertGreater(fast['retransmissions_sent'], slow['retransmissions_sent'])
+        self.assertGreater(slow['residual_loss'], 0.0)
+        self.assertLess(fast['residual_loss'], slow['residual_loss'])
+
+if __name__ == '__main__':
+    unittest.main()
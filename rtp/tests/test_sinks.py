@@ -0,0 +1,90 @@
+"""
+Tests for the audio sinks
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+from ..core.packet import RTPPacket
+from ..utils.codecs import PT_CN
+from ..utils.sinks import MmapWaveSink, NullSink, ThreadedSink, WaveFileSink
+
+def _frame(seq, value, samples=160):
+    return RTPPacket(seq_num=seq & 0xFFFF, timestamp=(seq * samples) & 0xFFFFFFFF, ssrc=1,
+                     payload=bytes([value]) * (2 * samples))
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _read(self, path):
+        with wave.open(path, 'rb') as w:
+            return w.getframerate(), w.readframes(w.getnframes())
+
+    def test_lost_packets_become_silence(self):
+        """Test a sequence gap is filled with silence sized by the timestamps, across the wrap"""
+        sink = NullSink(plc=False)
+        for index in (65534, 65535, 65538, 65539):  # Sequence numbers 0 and 1 lost
+            sink.write(_frame(index, 1))
+        self.assertEqual(sink.concealed_frames, 2)
+        self.assertEqual(sink.concealed_samples, 320)
+        self.assertEqual(sink.bytes, (4 * 160 + 320) * 2)
+
+        # A jump beyond max_gap is a discontinuity, not silence
+        far = RTPPacket(seq_num=5, timestamp=65540 * 160 + 8000 * 60, ssrc=1, payload=bytes(320))
+        sink.write(far)
+        self.assertEqual(sink.concealed_samples, 320)
+
+    def test_threaded_wave_file(self):
+        """Test the background writer batches frames into a valid WAV file"""
+        path = os.path.join(self.dir, 'threaded.wav')
+        sink = ThreadedSink(WaveFileSink(path, plc=False), batch_bytes=4 * 320)
+        for seq in (0, 1, 3):
+            sink.write(_frame(seq, seq + 1))
+        sink.close()
+
+        rate, frames = self._read(path)
+        self.assertEqual(rate, 8000)
+        self.assertEqual(frames, b'\x01' * 320 + b'\x02' * 320 + bytes(320) + b'\x04' * 320)
+        self.assertLessEqual(sink.writes, 2)
+
+    def test_mmap_wave_file_grows(self):
+        """Test the memory-mapped file grows past its preallocation and is truncated on close"""
+        path = os.path.join(self.dir, 'mmap.wav')
+        sink = MmapWaveSink(path, preallocate=0.05)  # Room for 2.5 frames
+        for seq in range(10):
+            sink.write(_frame(seq, seq))
+        sink.close()
+
+        _, frames = self._read(path)
+        self.assertEqual(frames, b''.join(bytes([seq]) * 320 for seq in range(10)))
+        self.assertEqual(os.path.getsize(path), 44 + 10 * 320)
+
+    def test_threaded_comfort_noise_is_seeded(self):
+        """Test a ThreadedSink generates the wrapped sink's seeded comfort noise"""
+        packets = [_frame(0, 1),
+                   RTPPacket(payload_type=PT_CN, seq_num=1, timestamp=160, ssrc=1,
+                             payload=bytes([40])),
+                   RTPPacket(seq_num=2, timestamp=960, ssrc=1, payload=b'\x02' * 320)]
+        outputs = []
+        for threaded in (False, True, True):
+            path = os.path.join(self.dir, f'cn{len(outputs)}.wav')
+            sink = WaveFileSink(path, noise_seed=7)
+            if threaded:
+                sink = ThreadedSink(sink)
+            for packet in packets:
+                sink.write(packet)
+            sink.close()
+            outputs.append(self._read(path)[1])
+        self.assertEqual(len(outputs[0]), (160 + 800 + 160) * 2)
+        self.assertTrue(any(outputs[0][320:1920]))
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(outputs[2], outputs[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for batched socket I/O
+"""
+
+import socket
+import unittest
+from ..core.packet import RTPPacket
+from ..utils.socket_io import BufferPool, recv_batch, send_batch
+
+class TestSocketIO(unittest.TestCase):
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.pool = BufferPool(count=4, size=256)
+
+    def tearDown(self):
+        self.receiver.close()
+        self.sender.close()
+
+    def _send(self, seq_nums):
+        datagrams = [RTPPacket(seq_num=seq, ssrc=1, payload=bytes([seq]) * 20).encode()
+                     for seq in seq_nums]
+        send_batch(self.sender, datagrams, self.receiver.getsockname())
+
+    def test_drain_into_pool(self):
+        """Test a batch drains queued datagrams up to the pool size"""
+        self._send(range(6))
+        batch = recv_batch(self.receiver, self.pool, 1.0)
+        self.assertEqual([RTPPacket.decode(data).seq_num for data, _ in batch], [0, 1, 2, 3])
+        self.assertEqual(batch[0][1][1], self.sender.getsockname()[1])
+
+        batch = recv_batch(self.receiver, self.pool, 1.0)
+        self.assertEqual([RTPPacket.decode(data).seq_num for data, _ in batch], [4, 5])
+        self.assertEqual(recv_batch(self.receiver, self.pool, 0.01), [])
+
+    def test_detach_survives_slot_reuse(self):
+        """Test a detached packet keeps its payload when the slot is refilled"""
+        self._send([1])
+        kept = RTPPacket.decode(recv_batch(self.receiver, self.pool, 1.0)[0][0])
+        self.assertEqual(bytes(kept.payload), bytes([1]) * 20)
+        kept.detach()
+
+        self._send([2])
+        recv_batch(self.receiver, self.pool, 1.0)
+        self.assertEqual(bytes(kept.payload), bytes([1]) * 20)
+        self.assertEqual(kept.encode(), RTPPacket(seq_num=1, ssrc=1, payload=bytes([1]) * 20).encode())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for silence suppression and comfort noise
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+import numpy as np
+from ..core.packet import RTPPacket
+from ..core.receiver import RTPReceiver
+from ..core.sender import RTPSender
+from ..utils.codecs import PT_CN
+from ..utils.sinks import NullSink
+from ..utils.vad import (VoiceActivityDetector, decode_comfort_noise, encode_comfort_noise,
+                         frame_levels, level_dbov)
+
+def _tone(seconds, amplitude=8000):
+    return np.rint(np.sin(np.arange(int(8000 * seconds)) / 3) * amplitude).astype('<i2')
+
+def _noise(seconds, level, seed=0):
+    rms = 32768 * 10 ** (level / 20)
+    noise = np.random.default_rng(seed).standard_normal(int(8000 * seconds)) * rms
+    return np.rint(noise).astype('<i2')
+
+class TestVad(unittest.TestCase):
+    def test_levels_and_detection(self):
+        """Test frame levels in dBov and speech/silence decisions with hangover"""
+        tone = _tone(0.02, 16384)  # Sine at half scale: -9 dBov
+        self.assertAlmostEqual(level_dbov(tone.tobytes()), -9.03, delta=0.1)
+        self.assertEqual(level_dbov(bytes(320)), -127.0)
+        pcm = np.concatenate([tone, _noise(0.02, -60)]).tobytes()
+        np.testing.assert_allclose(frame_levels(pcm),
+                                   [level_dbov(pcm[:320]), level_dbov(pcm[320:])])
+
+        vad = VoiceActivityDetector(hangover=2)
+        frames = ([_noise(0.02, -60, seed) for seed in range(3)] + [_tone(0.02)] * 2
+                  + [_noise(0.02, -60, seed) for seed in range(3, 7)])
+        decisions = [vad.is_active(frame.tobytes()) for frame in frames]
+        self.assertEqual(decisions, [False] * 3 + [True] * 2 + [True] * 2 + [False] * 2)
+        self.assertLess(vad.noise_floor, -58)  # Tracks the quiet frames, not the tone
+        self.assertEqual(decode_comfort_noise(encode_comfort_noise(vad.level)), round(vad.level))
+
+    def test_dtx_call_keeps_timeline_without_loss(self):
+        """Test silent frames become comfort noise on the receiver and are not counted lost"""
+        audio = np.concatenate([_tone(1), _noise(1, -65), _tone(1)])
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'talk.wav')
+            with wave.open(path, 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(8000)
+                w.writeframes(audio.tobytes())
+            sender = RTPSender('127.0.0.1', 9, payload_type=0, vad=VoiceActivityDetector(),
+                               cn_interval=0.5, stats_interval=None, rtcp_interval=None)
+            sender.socket.close()
+            sent = []
+            sender._send_batch = lambda datagrams: sent.extend(bytes(d) for d in datagrams)
+            sender.set_audio_file(path)
+            while sender.tick():
+                pass
+        finally:
+            shutil.rmtree(directory)
+
+        packets = [RTPPacket.decode(data) for data in sent]
+        cn = [p for p in packets if p.payload_type == PT_CN]
+        self.assertEqual(sender.stats['frames_suppressed'], 50 - 8)  # Minus the hangover
+        self.assertEqual(len(cn), 2)  # At the start of the silence and 0.5 s later
+        self.assertEqual(len(packets), 150 - 42 + 2)
+        self.assertEqual([p.seq_num for p in packets], list(range(len(packets))))
+        self.assertEqual([p.seq_num for p in packets if p.marker], [0, 60])
+
+        receiver = RTPReceiver('127.0.0.1', 0, stats_interval=None, rtcp_interval=None)
+        receiver.socket.close()
+        receiver._sendto = lambda data, addr: None
+        frames = []
+        receiver.sink = NullSink(noise_seed=0)
+        receiver.sink.write_frames = frames.append
+        for packet in packets:
+            receiver._process_packet(packet, ('127.0.0.1', 9))
+
+        self.assertEqual(receiver.stats['lost_packets'], 0)
+        self.assertEqual(receiver.stats['comfort_noise_received'], 2)
+        output = np.frombuffer(b''.join(frames), dtype='<i2')
+        self.assertEqual(len(output), len(audio))
+        self.assertEqual(receiver.sink.comfort_noise_samples, 42 * 160)
+        self.assertAlmostEqual(level_dbov(output[8000 + 8 * 160:16000].tobytes()), -65, delta=2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for SO_REUSEPORT receiver workers
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+import wave
+from ..core.packet import RTPPacket
+from ..core.workers import ReceiverWorkers
+
+@unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'), "SO_REUSEPORT not available")
+class TestReceiverWorkers(unittest.TestCase):
+    def _free_port(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return port
+
+    def test_stats_aggregated_across_workers(self):
+        """Test every flow is received once and counted in the merged stats"""
+        port = self._free_port()
+        workers = ReceiverWorkers("127.0.0.1", port, 2, output_pattern=None,
+                                  stats_interval=0.1, quiet=True)
+        workers.start()
+        senders = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(4)]
+        try:
+            time.sleep(0.5)  # Let the workers bind
+            for ssrc, sock in enumerate(senders, 1):
+                for seq in range(10):
+                    packet = RTPPacket(seq_num=seq, ssrc=ssrc, payload=b"x")
+                    sock.sendto(packet.encode(), ("127.0.0.1", port))
+            time.sleep(0.3)
+        finally:
+            stats = workers.stop()
+            for sock in senders:
+                sock.close()
+
+        self.assertTrue(all(workers.finished))
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(stats['packets_received'], 40)
+        self.assertEqual(sum(s['packets_received'] for s in stats['per_worker']), 40)
+        for key in ('rtcp_sent', 'comfort_noise_received', 'concealed_frames'):
+            self.assertEqual(stats[key], sum(s[key] for s in stats['per_worker']))
+
+    def test_mmap_sink_per_worker(self):
+        """Test each worker writes its own memory-mapped WAV file when asked"""
+        directory = tempfile.mkdtemp()
+        port = self._free_port()
+        pattern = os.path.join(directory, 'out-{worker}.wav')
+        workers = ReceiverWorkers("127.0.0.1", port, 2, output_pattern=pattern, sink='mmap',
+                                  stats_interval=0.1, quiet=True)
+        workers.start()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            time.sleep(0.5)
+            for seq in range(10):
+                packet = RTPPacket(seq_num=seq, timestamp=seq * 80, ssrc=1, payload=bytes(160))
+                sock.sendto(packet.encode(), ("127.0.0.1", port))
+            time.sleep(0.3)
+        finally:
+            workers.stop()
+            sock.close()
+        try:
+            frames = 0
+            for index in range(2):
+                with wave.open(pattern.format(worker=index), 'rb') as w:
+                    frames += w.getnframes()
+            self.assertEqual(frames, 10 * 80)  # 16-bit PCM payloads
+        finally:
+            shutil.rmtree(directory)
+
+    def test_requires_explicit_port(self):
+        """Test sharded workers need a fixed port to share and a known sink"""
+        with self.assertRaises(ValueError):
+            ReceiverWorkers("127.0.0.1", 0, 2)
+        with self.assertRaises(ValueError):
+            ReceiverWorkers("127.0.0.1", 5004, 2, sink='tape')
+
+if __name__ == '__main__':
+    unittest.main()
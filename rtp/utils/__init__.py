@@ -2,8 +2,31 @@
 Utility modules for RTP implementation
 """
 
-from .fec import FECHandler
+from .fec import FECHandler, FECRecoveryIndex
+from .fec_schemes import FECScheme, XORScheme, Parity2DScheme, ReedSolomonScheme
 from .retransmission import RetransmissionHandler
+from .packet_history import PacketHistory
+from .reorder_buffer import ReorderBuffer
+from .jitter_buffer import JitterBuffer
+from .socket_io import BufferPool, recv_batch, send_batch
+from .scheduler import PacingScheduler
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry, MetricsReporter, MetricsServer
+from .impairments import (Impairment, UniformLoss, GilbertElliottLoss, Delay, Reorder,
+                          Duplicate, NetworkModel)
 from .network_simulator import SimulatedNetwork
+from .codecs import Codec, PCM16, PCMU, PCMA, get_codec, register_codec
+from .packetizer import Packetizer
+from .vad import VoiceActivityDetector, ComfortNoise
+from .plc import PacketLossConcealer
+from .media import WaveFormat, WaveSource, load_pcm
+from .sinks import AudioSink, NullSink, WaveFileSink, MmapWaveSink, ThreadedSink
 
-__all__ = ['FECHandler', 'RetransmissionHandler', 'SimulatedNetwork'] 
\ No newline at end of file
+__all__ = ['FECHandler', 'FECRecoveryIndex', 'FECScheme', 'XORScheme', 'Parity2DScheme',
+           'ReedSolomonScheme', 'RetransmissionHandler', 'PacketHistory', 'ReorderBuffer',
+           'JitterBuffer', 'BufferPool', 'recv_batch', 'send_batch', 'PacingScheduler',
+           'Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'MetricsReporter',
+           'MetricsServer', 'Impairment', 'UniformLoss', 'GilbertElliottLoss', 'Delay',
+           'Reorder', 'Duplicate', 'NetworkModel', 'SimulatedNetwork', 'AudioSink', 'NullSink', 'WaveFileSink',
+           'MmapWaveSink', 'ThreadedSink', 'WaveFormat', 'WaveSource', 'load_pcm', 'Codec', 'PCM16', 'PCMU',
+           'PCMA', 'get_codec', 'register_codec', 'Packetizer',
+           'VoiceActivityDetector', 'ComfortNoise', 'PacketLossConcealer'] 
\ No newline at end of file
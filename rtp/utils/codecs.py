@@ -0,0 +1,153 @@
+"""
+Audio codecs: 16-bit PCM and G.711 µ-law/A-law
+
+A codec turns frames of 16-bit little-endian PCM (what the media sources
+produce and the sinks write) into RTP payloads and back. G.711 maps every
+sample to one byte through a lookup table, built once at import from the
+reference segment tables: encoding indexes a 65536-entry table with the
+samples and decoding a 256-entry table with the bytes, so a whole frame is
+converted in one NumPy operation.
+
+Codecs are registered by RTP payload type and name; the sender picks its
+codec from its payload type and sinks decode by the payload type of each
+packet.
+"""
+
+import numpy as np
+
+PT_PCMU = 0   # G.711 µ-law, RFC 3551
+PT_PCMA = 8   # G.711 A-law, RFC 3551
+PT_CN = 13    # Comfort noise, RFC 3389: a noise level, not a codec (see vad.py)
+PT_PCM16 = 96  # Dynamic: 16-bit little-endian PCM, what the sender sent before codecs
+
+_BY_PAYLOAD_TYPE = {}
+_BY_NAME = {}
+
+# Upper ends of the G.711 segments (14-bit µ-law and 13-bit A-law magnitudes)
+_ULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEGMENT_ENDS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+
+
+class Codec:
+    """Converts frames of 16-bit PCM to RTP payloads and back
+
+    Attributes:
+        name: Encoding name as in SDP (PCMU, PCMA)
+        payload_type: RTP payload type
+        clock_rate: RTP clock rate in Hz
+        bytes_per_sample: Encoded bytes per sample
+    """
+    def __init__(self, name, payload_type, clock_rate=8000, bytes_per_sample=1):
+        self.name = name
+        self.payload_type = payload_type
+        self.clock_rate = clock_rate
+        self.bytes_per_sample = bytes_per_sample
+
+    def encode(self, pcm):
+        """Encode a frame of 16-bit little-endian PCM into a payload"""
+        raise NotImplementedError
+
+    def decode(self, payload):
+        """Decode a payload into 16-bit little-endian PCM"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name}, pt={self.payload_type})"
+
+
+class PCM16Codec(Codec):
+    """16-bit PCM sent as is"""
+    def __init__(self, payload_type=PT_PCM16):
+        super().__init__('PCM16', payload_type, bytes_per_sample=2)
+
+    def encode(self, pcm):
+        return pcm
+
+    def decode(self, payload):
+        return payload
+
+
+class TableCodec(Codec):
+    """Codec mapping each 16-bit sample to one byte through lookup tables"""
+    def __init__(self, name, payload_type, encode_table, decode_table):
+        """
+        Args:
+            encode_table: 65536 uint8 codes indexed by the sample as uint16
+            decode_table: 256 int16 samples indexed by the code
+        """
+        super().__init__(name, payload_type)
+        self.encode_table = encode_table
+        self.decode_table = decode_table.astype('<i2')
+
+    def encode(self, pcm):
+        samples = np.frombuffer(pcm, dtype='<u2', count=len(pcm) // 2)
+        return self.encode_table[samples].tobytes()
+
+    def decode(self, payload):
+        return self.decode_table[np.frombuffer(payload, dtype=np.uint8)].tobytes()
+
+
+def _ulaw_tables():
+    # Reference algorithm of the G.711 C code, on every sample at once
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    value = samples >> 2
+    mask = np.where(value < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(value), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+    segment = np.searchsorted(_ULAW_SEGMENT_ENDS, value)
+    codes = (segment << 4) | ((value >> (segment + 1)) & 0xF)
+    codes = np.where(segment >= 8, 0x7F, codes) ^ mask
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[samples.astype(np.uint16)] = codes
+
+    code = ~np.arange(256) & 0xFF
+    t = (((code & 0x0F) << 3) + _ULAW_BIAS) << ((code & 0x70) >> 4)
+    decode = np.where(code & 0x80, _ULAW_BIAS - t, t - _ULAW_BIAS)
+    return encode, decode
+
+
+def _alaw_tables():
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    value = samples >> 3
+    mask = np.where(value >= 0, 0xD5, 0x55)
+    value = np.where(value >= 0, value, -value - 1)
+    segment = np.searchsorted(_ALAW_SEGMENT_ENDS, value)
+    shift = np.where(segment < 2, 1, segment)
+    codes = (segment << 4) | ((value >> shift) & 0xF)
+    codes = np.where(segment >= 8, 0x7F, codes) ^ mask
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[samples.astype(np.uint16)] = codes
+
+    code = np.arange(256) ^ 0x55
+    segment = (code & 0x70) >> 4
+    t = ((code & 0x0F) << 4) + np.where(segment == 0, 8, 0x108)
+    t = np.where(segment > 1, t << np.maximum(segment - 1, 0), t)
+    decode = np.where(code & 0x80, t, -t)
+    return encode, decode
+
+
+def register_codec(codec):
+    """Make a codec available by payload type and name"""
+    _BY_PAYLOAD_TYPE[codec.payload_type] = codec
+    _BY_NAME[codec.name.lower()] = codec
+
+
+def get_codec(key):
+    """Registered codec for a payload type or name, None if there is none"""
+    if isinstance(key, str):
+        return _BY_NAME.get(key.lower())
+    return _BY_PAYLOAD_TYPE.get(key)
+
+
+def codec_names():
+    """Names of the registered codecs"""
+    return [codec.name for codec in _BY_NAME.values()]
+
+
+PCM16 = PCM16Codec()
+PCMU = TableCodec('PCMU', PT_PCMU, *_ulaw_tables())
+PCMA = TableCodec('PCMA', PT_PCMA, *_alaw_tables())
+
+for _codec in (PCM16, PCMU, PCMA):
+    register_codec(_codec)
@@ -1,94 +1,321 @@
 import struct
+from collections import deque
+import numpy as np
 from rtp.core.packet import RTPPacket
+from rtp.utils.fec_schemes import create_scheme, scheme_from_header
+
+# FEC payload format (carried in an RTP packet with PT_FEC)
+#  0                   1                   2                   3
+#  0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+# |   scheme ID   |  group size k | repair index  |  scheme param |
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+# |            SN base            |M| PT recovery |   reserved    |
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+# |        length recovery        |      timestamp recovery       |
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+# |   timestamp recovery (cont.)  |  payload parity (length of    |
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+  the longest payload)  ....   |
+# +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+#
+# The group protects the k packets with sequence numbers SN base .. SN base+k-1
+# (mod 2^16). Every protected packet is turned into a symbol: an 8-byte
+# recovery block (M|PT, 0, payload length, timestamp) followed by its payload,
+# zero-padded to the longest payload of the group. Everything after the first
+# 6 bytes is one repair symbol computed by the scheme (see fec_schemes.py):
+# for XOR it is the XOR of all symbols, so XOR-ing it with the symbols of the
+# k-1 received packets yields the missing packet's marker, payload type,
+# timestamp, exact payload length and payload.
+
+_FEC_HEADER = struct.Struct('!BBBBH')
+_RECOVERY = struct.Struct('!BxHI')
+FEC_HEADER_SIZE = _FEC_HEADER.size + _RECOVERY.size
+
+
+def make_symbols(packets, length):
+    """Build the symbols of a list of packets
+
+    Args:
+        packets: Packets to convert
+        length: Payload length every symbol is zero-padded to
+
+    Returns:
+        (len(packets), 8 + length) uint8 array, one symbol per row
+    """
+    parts = []
+    for packet in packets:
+        payload = packet.payload_view
+        parts.append(_RECOVERY.pack((packet.marker << 7) | packet.payload_type,
+                                    len(payload), packet.timestamp))
+        parts.append(payload)
+        parts.append(bytes(length - len(payload)))
+    symbols = np.frombuffer(b''.join(parts), dtype=np.uint8)
+    return symbols.reshape(len(packets), _RECOVERY.size + length)
+
+
+def packet_from_symbol(symbol, seq_num, ssrc):
+    """Rebuild a packet from a recovered symbol, or None if it is corrupt"""
+    data = symbol.tobytes()
+    marker_pt, payload_length, timestamp = _RECOVERY.unpack_from(data)
+    if payload_length > len(data) - _RECOVERY.size:
+        return None
+    packet = RTPPacket(
+        payload_type=marker_pt & 0x7F,
+        seq_num=seq_num,
+        timestamp=timestamp,
+        ssrc=ssrc,
+        payload=data[_RECOVERY.size:_RECOVERY.size + payload_length]
+    )
+    packet.marker = marker_pt >> 7
+    return packet
+
+
+def parse_fec_packet(fec_packet):
+    """Parse an FEC packet
+
+    Returns:
+        (scheme, repair index, protected sequence numbers, repair symbol)
+    """
+    payload = fec_packet.payload_view
+    if len(payload) < FEC_HEADER_SIZE:
+        raise ValueError("FEC packet too small")
+    scheme_id, count, index, param, base = _FEC_HEADER.unpack_from(payload)
+    scheme = scheme_from_header(scheme_id, count, param)
+    seq_nums = [(base + i) % 65536 for i in range(count)]
+    symbol = np.frombuffer(payload, dtype=np.uint8, offset=_FEC_HEADER.size)
+    return scheme, index, seq_nums, symbol
+
 
 class FECHandler:
-    def __init__(self, group_size=4):
+    def __init__(self, group_size=4, scheme='xor', repair_count=None):
         """Initialize FEC handler
-        
+
         Args:
             group_size: Number of packets in each FEC group
+            scheme: 'xor', '2d', 'rs' or an FECScheme instance
+            repair_count: Repair packets per group for 'rs', columns for '2d'
         """
-        self.group_size = group_size
+        self.scheme = create_scheme(scheme, group_size, repair_count)
+        self.group_size = self.scheme.source_count
         self.packet_buffer = []
-        self.fec_packet = None
-        
+        self.fec_packets = []
+        self.fec_seq_num = 0  # FEC packets use their own sequence space
+
     def add_packet(self, packet):
-        """Add a packet to the current FEC group"""
+        """Add a packet to the current FEC group
+
+        Returns:
+            List of FEC packets, empty until the group is complete
+        """
+        # Groups cover consecutive sequence numbers; restart on a gap
+        if self.packet_buffer and packet.seq_num != (self.packet_buffer[-1].seq_num + 1) % 65536:
+            self.packet_buffer = []
         self.packet_buffer.append(packet)
-        
+
         if len(self.packet_buffer) == self.group_size:
-            self._generate_fec_packet()
-            return self.fec_packet
-        return None
-        
-    def _generate_fec_packet(self):
-        """Generate FEC packet for current group"""
+            self.fec_packets = self._generate_fec_packets()
+            return self.fec_packets
+        return []
+
+    def _generate_fec_packets(self):
+        """Generate the FEC packets for current group"""
         if len(self.packet_buffer) < self.group_size:
-            return None
-            
-        # Get sequence numbers of packets in group
-        seq_nums = [p.seq_num for p in self.packet_buffer]
-        
-        # Pack sequence numbers into metadata
-        metadata = struct.pack('!' + 'H' * len(seq_nums), *seq_nums)
-        
-        # XOR all payloads together
-        fec_payload = self.packet_buffer[0].payload
-        for packet in self.packet_buffer[1:]:
-            fec_payload = bytes(a ^ b for a, b in zip(fec_payload, packet.payload))
-        
-        # Create FEC packet
-        fec_packet = RTPPacket(
-            payload_type=RTPPacket.PT_FEC,
-            seq_num=self.packet_buffer[-1].seq_num + 1,
-            timestamp=self.packet_buffer[-1].timestamp,
-            ssrc=self.packet_buffer[0].ssrc,
-            payload=metadata + fec_payload
-        )
-        
+            return []
+
+        first = self.packet_buffer[0]
+        last = self.packet_buffer[-1]
+        length = max(len(p.payload_view) for p in self.packet_buffer)
+        repairs = self.scheme.encode(make_symbols(self.packet_buffer, length))
+
+        fec_packets = []
+        for index, symbol in enumerate(repairs):
+            header = _FEC_HEADER.pack(self.scheme.scheme_id, self.group_size, index,
+                                      self.scheme.param, first.seq_num)
+            fec_packets.append(RTPPacket(
+                payload_type=RTPPacket.PT_FEC,
+                seq_num=self.fec_seq_num,
+                timestamp=last.timestamp,
+                ssrc=first.ssrc,
+                payload=header + symbol.tobytes()
+            ))
+            self.fec_seq_num = (self.fec_seq_num + 1) % 65536
+
         # Clear current group
         self.packet_buffer = []
-        
-        return fec_packet
-        
+
+        return fec_packets
+
+    @staticmethod
+    def get_protected_seq_nums(fec_packet):
+        """Get the sequence numbers protected by an FEC packet"""
+        _, count, _, _, base = _FEC_HEADER.unpack_from(fec_packet.payload_view)
+        return [(base + i) % 65536 for i in range(count)]
+
+    def recover_packets(self, fec_packets, available_packets):
+        """Recover lost packets of one group using its FEC packets
+
+        Args:
+            fec_packets: FEC packets received for the group
+            available_packets: List of available packets in the group
+
+        Returns:
+            List of recovered RTP packets
+        """
+        fec_packets = [p for p in fec_packets if p and p.payload_type == RTPPacket.PT_FEC]
+        if not fec_packets:
+            return []
+        try:
+            parsed = [parse_fec_packet(p) for p in fec_packets]
+        except ValueError:
+            return []
+
+        scheme, _, seq_nums, symbol = parsed[0]
+        repairs = {index: sym for s, index, seqs, sym in parsed
+                   if s is scheme and seqs == seq_nums and len(sym) == len(symbol)}
+        position = {seq: i for i, seq in enumerate(seq_nums)}
+        available = {position[p.seq_num]: p for p in available_packets if p.seq_num in position}
+
+        missing = len(seq_nums) - len(available)
+        if not scheme.can_recover(missing, repairs):
+            return []
+        length = len(symbol) - _RECOVERY.size
+        if any(len(p.payload_view) > length for p in available.values()):
+            return []
+
+        sources = {}
+        if available:
+            indices = list(available)
+            rows = make_symbols([available[i] for i in indices], length)
+            sources = dict(zip(indices, rows))
+
+        recovered = []
+        for index, row in sorted(scheme.decode(sources, repairs).items()):
+            packet = packet_from_symbol(row, seq_nums[index], fec_packets[0].ssrc)
+            if packet:
+                recovered.append(packet)
+        return recovered
+
     def recover_packet(self, fec_packet, available_packets):
         """Recover a lost packet using FEC data
-        
+
         Args:
             fec_packet: The FEC packet for the group
             available_packets: List of available packets in the group
-            
+
         Returns:
             Recovered RTP packet or None if recovery not possible
         """
-        if not fec_packet or fec_packet.payload_type != RTPPacket.PT_FEC:
-            return None
-            
-        # Extract sequence numbers from FEC packet
-        num_packets = len(fec_packet.payload) // 2
-        seq_nums = struct.unpack('!' + 'H' * num_packets, 
-                               fec_packet.payload[:num_packets * 2])
-        
-        # Find missing sequence number
-        available_seq_nums = set(p.seq_num for p in available_packets)
-        missing_seq_nums = set(seq_nums) - available_seq_nums
-        
-        if len(missing_seq_nums) != 1:
-            return None  # Can only recover one lost packet
-            
-        missing_seq_num = missing_seq_nums.pop()
-        
-        # XOR FEC data with available packets to recover missing packet
-        fec_data = bytearray(fec_packet.payload[num_packets * 2:])
-        
-        for packet in available_packets:
-            packet_data = packet.encode()
-            for i in range(len(fec_data)):
-                if i < len(packet_data):
-                    fec_data[i] ^= packet_data[i]
-        
-        # Create recovered packet
-        recovered_packet = RTPPacket.decode(bytes(fec_data))
-        recovered_packet.seq_num = missing_seq_num
-        
-        return recovered_packet 
\ No newline at end of file
+        recovered = self.recover_packets([fec_packet], available_packets)
+        return recovered[0] if len(recovered) == 1 else None
+
+
+class _FECGroup:
+    """Repair symbols received so far for one FEC group"""
+    __slots__ = ('scheme', 'seq_nums', 'ssrc', 'repairs', 'symbol_size')
+
+    def __init__(self, scheme, seq_nums, ssrc, symbol_size):
+        self.scheme = scheme
+        self.seq_nums = seq_nums
+        self.ssrc = ssrc
+        self.repairs = {}
+        self.symbol_size = symbol_size
+
+
+class FECRecoveryIndex:
+    """Receiver-side FEC recovery index
+
+    Keeps recent media packets and the repair symbols of open FEC groups, and
+    attempts decoding as soon as a group holds enough symbols - whether the
+    last one needed is a media or an FEC packet.
+    """
+    def __init__(self, capacity=1024, max_groups=64):
+        """
+        Args:
+            capacity: Number of recent media packets kept for decoding
+            max_groups: Number of incomplete FEC groups kept open
+        """
+        self.capacity = capacity
+        self.max_groups = max_groups
+        self.packets = {}  # seq_num -> media packet
+        self.packet_order = deque()
+        self.groups = {}  # SN base -> _FECGroup
+        self.group_of = {}  # seq_num -> SN base of the group protecting it
+        self.recovered_count = 0
+
+    def add_media(self, packet):
+        """Add a received media packet
+
+        Returns:
+            List of packets recovered thanks to this packet
+        """
+        self._store(packet)
+        base = self.group_of.get(packet.seq_num)
+        if base is None:
+            return []
+        return self._try_decode(base)
+
+    def add_fec(self, fec_packet):
+        """Add a received FEC packet
+
+        Returns:
+            List of packets recovered thanks to this packet
+        """
+        try:
+            scheme, index, seq_nums, symbol = parse_fec_packet(fec_packet)
+        except ValueError:
+            return []
+        base = seq_nums[0]
+        group = self.groups.get(base)
+        if group is None or group.seq_nums != seq_nums or group.scheme is not scheme:
+            if len(self.groups) >= self.max_groups:
+                self._drop_group(next(iter(self.groups)))
+            group = self.groups[base] = _FECGroup(scheme, seq_nums, fec_packet.ssrc, len(symbol))
+            for seq in seq_nums:
+                self.group_of[seq] = base
+        if len(symbol) == group.symbol_size:
+            # Kept until the group decodes: copy it out of the receive buffer
+            group.repairs[index] = symbol.copy()
+        return self._try_decode(base)
+
+    def _store(self, packet):
+        packet.detach()  # Kept beyond the receive batch
+        if packet.seq_num not in self.packets:
+            self.packet_order.append(packet.seq_num)
+            if len(self.packet_order) > self.capacity:
+                self.packets.pop(self.packet_order.popleft(), None)
+        self.packets[packet.seq_num] = packet
+
+    def _drop_group(self, base):
+        group = self.groups.pop(base)
+        for seq in group.seq_nums:
+            if self.group_of.get(seq) == base:
+                del self.group_of[seq]
+
+    def _try_decode(self, base):
+        group = self.groups[base]
+        sources = {i: self.packets[seq] for i, seq in enumerate(group.seq_nums)
+                   if seq in self.packets}
+        missing = len(group.seq_nums) - len(sources)
+        if missing == 0:
+            self._drop_group(base)
+            return []
+        if not group.scheme.can_recover(missing, group.repairs):
+            return []
+
+        length = group.symbol_size - _RECOVERY.size
+        if any(len(p.payload_view) > length for p in sources.values()):
+            return []
+        indices = list(sources)
+        rows = make_symbols([sources[i] for i in indices], length) if indices else []
+        decoded = group.scheme.decode(dict(zip(indices, rows)), group.repairs)
+
+        recovered = []
+        for index, row in sorted(decoded.items()):
+            packet = packet_from_symbol(row, group.seq_nums[index], group.ssrc)
+            if packet:
+                self._store(packet)
+                recovered.append(packet)
+        self.recovered_count += len(recovered)
+        if len(sources) + len(recovered) == len(group.seq_nums):
+            self._drop_group(base)
+        return recovered
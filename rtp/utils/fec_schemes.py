@@ -0,0 +1,219 @@
+"""
+Pluggable FEC schemes used by FECHandler
+
+A scheme maps the k source symbols of a group (one row per packet, see
+``rtp/utils/fec.py`` for the symbol layout) to its repair symbols, and back
+from any sufficient subset of source and repair symbols to the missing
+source symbols. All arithmetic is over GF(256), where addition is XOR.
+"""
+
+import numpy as np
+
+from rtp.utils import gf256
+
+
+class FECScheme:
+    """Base class for FEC schemes
+
+    Attributes:
+        scheme_id: Identifier carried in every repair packet
+        source_count: Number of source packets per group (k)
+        repair_count: Number of repair packets per group (n - k)
+    """
+    scheme_id = None
+
+    def __init__(self, source_count, repair_count):
+        self.source_count = source_count
+        self.repair_count = repair_count
+
+    @property
+    def param(self):
+        """Scheme parameter carried in the repair header"""
+        return 0
+
+    def encode(self, symbols):
+        """Compute repair symbols
+
+        Args:
+            symbols: (k, L) uint8 array of source symbols
+
+        Returns:
+            (repair_count, L) uint8 array of repair symbols
+        """
+        raise NotImplementedError
+
+    def can_recover(self, missing, repairs):
+        """Cheap check whether decoding is worth attempting
+
+        Args:
+            missing: Number of missing source symbols
+            repairs: Indices of the repair symbols received
+        """
+        return 0 < missing <= len(repairs)
+
+    def decode(self, sources, repairs):
+        """Recover missing source symbols
+
+        Args:
+            sources: dict of source index -> symbol for received packets
+            repairs: dict of repair index -> symbol for received repairs
+
+        Returns:
+            dict of source index -> symbol for every recovered packet
+        """
+        raise NotImplementedError
+
+
+class XORScheme(FECScheme):
+    """Single parity symbol over the whole group; recovers one loss"""
+    scheme_id = 0
+
+    def __init__(self, source_count):
+        super().__init__(source_count, 1)
+
+    def encode(self, symbols):
+        return np.bitwise_xor.reduce(symbols, axis=0)[None, :]
+
+    def can_recover(self, missing, repairs):
+        return missing == 1 and 0 in repairs
+
+    def decode(self, sources, repairs):
+        missing = [i for i in range(self.source_count) if i not in sources]
+        if len(missing) != 1 or 0 not in repairs:
+            return {}
+        rows = np.stack([repairs[0]] + list(sources.values()))
+        return {missing[0]: np.bitwise_xor.reduce(rows, axis=0)}
+
+
+class Parity2DScheme(FECScheme):
+    """Row and column XOR parity over a rows x cols grid of packets
+
+    Source i sits at row i // cols, column i % cols. Repair indices
+    0..rows-1 are row parities and rows..rows+cols-1 column parities.
+    Column parity covers bursts up to ``cols`` long; decoding peels any
+    equation with a single unknown until no progress is made.
+    """
+    scheme_id = 1
+
+    def __init__(self, rows, cols):
+        super().__init__(rows * cols, rows + cols)
+        self.rows = rows
+        self.cols = cols
+        self.equations = ([list(range(r * cols, (r + 1) * cols)) for r in range(rows)] +
+                          [list(range(c, rows * cols, cols)) for c in range(cols)])
+
+    @property
+    def param(self):
+        return self.cols
+
+    def encode(self, symbols):
+        grid = symbols.reshape(self.rows, self.cols, -1)
+        return np.concatenate([np.bitwise_xor.reduce(grid, axis=1),
+                               np.bitwise_xor.reduce(grid, axis=0)])
+
+    def can_recover(self, missing, repairs):
+        return missing > 0 and len(repairs) > 0
+
+    def decode(self, sources, repairs):
+        known = dict(sources)
+        recovered = {}
+        progress = True
+        while progress:
+            progress = False
+            for index, members in enumerate(self.equations):
+                if index not in repairs:
+                    continue
+                unknown = [i for i in members if i not in known]
+                if len(unknown) != 1:
+                    continue
+                rows = np.stack([repairs[index]] + [known[i] for i in members if i in known])
+                known[unknown[0]] = recovered[unknown[0]] = np.bitwise_xor.reduce(rows, axis=0)
+                progress = True
+        return recovered
+
+
+class ReedSolomonScheme(FECScheme):
+    """Systematic Reed-Solomon (n, k) code over GF(256)
+
+    The generator is an identity matrix stacked over an (n-k) x k Cauchy
+    matrix, so any k of the n symbols recover the whole group.
+    """
+    scheme_id = 2
+
+    def __init__(self, source_count, total_count):
+        super().__init__(source_count, total_count - source_count)
+        self.total_count = total_count
+        self.coefficients = gf256.cauchy_matrix(self.repair_count, source_count)
+
+    @property
+    def param(self):
+        return self.repair_count
+
+    def encode(self, symbols):
+        return gf256.matmul(self.coefficients, symbols)
+
+    def decode(self, sources, repairs):
+        missing = [i for i in range(self.source_count) if i not in sources]
+        if not missing or len(repairs) < len(missing):
+            return {}
+        used = sorted(repairs)[:len(missing)]
+        present = sorted(sources)
+
+        # Move the known sources to the right-hand side, then solve for the rest
+        rhs = np.stack([repairs[i] for i in used])
+        if present:
+            known = gf256.matmul(self.coefficients[np.ix_(used, present)],
+                                 np.stack([sources[i] for i in present]))
+            rhs ^= known
+        solve = gf256.invert_matrix(self.coefficients[np.ix_(used, missing)])
+        symbols = gf256.matmul(solve, rhs)
+        return dict(zip(missing, symbols))
+
+
+SCHEMES = {
+    'xor': XORScheme.scheme_id,
+    '2d': Parity2DScheme.scheme_id,
+    'rs': ReedSolomonScheme.scheme_id,
+}
+
+_scheme_cache = {}
+
+
+def create_scheme(scheme, group_size, repair_count=None):
+    """Build a scheme from a name ('xor', '2d', 'rs') or return an instance
+
+    Args:
+        scheme: Scheme name or FECScheme instance
+        group_size: Source packets per group
+        repair_count: Repair packets per group for 'rs' (default 2), or the
+            number of columns for '2d' (default: square grid)
+    """
+    if isinstance(scheme, FECScheme):
+        return scheme
+    if scheme == 'xor':
+        return XORScheme(group_size)
+    if scheme == '2d':
+        cols = repair_count or int(round(group_size ** 0.5))
+        if cols <= 0 or group_size % cols:
+            raise ValueError("2-D parity needs group_size to be a multiple of the column count")
+        return Parity2DScheme(group_size // cols, cols)
+    if scheme == 'rs':
+        return ReedSolomonScheme(group_size, group_size + (repair_count or 2))
+    raise ValueError(f"Unknown FEC scheme: {scheme}")
+
+
+def scheme_from_header(scheme_id, source_count, param):
+    """Get the (cached) scheme described by a repair packet header"""
+    key = (scheme_id, source_count, param)
+    scheme = _scheme_cache.get(key)
+    if scheme is None:
+        if scheme_id == XORScheme.scheme_id:
+            scheme = XORScheme(source_count)
+        elif scheme_id == Parity2DScheme.scheme_id and param and source_count % param == 0:
+            scheme = Parity2DScheme(source_count // param, param)
+        elif scheme_id == ReedSolomonScheme.scheme_id and param:
+            scheme = ReedSolomonScheme(source_count, source_count + param)
+        else:
+            raise ValueError(f"Unsupported FEC scheme {scheme_id}")
+        _scheme_cache[key] = scheme
+    return scheme
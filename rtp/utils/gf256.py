@@ -0,0 +1,101 @@
+"""
+Arithmetic over GF(2^8) with NumPy log/antilog tables
+
+Elements are bytes. Addition is XOR; multiplication goes through the
+logarithm tables of the field generated by the primitive polynomial
+x^8 + x^4 + x^3 + x^2 + 1 (0x11D) with generator 2.
+"""
+
+import numpy as np
+
+PRIMITIVE_POLY = 0x11D
+
+
+def _build_tables():
+    exp = np.zeros(512, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        log[value] = power
+        value <<= 1
+        if value & 0x100:
+            value ^= PRIMITIVE_POLY
+    # Doubled antilog table so log[a] + log[b] never needs a modulo
+    exp[255:510] = exp[:255]
+    return exp, log
+
+
+EXP, LOG = _build_tables()
+
+
+def mul(a, b):
+    """Multiply two field elements"""
+    if a == 0 or b == 0:
+        return 0
+    return int(EXP[LOG[a] + LOG[b]])
+
+
+def inv(a):
+    """Multiplicative inverse of a non-zero field element"""
+    if a == 0:
+        raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return int(EXP[255 - LOG[a]])
+
+
+def matmul(coefficients, symbols):
+    """Multiply a coefficient matrix by a matrix of symbols
+
+    Args:
+        coefficients: (r, k) uint8 array
+        symbols: (k, L) uint8 array, one symbol per row
+
+    Returns:
+        (r, L) uint8 array where row i is the GF(256) sum over j of
+        coefficients[i, j] * symbols[j]
+    """
+    coefficients = np.asarray(coefficients, dtype=np.uint8)
+    products = EXP[LOG[coefficients][:, :, None] + LOG[symbols][None, :, :]]
+    products[(coefficients == 0)[:, :, None] | (symbols == 0)[None, :, :]] = 0
+    return np.bitwise_xor.reduce(products, axis=1)
+
+
+def invert_matrix(matrix):
+    """Invert a square matrix by Gauss-Jordan elimination
+
+    Raises:
+        ValueError: If the matrix is singular
+    """
+    size = len(matrix)
+    work = np.concatenate([np.asarray(matrix, dtype=np.uint8),
+                           np.eye(size, dtype=np.uint8)], axis=1)
+    for col in range(size):
+        pivots = np.flatnonzero(work[col:, col])
+        if len(pivots) == 0:
+            raise ValueError("Matrix is singular")
+        pivot = col + pivots[0]
+        if pivot != col:
+            work[[col, pivot]] = work[[pivot, col]]
+        # Scale the pivot row to 1, then clear the column in every other row
+        work[col] = matmul([[inv(int(work[col, col]))]], work[col:col + 1])[0]
+        factors = work[:, col].copy()
+        factors[col] = 0
+        rows = np.flatnonzero(factors)
+        if len(rows):
+            work[rows] ^= matmul(factors[rows, None], work[col:col + 1])
+    return work[:, size:]
+
+
+def cauchy_matrix(rows, cols):
+    """Cauchy matrix with x_i = cols + i and y_j = j
+
+    Every square sub-matrix of a Cauchy matrix is invertible, so stacking it
+    under an identity matrix gives a systematic MDS generator.
+    """
+    if rows + cols > 256:
+        raise ValueError("Reed-Solomon code too long for GF(256)")
+    matrix = np.zeros((rows, cols), dtype=np.uint8)
+    for i in range(rows):
+        for j in range(cols):
+            matrix[i, j] = inv((cols + i) ^ j)
+    return matrix
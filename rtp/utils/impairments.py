@@ -0,0 +1,217 @@
+"""
+Network impairment models for SimulatedNetwork
+
+Each model maps a batch of packets, given as (index, delay) entries, to a
+new batch: dropped packets are left out and duplicates get a second entry.
+Working on whole batches keeps the per-packet cost of a chain low enough
+for a middlebox forwarding tens of thousands of packets per second. A
+``NetworkModel`` chains models and draws every random number from one
+seeded ``random.Random``, so a run with the same seed and the same
+batches sees the same losses, delays and reordering.
+
+Reordering is not a separate shuffle: packets overtake each other when
+their delays differ by more than their spacing, so it follows from the
+delay models and ``Reorder``.
+"""
+
+import random
+
+
+class Impairment:
+    """Base class for impairment models"""
+    def apply(self, packets, rng):
+        """Impair a batch of packets
+
+        Args:
+            packets: List of (packet index, delay in seconds), one entry per
+                copy of a packet, in packet order
+            rng: random.Random to draw from
+
+        Returns:
+            New list in the same form; dropped packets are left out and
+            duplicates get an extra entry
+        """
+        raise NotImplementedError
+
+
+class UniformLoss(Impairment):
+    """Independent loss with the same probability for every packet"""
+    def __init__(self, loss_rate):
+        if not 0.0 <= loss_rate < 1.0:
+            raise ValueError(f"Loss rate must be in [0, 1): {loss_rate}")
+        self.loss_rate = loss_rate
+
+    def lost(self, rng):
+        return rng.random() < self.loss_rate
+
+    def apply(self, packets, rng):
+        random = rng.random
+        loss_rate = self.loss_rate
+        return [entry for entry in packets if random() >= loss_rate]
+
+
+class GilbertElliottLoss(Impairment):
+    """Two-state burst loss
+
+    Packets are lost in the bad state and delivered in the good one. The
+    transition probabilities are chosen so that the mean loss is
+    ``loss_rate`` and bad runs last ``burst_length`` packets on average.
+    """
+    def __init__(self, loss_rate, burst_length):
+        """
+        Args:
+            loss_rate: Long-run fraction of lost packets
+            burst_length: Mean number of packets per loss burst, >= 1
+        """
+        if not 0.0 <= loss_rate < 1.0:
+            raise ValueError(f"Loss rate must be in [0, 1): {loss_rate}")
+        if burst_length < 1.0:
+            raise ValueError(f"Burst length must be at least 1: {burst_length}")
+        self.loss_rate = loss_rate
+        self.burst_length = burst_length
+        self.leave_bad = 1.0 / burst_length
+        self.enter_bad = loss_rate * self.leave_bad / (1.0 - loss_rate)
+        self.bad = False
+
+    def lost(self, rng):
+        """Advance the chain by one packet and return whether it is lost"""
+        if self.bad:
+            self.bad = rng.random() >= self.leave_bad
+        else:
+            self.bad = rng.random() < self.enter_bad
+        return self.bad
+
+    def apply(self, packets, rng):
+        lost = self.lost
+        return [entry for entry in packets if not lost(rng)]
+
+
+class Delay(Impairment):
+    """Random one-way delay, uniform in [0, max_delay]
+
+    With ``correlation`` > 0 each delay is blended with the previous one
+    (``d = c * previous + (1 - c) * uniform``), so the delay wanders instead
+    of jumping and consecutive packets reorder less often.
+    """
+    def __init__(self, max_delay, correlation=0.0):
+        if max_delay < 0:
+            raise ValueError(f"Delay must not be negative: {max_delay}")
+        if not 0.0 <= correlation < 1.0:
+            raise ValueError(f"Correlation must be in [0, 1): {correlation}")
+        self.max_delay = max_delay
+        self.correlation = correlation
+        self.last = 0.0
+
+    def apply(self, packets, rng):
+        random = rng.random
+        max_delay = self.max_delay
+        if not self.correlation:
+            return [(index, delay + random() * max_delay) for index, delay in packets]
+        c = self.correlation
+        last = self.last
+        impaired = []
+        for index, delay in packets:
+            last = c * last + (1.0 - c) * random() * max_delay
+            impaired.append((index, delay + last))
+        self.last = last
+        return impaired
+
+
+class Reorder(Impairment):
+    """Send some packets without the delay added so far
+
+    A selected packet overtakes every queued packet whose delay has not run
+    out, like netem's ``reorder``. With ``correlation`` > 0 a selection is
+    more likely right after another one, which reorders runs of packets.
+    """
+    def __init__(self, reorder_rate, correlation=0.0):
+        if not 0.0 <= reorder_rate <= 1.0:
+            raise ValueError(f"Reorder rate must be in [0, 1]: {reorder_rate}")
+        if not 0.0 <= correlation < 1.0:
+            raise ValueError(f"Correlation must be in [0, 1): {correlation}")
+        self.reorder_rate = reorder_rate
+        self.correlation = correlation
+        self.last = False
+
+    def apply(self, packets, rng):
+        random = rng.random
+        reorder_rate = self.reorder_rate
+        if not self.correlation:
+            return [(index, 0.0) if random() < reorder_rate else (index, delay)
+                    for index, delay in packets]
+        c = self.correlation
+        last = self.last
+        impaired = []
+        for index, delay in packets:
+            last = (last and random() < c) or random() < reorder_rate
+            impaired.append((index, 0.0) if last else (index, delay))
+        self.last = last
+        return impaired
+
+
+class Duplicate(Impairment):
+    """Deliver a second copy with the same delay"""
+    def __init__(self, duplicate_rate):
+        if not 0.0 <= duplicate_rate <= 1.0:
+            raise ValueError(f"Duplicate rate must be in [0, 1]: {duplicate_rate}")
+        self.duplicate_rate = duplicate_rate
+
+    def apply(self, packets, rng):
+        random = rng.random
+        duplicate_rate = self.duplicate_rate
+        impaired = []
+        for entry in packets:
+            impaired.append(entry)
+            if random() < duplicate_rate:
+                impaired.append(entry)
+        return impaired
+
+
+class NetworkModel:
+    """Chain of impairments sharing one seeded random generator"""
+    def __init__(self, impairments=(), seed=None):
+        """
+        Args:
+            impairments: Impairment models applied in order to every packet
+            seed: Seed of the random generator, None for a random run
+        """
+        self.impairments = list(impairments)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_rates(cls, drop_rate=0.0, max_delay=0.0, reorder_rate=0.0, duplicate_rate=0.0,
+                   burst_length=1.0, seed=None):
+        """Model with the SimulatedNetwork/RTPConfig rate parameters
+
+        Args:
+            burst_length: Mean loss burst in packets; above 1 the loss is
+                Gilbert-Elliott, otherwise independent
+        """
+        impairments = []
+        if drop_rate:
+            impairments.append(GilbertElliottLoss(drop_rate, burst_length) if burst_length > 1.0
+                               else UniformLoss(drop_rate))
+        if max_delay:
+            impairments.append(Delay(max_delay))
+        if reorder_rate:
+            impairments.append(Reorder(reorder_rate))
+        if duplicate_rate:
+            impairments.append(Duplicate(duplicate_rate))
+        return cls(impairments, seed)
+
+    def schedule(self, count):
+        """Impair the next count packets
+
+        Returns:
+            List of (packet index in 0..count-1, delay), one entry per copy
+            to deliver, in packet order
+        """
+        packets = [(index, 0.0) for index in range(count)]
+        rng = self.rng
+        for impairment in self.impairments:
+            packets = impairment.apply(packets, rng)
+        return packets
+
+    def __call__(self):
+        """Return the delays of the copies of the next packet, empty if dropped"""
+        return [delay for _, delay in self.schedule(1)]
@@ -0,0 +1,159 @@
+import time
+from .codecs import PT_CN
+from .reorder_buffer import ReorderBuffer
+
+
+class JitterBuffer:
+    """Adaptive jitter buffer with playout scheduled from RTP timestamps
+
+    A packet with timestamp ``ts`` plays at ``ts / clock_rate + offset +
+    delay``, where ``offset`` is the smallest one-way transit seen so far and
+    ``delay`` follows the RFC 3550 interarrival jitter estimate. A missing
+    packet is given up once its playout deadline passes, so later audio keeps
+    flowing; packets arriving after that count as late drops.
+
+    Attributes:
+        buffer: ReorderBuffer holding the packets waiting for playout
+        jitter: Interarrival jitter estimate in seconds
+        delay: Current playout delay in seconds
+        late_drops: Packets that arrived after their playout deadline
+        lost: Sequence numbers given up at their deadline
+    """
+    def __init__(self, clock_rate=8000, frame_samples=160, min_delay=0.02, max_delay=0.5,
+                 jitter_factor=4.0, capacity=1000, clock=time.monotonic):
+        """
+        Args:
+            clock_rate: RTP timestamp rate in Hz
+            frame_samples: Expected timestamp step per packet, then learnt
+                from consecutive media packets
+            min_delay: Lower bound of the playout delay in seconds
+            max_delay: Upper bound of the playout delay in seconds
+            jitter_factor: Playout delay as a multiple of the jitter estimate
+            capacity: Reorder window in packets
+            clock: Time source in seconds
+        """
+        self.buffer = ReorderBuffer(capacity)
+        self.clock_rate = clock_rate
+        self.frame_samples = frame_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter_factor = jitter_factor
+        self.clock = clock
+
+        self.jitter = 0.0
+        self.delay = min_delay
+        self.late_drops = 0
+        self.lost = 0
+        self.played = 0
+
+        self._base_ts = None  # Timestamp all others are measured against
+        self._offset = None  # Smallest transit time seen
+        self._last_transit = None
+        self._last_played = None  # (extended seq, relative timestamp)
+        self._last_was_media = False  # Last played packet was audio, not comfort noise
+
+    @property
+    def occupancy(self):
+        """Number of packets waiting for playout"""
+        return len(self.buffer)
+
+    def _relative_ts(self, timestamp):
+        """Timestamp relative to the first packet, unwrapped from 32 bits"""
+        return ((timestamp - self._base_ts + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+    def _deadline(self, relative_ts):
+        return relative_ts / self.clock_rate + self._offset + self.delay
+
+    def put(self, packet, ext=None, arrival=None):
+        """Add a received packet
+
+        Args:
+            packet: Received RTP packet
+            ext: Extended sequence number, computed from the buffer if None
+            arrival: Arrival time, defaults to now
+
+        Returns:
+            Packets pushed out of the reorder window, which should be played
+            immediately
+        """
+        if arrival is None:
+            arrival = self.clock()
+        if ext is None:
+            ext = self.buffer.extend(packet.seq_num)
+        if self._base_ts is None:
+            self._base_ts = packet.timestamp
+
+        # RFC 3550 interarrival jitter, in seconds
+        transit = arrival - self._relative_ts(packet.timestamp) / self.clock_rate
+        if self._last_transit is not None:
+            self.jitter += (abs(transit - self._last_transit) - self.jitter) / 16.0
+        self._last_transit = transit
+        if self._offset is None or transit < self._offset:
+            self._offset = transit
+        self.delay = min(self.max_delay, max(self.min_delay, self.jitter_factor * self.jitter))
+
+        if self.buffer.head is not None and ext < self.buffer.head:
+            self.late_drops += 1
+            return []
+        return self.buffer.insert(ext, packet)
+
+    def next_deadline(self):
+        """Playout time of the packet at the head of the buffer, or None"""
+        buffer = self.buffer
+        if buffer.head is None or buffer.head > buffer.highest:
+            return None
+        head = buffer.head
+        packet = buffer.get(head)
+        if packet is not None:
+            return self._deadline(self._relative_ts(packet.timestamp))
+        if self._last_played is None:
+            return float('-inf')  # Nothing to time the hole against, skip it
+        last_ext, last_ts = self._last_played
+        return self._deadline(last_ts + (head - last_ext) * self.frame_samples)
+
+    def pop_due(self, now=None):
+        """Remove the frames whose playout time has come
+
+        Returns:
+            List of packets in playout order, with None for every sequence
+            number given up because it missed its deadline
+        """
+        if now is None:
+            now = self.clock()
+        buffer = self.buffer
+        frames = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            head = buffer.head
+            if buffer.has(head):
+                packet = buffer.advance(head + 1)[0]
+                relative_ts = self._relative_ts(packet.timestamp)
+                media = packet.payload_type != PT_CN
+                # Only adjacent audio packets give the frame size: across a
+                # loss, a comfort noise packet or suppressed silence the
+                # timestamp step also covers time that was not sent
+                if media and self._last_was_media and head == self._last_played[0] + 1:
+                    step = relative_ts - self._last_played[1]
+                    if step > 0:
+                        self.frame_samples = step
+                self._last_played = (head, relative_ts)
+                self._last_was_media = media
+                self.played += 1
+                frames.append(packet)
+            else:
+                buffer.advance(head + 1)
+                self.lost += 1
+                frames.append(None)
+        return frames
+
+    def stats(self):
+        """Current delay (ms), jitter (ms), late drops, losses and occupancy"""
+        return {
+            'playout_delay_ms': self.delay * 1000.0,
+            'jitter_ms': self.jitter * 1000.0,
+            'late_drops': self.late_drops,
+            'deadline_losses': self.lost,
+            'buffer_occupancy': self.occupancy,
+        }
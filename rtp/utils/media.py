@@ -0,0 +1,311 @@
+"""
+Memory-mapped audio sources for the sender
+
+``load_pcm`` maps a WAV file into memory and returns its samples in the
+format the stream is sent in (8 kHz mono 16-bit by default). When the file
+is already in that format the result is a view of the map, so nothing is
+read or copied until the pages are touched. Other sample rates, channel
+counts and sample formats (8/16/24/32-bit integer and 32/64-bit float PCM)
+are converted once with NumPy: channels are averaged down to mono (or mono
+is repeated), the rate is changed by linear interpolation, after a
+windowed-sinc low-pass when it is lowered so content above the new Nyquist
+frequency does not alias, and the samples are requantized. Converted PCM is cached per file and format, in memory and
+optionally as a raw file in ``cache_dir``, so many senders streaming the
+same file share one copy.
+
+``WaveSource`` hands out the frames of one stream as ``memoryview`` slices
+of that PCM, without a system call or an allocation per packet.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_CHUNK = struct.Struct('<4sI')
+_FMT = struct.Struct('<HHIIHH')
+
+_INT_DTYPES = {1: np.uint8, 2: np.dtype('<i2'), 4: np.dtype('<i4')}
+
+_SINC_ZEROS = 16  # Zero crossings of the anti-aliasing filter on each side, at the output rate
+_CUTOFF = 0.9  # Anti-aliasing cutoff as a fraction of the output Nyquist frequency
+
+_cache = {}  # (path, mtime, size, rate, channels, width) -> memoryview
+_cache_lock = threading.Lock()
+
+
+class WaveFormat:
+    """Format and data location of a WAV file
+
+    Attributes:
+        format_tag: WAVE_FORMAT_PCM or WAVE_FORMAT_IEEE_FLOAT
+        channels: Channel count
+        sample_rate: Frames per second
+        sample_width: Bytes per sample, container size for 24-in-32 formats
+        data_offset: Offset of the first sample in the file
+        data_size: Bytes of whole frames in the data chunk
+    """
+    def __init__(self, format_tag, channels, sample_rate, sample_width, data_offset, data_size):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def frame_size(self):
+        return self.channels * self.sample_width
+
+    @property
+    def frames(self):
+        return self.data_size // self.frame_size
+
+    @classmethod
+    def parse(cls, buffer):
+        """Read the fmt and data chunks of a RIFF/WAVE file in a buffer
+
+        Raises:
+            ValueError: If the file is not a WAV file with a supported format
+        """
+        if len(buffer) < 12 or bytes(buffer[:4]) != b'RIFF' or bytes(buffer[8:12]) != b'WAVE':
+            raise ValueError("Not a RIFF/WAVE file")
+        fmt = None
+        offset = 12
+        while offset + _CHUNK.size <= len(buffer):
+            chunk_id, size = _CHUNK.unpack_from(buffer, offset)
+            offset += _CHUNK.size
+            if chunk_id == b'fmt ':
+                if size < _FMT.size:
+                    raise ValueError("fmt chunk too short")
+                format_tag, channels, rate, _, block_align, bits = _FMT.unpack_from(buffer, offset)
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    # The sub-format GUID starts with the actual format tag
+                    format_tag, = struct.unpack_from('<H', buffer, offset + 24)
+                fmt = (format_tag, channels, rate, block_align, bits)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError("data chunk before fmt chunk")
+                format_tag, channels, rate, block_align, bits = fmt
+                if not channels or not rate or block_align % channels:
+                    raise ValueError("Invalid WAV format")
+                width = block_align // channels
+                supported = (width in (1, 2, 3, 4) if format_tag == WAVE_FORMAT_PCM
+                             else width in (4, 8) if format_tag == WAVE_FORMAT_IEEE_FLOAT
+                             else False)
+                if not supported:
+                    raise ValueError(f"Unsupported WAV format {format_tag:#06x} "
+                                     f"with {bits}-bit samples")
+                # Streaming writers leave the size unset, take what the file holds
+                size = min(size, len(buffer) - offset)
+                return cls(format_tag, channels, rate, width, offset, size - size % block_align)
+            offset += size + (size & 1)
+        raise ValueError("No data chunk in WAV file")
+
+
+def _decode(buffer, fmt, start, end):
+    """Frames [start, end) of the file as float64 in [-1, 1), one column per channel"""
+    count = (end - start) * fmt.frame_size
+    raw = np.frombuffer(buffer, dtype=np.uint8, count=count,
+                        offset=fmt.data_offset + start * fmt.frame_size)
+    width = fmt.sample_width
+    if fmt.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        samples = raw.view('<f4' if width == 4 else '<f8').astype(np.float64)
+    elif width == 1:
+        samples = (raw.astype(np.float64) - 128.0) / 128.0  # 8-bit PCM is unsigned
+    elif width == 3:
+        b = raw.reshape(-1, 3).astype(np.int32)
+        value = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = ((value ^ 0x800000) - 0x800000) / float(1 << 23)
+    else:
+        samples = raw.view(_INT_DTYPES[width]) / float(1 << (8 * width - 1))
+    return samples.reshape(-1, fmt.channels)
+
+
+def _mix(samples, channels):
+    """Average down to mono and/or repeat up to the target channel count"""
+    if samples.shape[1] == channels:
+        return samples
+    if samples.shape[1] > 1:
+        samples = samples.mean(axis=1, keepdims=True)
+    return samples if channels == 1 else np.repeat(samples, channels, axis=1)
+
+
+def _quantize(samples, sample_width):
+    """float64 samples in [-1, 1) to little-endian integer PCM"""
+    scale = float(1 << (8 * sample_width - 1))
+    values = np.rint(samples * scale)
+    if sample_width == 1:
+        return np.clip(values + 128.0, 0, 255).astype(np.uint8)
+    return np.clip(values, -scale, scale - 1).astype(_INT_DTYPES[sample_width])
+
+
+def _lowpass_kernel(ratio):
+    """Blackman-windowed sinc for decimating by ratio (input rate / output rate)
+
+    The cutoff is ``_CUTOFF`` times the output Nyquist frequency and the
+    gain at DC is 1.
+    """
+    half = int(np.ceil(_SINC_ZEROS * ratio))
+    n = np.arange(-half, half + 1)
+    cutoff = _CUTOFF * 0.5 / ratio  # Cycles per input sample
+    kernel = np.sinc(2 * cutoff * n) * np.blackman(2 * half + 1)
+    return kernel / kernel.sum()
+
+
+def convert(buffer, fmt, sample_rate=8000, channels=1, sample_width=2, block=1 << 18):
+    """Convert the samples of a WAV file to another rate, channel count and width
+
+    Works on ``block`` output frames at a time, so a long file is never held
+    as float64 in full.
+
+    Args:
+        buffer: The whole file, usually a memory map
+        fmt: WaveFormat of the file
+        sample_rate, channels, sample_width: Target format
+
+    Returns:
+        numpy array of the converted interleaved samples
+    """
+    src_frames = fmt.frames
+    frames = src_frames * sample_rate // fmt.sample_rate
+    out = np.empty((frames, channels), dtype=_INT_DTYPES[sample_width])
+    kernel = _lowpass_kernel(fmt.sample_rate / sample_rate) if fmt.sample_rate > sample_rate \
+        else None
+    margin = len(kernel) // 2 if kernel is not None else 0
+    for first in range(0, frames, block):
+        last = min(first + block, frames)
+        if fmt.sample_rate == sample_rate:
+            out[first:last] = _quantize(_mix(_decode(buffer, fmt, first, last), channels),
+                                        sample_width)
+            continue
+        # Output frame k falls at source position k * src_rate / rate
+        positions = np.arange(first, last) * (fmt.sample_rate / sample_rate)
+        # Decode the filter's reach around the block so its edges filter like the middle
+        start = max(0, int(positions[0]) - margin)
+        end = min(src_frames, int(positions[-1]) + 2 + margin)
+        samples = _mix(_decode(buffer, fmt, start, end), channels)
+        if kernel is not None:
+            samples = np.column_stack([np.convolve(samples[:, c], kernel, 'same')
+                                       for c in range(channels)])
+        grid = np.arange(start, end)
+        resampled = np.column_stack([np.interp(positions, grid, samples[:, c])
+                                     for c in range(channels)])
+        out[first:last] = _quantize(resampled, sample_width)
+    return out.reshape(-1)
+
+
+def _map(path):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _cache_path(cache_dir, path, stat, sample_rate, channels, sample_width):
+    """File name of converted PCM, changing when the source file changes"""
+    digest = hashlib.sha1(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}-{digest}-{sample_rate}-{channels}-{sample_width}.pcm')
+
+
+def load_pcm(path, sample_rate=8000, channels=1, sample_width=2, cache_dir=None):
+    """Samples of a WAV file in the given format, as a read-only memoryview
+
+    Repeated loads of an unchanged file in the same format return the same
+    buffer.
+
+    Args:
+        path: WAV file
+        sample_rate, channels, sample_width: Format to return; sample_width
+            is 1, 2 or 4 bytes
+        cache_dir: Directory where converted PCM is kept between runs
+
+    Raises:
+        ValueError: If the file or the target format is not supported
+    """
+    if sample_width not in _INT_DTYPES:
+        raise ValueError(f"Unsupported sample width {sample_width}")
+    if sample_rate <= 0 or channels <= 0:
+        raise ValueError("Sample rate and channels must be positive")
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size, sample_rate, channels, sample_width)
+    with _cache_lock:
+        pcm = _cache.get(key)
+        if pcm is None:
+            pcm = _load(path, stat, sample_rate, channels, sample_width, cache_dir)
+            _cache[key] = pcm
+        return pcm
+
+
+def _load(path, stat, sample_rate, channels, sample_width, cache_dir):
+    cached = cache_dir and _cache_path(cache_dir, path, stat, sample_rate, channels, sample_width)
+    if cached and os.path.exists(cached) and os.path.getsize(cached):
+        return memoryview(_map(cached))
+
+    buffer = _map(path)
+    fmt = WaveFormat.parse(buffer)
+    if (fmt.format_tag == WAVE_FORMAT_PCM and fmt.sample_rate == sample_rate
+            and fmt.channels == channels and fmt.sample_width == sample_width):
+        # Already in the stream format: serve straight from the map
+        return memoryview(buffer)[fmt.data_offset:fmt.data_offset + fmt.data_size]
+
+    pcm = convert(buffer, fmt, sample_rate, channels, sample_width)
+    if cached and pcm.nbytes:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f'{cached}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as f:
+            f.write(pcm.data)
+        os.replace(temp, cached)
+        return memoryview(_map(cached))
+    return pcm.view(np.uint8).data.toreadonly()
+
+
+def clear_cache():
+    """Forget loaded files; buffers still referenced stay valid"""
+    with _cache_lock:
+        _cache.clear()
+
+
+class WaveSource:
+    """Frames of a WAV file for one stream, as zero-copy memoryview slices
+
+    Attributes:
+        pcm: Samples in the stream format, shared with other sources of the file
+        frame_bytes: Bytes per frame returned by read()
+        position: Byte offset of the next frame
+    """
+    def __init__(self, path, sample_rate=8000, channels=1, sample_width=2, frame_samples=160,
+                 loop=False, cache_dir=None):
+        """
+        Args:
+            path: WAV file to stream
+            sample_rate, channels, sample_width: Format the frames are sent in
+            frame_samples: Samples per channel in a frame (160 = 20 ms @ 8kHz)
+            loop: Start over at the end of the file instead of ending
+            cache_dir: Directory where converted PCM is kept between runs
+        """
+        self.pcm = load_pcm(path, sample_rate, channels, sample_width, cache_dir)
+        self.frame_bytes = frame_samples * channels * sample_width
+        self.loop = loop
+        self.position = 0
+
+    def __len__(self):
+        """Number of frames, the last one possibly short"""
+        return -(-len(self.pcm) // self.frame_bytes)
+
+    def read(self):
+        """Next frame, or None at the end of the file"""
+        position = self.position
+        if position >= len(self.pcm):
+            if not self.loop or not len(self.pcm):
+                return None
+            position = 0
+        end = position + self.frame_bytes
+        self.position = end
+        return self.pcm[position:end]
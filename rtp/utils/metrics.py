@@ -0,0 +1,279 @@
+"""
+Counters, gauges and histograms for RTP streams
+
+Each metric has one writer thread (the sender or receiver loop) and is a
+plain attribute update on the hot path, so no lock is taken; readers only
+ever see a slightly stale value. Metrics can also read their value from a
+function at collection time, which lets the existing ``stats`` dicts be
+exported without touching the per-packet code.
+
+Collected values are logged by ``MetricsReporter`` at most once per interval
+and served as Prometheus text by ``MetricsServer``.
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """Monotonically increasing count"""
+    kind = 'counter'
+    __slots__ = ('name', 'help', 'value', '_fn')
+
+    def __init__(self, name, help='', fn=None):
+        """
+        Args:
+            name: Metric name
+            help: One-line description
+            fn: Callable returning the value at collection time, instead of
+                the value kept by ``inc``
+        """
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._fn = fn
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def get(self):
+        return self._fn() if self._fn is not None else self.value
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+    kind = 'gauge'
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets"""
+    kind = 'histogram'
+    __slots__ = ('name', 'help', 'buckets', 'counts', 'sum', 'count')
+
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self, name, help='', buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            name: Metric name
+            help: One-line description
+            buckets: Increasing upper bounds, +Inf is implied
+        """
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Histogram buckets must be increasing")
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get(self):
+        """Cumulative bucket counts, sum and count"""
+        cumulative = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return {'buckets': cumulative, 'sum': self.sum, 'count': total}
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q, None when empty"""
+        counts = self.counts
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class MetricsRegistry:
+    """Named collection of metrics"""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()  # Only taken when registering
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help='', fn=None):
+        return self._add(Counter(name, help, fn))
+
+    def gauge(self, name, help='', fn=None):
+        return self._add(Gauge(name, help, fn))
+
+    def histogram(self, name, help='', buckets=Histogram.DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def __iter__(self):
+        return iter(list(self._metrics.values()))
+
+    def __len__(self):
+        return len(self._metrics)
+
+    def snapshot(self):
+        """Current value of every metric keyed by name"""
+        return {metric.name: metric.get() for metric in self}
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self:
+            name = metric.name
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            value = metric.get()
+            if metric.kind == 'histogram':
+                for bound, count in zip(metric.buckets + (math.inf,), value['buckets']):
+                    lines.append(f'{name}_bucket{{le="{_format(bound)}"}} {count}')
+                lines.append(f"{name}_sum {_format(value['sum'])}")
+                lines.append(f"{name}_count {value['count']}")
+            else:
+                lines.append(f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(int(value))
+
+
+class MetricsReporter:
+    """Log a one-line snapshot of some metrics at most once per interval
+
+    ``maybe_report`` is meant to be called from the hot loop: between
+    reports it costs one comparison, and nothing is formatted when the
+    logger does not emit the level.
+    """
+    def __init__(self, metrics, logger, interval=1.0, level=logging.INFO, clock=time.monotonic):
+        """
+        Args:
+            metrics: MetricsRegistry or list of metrics to report
+            logger: logging.Logger the snapshot is written to
+            interval: Minimum seconds between reports, None to never report
+            level: Logging level of the reports
+            clock: Time source in seconds
+        """
+        self.metrics = metrics
+        self.logger = logger
+        self.interval = interval
+        self.level = level
+        self.clock = clock
+        self._next = clock() + interval if interval else math.inf
+
+    def maybe_report(self, now=None):
+        """Log a snapshot if the interval has passed
+
+        Returns:
+            True if a snapshot was logged
+        """
+        if now is None:
+            now = self.clock()
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        if not self.logger.isEnabledFor(self.level):
+            return False
+        self.logger.log(self.level, "Stats: %s", self.format())
+        return True
+
+    def format(self):
+        """Snapshot as ``name=value`` pairs"""
+        parts = []
+        for metric in self.metrics:
+            value = metric.get()
+            if metric.kind == 'histogram':
+                value = value['count']
+            elif isinstance(value, float):
+                value = f"{value:.4g}"
+            parts.append(f"{metric.name}={value}")
+        return " ".join(parts)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics request: " + format, *args)
+
+
+class MetricsServer:
+    """Serve a registry as Prometheus text on http://host:port/metrics
+
+    Example:
+        server = MetricsServer(receiver.metrics, port=9100)
+        server.start()
+    """
+    def __init__(self, registry, host='127.0.0.1', port=0):
+        """
+        Args:
+            registry: MetricsRegistry to serve
+            host: Address to listen on, local only by default
+            port: Port to listen on, 0 for any
+        """
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.registry = registry
+
+    @property
+    def address(self):
+        """Address the HTTP server is bound to"""
+        return self.httpd.server_address
+
+    def start(self):
+        """Serve requests in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.2})
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info("Metrics served on http://%s:%d/metrics", *self.address[:2])
+
+    def stop(self):
+        if hasattr(self, 'thread'):
+            self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,12 +1,36 @@
 # rtp/network_simulator.py
+import heapq
+import logging
 import socket
 import threading
 import time
-import random
+
+from .impairments import NetworkModel
+from .socket_io import BufferPool, recv_batch, send_batch
+
+logger = logging.getLogger(__name__)
 
 class SimulatedNetwork:
+    """UDP middlebox forwarding datagrams through a NetworkModel
+
+    Received datagrams are impaired by the model and pushed on a heap keyed
+    by their due time; the forward thread sleeps exactly until the earliest
+    one is due, so forwarding costs O(log n) per packet whatever the backlog.
+    Datagrams with no delay are sent straight from the receive thread, and
+    the ones due within ``resolution`` seconds of the earliest are sent with
+    it, so a high packet rate does not cost one wakeup per datagram.
+    Without ``model`` the rate parameters build one with
+    ``NetworkModel.from_rates``; pass ``seed`` for a reproducible run.
+
+    Attributes:
+        stats: received, dropped, duplicated, forwarded and reordered
+            (forwarded ahead of an earlier arrival) datagram counts
+    """
     def __init__(self, listen_port, forward_ip, forward_port,
-                 drop_rate=0.05, max_delay=0.1, reorder_rate=0.1, duplicate_rate=0.05):
+                 drop_rate=0.05, max_delay=0.1, reorder_rate=0.1, duplicate_rate=0.05,
+                 burst_length=1.0, seed=None, model=None, listen_ip='0.0.0.0',
+                 resolution=0.0005):
+        self.listen_ip = listen_ip
         self.listen_port = listen_port
         self.forward_ip = forward_ip
         self.forward_port = forward_port
@@ -15,55 +39,113 @@ class SimulatedNetwork:
         self.max_delay = max_delay
         self.reorder_rate = reorder_rate
         self.duplicate_rate = duplicate_rate
+        if model is None:
+            model = NetworkModel.from_rates(drop_rate, max_delay, reorder_rate, duplicate_rate,
+                                            burst_length, seed)
+        self.model = model
+        self.resolution = resolution
 
-        self.buffer = []
-        self.lock = threading.Lock()
+        self.stats = {'received': 0, 'dropped': 0, 'duplicated': 0, 'forwarded': 0,
+                      'reordered': 0}
+        self._queue = []  # Heap of (due, arrival index, datagram)
+        self._arrivals = 0
+        self._cond = threading.Condition()
+        self._pool = BufferPool()
         self.running = False
 
+    @property
+    def local_address(self):
+        """Address the middlebox listens on, with the bound port"""
+        return self.socket.getsockname()
+
     def start(self):
         self.running = True
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.bind(('0.0.0.0', self.listen_port))
+        self.socket.bind((self.listen_ip, self.listen_port))
+        self._send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         threading.Thread(target=self._recv_loop, daemon=True).start()
         threading.Thread(target=self._forward_loop, daemon=True).start()
-        print(f"[Middlebox] Simulated network started on port {self.listen_port} → {self.forward_ip}:{self.forward_port}")
+        logger.info("[Middlebox] Simulated network started on port %d → %s:%d",
+                    self.local_address[1], self.forward_ip, self.forward_port)
 
     def _recv_loop(self):
+        model = self.model
+        stats = self.stats
+        queue = self._queue
         while self.running:
-            data, addr = self.socket.recvfrom(4096)
-
-            # Mô phỏng mất gói
-            if random.random() < self.drop_rate:
-                print(">> [Drop] Packet dropped")
+            try:
+                batch = recv_batch(self.socket, self._pool, timeout=0.1)
+            except (OSError, ValueError):
+                break  # Socket closed by stop()
+            if not batch:
                 continue
 
-            # Mô phỏng trễ gói
-            delay = random.uniform(0, self.max_delay)
-
-            # Mô phỏng duplicate
-            duplicates = 1 + int(random.random() < self.duplicate_rate)
-
-            for _ in range(duplicates):
-                with self.lock:
-                    self.buffer.append((time.time() + delay, data))
-
-                # Mô phỏng rối loạn (chèn ngẫu nhiên)
-                if random.random() < self.reorder_rate and len(self.buffer) >= 2:
-                    i = random.randint(0, len(self.buffer)-1)
-                    self.buffer[-1], self.buffer[i] = self.buffer[i], self.buffer[-1]
+            now = time.monotonic()
+            scheduled = model.schedule(len(batch))
+            immediate = []  # Not delayed: sent from this thread, no wakeup
+            with self._cond:
+                earliest = queue[0][0] if queue else None
+                arrivals = self._arrivals
+                last = -1
+                for index, delay in scheduled:
+                    if index != last:
+                        # Pool slots are reused by the next batch
+                        data = bytes(batch[index][0])
+                        last = index
+                    if delay <= 0.0:
+                        if queue:
+                            stats['reordered'] += 1
+                        immediate.append(data)
+                    else:
+                        heapq.heappush(queue, (now + delay, arrivals, data))
+                    arrivals += 1
+                self._arrivals = arrivals
+                # Only wake the forwarder when the next due time moved earlier
+                if queue and (earliest is None or queue[0][0] < earliest):
+                    self._cond.notify()
+                delivered = len({index for index, _ in scheduled})
+                stats['received'] += len(batch)
+                stats['dropped'] += len(batch) - delivered
+                stats['duplicated'] += len(scheduled) - delivered
+                stats['forwarded'] += len(immediate)
+            if immediate:
+                self._forward(immediate)
 
     def _forward_loop(self):
-        send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        queue = self._queue
+        stats = self.stats
+        resolution = self.resolution
+        newest = -1  # Highest arrival index forwarded so far
         while self.running:
-            now = time.time()
-            with self.lock:
-                ready = [pkt for pkt in self.buffer if pkt[0] <= now]
-                self.buffer = [pkt for pkt in self.buffer if pkt[0] > now]
+            ready = []
+            with self._cond:
+                while self.running:
+                    now = time.monotonic()
+                    if queue and queue[0][0] <= now:
+                        break
+                    self._cond.wait(queue[0][0] - now if queue else None)
+                now += resolution
+                while queue and queue[0][0] <= now:
+                    _, index, data = heapq.heappop(queue)
+                    if index < newest:
+                        stats['reordered'] += 1
+                    else:
+                        newest = index
+                    ready.append(data)
+            if ready:
+                stats['forwarded'] += len(ready)
+                self._forward(ready)
 
-            for _, pkt_data in ready:
-                send_sock.sendto(pkt_data, (self.forward_ip, self.forward_port))
-            time.sleep(0.005)
+    def _forward(self, datagrams):
+        try:
+            send_batch(self._send_sock, datagrams, (self.forward_ip, self.forward_port))
+        except OSError as e:
+            if self.running:
+                logger.warning("[Middlebox] Forwarding failed: %s", e)
 
     def stop(self):
-        self.running = False
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
         self.socket.close()
+        self._send_sock.close()
@@ -0,0 +1,107 @@
+import time
+
+
+class PacketHistory:
+    """Fixed-capacity ring of encoded packets indexed by sequence number
+
+    Packets live in preallocated slots of one ``bytearray``. A packet with
+    extended sequence number ``ext`` occupies slot ``ext % capacity``, and
+    the slot's tag records ``ext`` so stale or overwritten entries are never
+    returned, including across the 16-bit sequence number wrap.
+
+    There is a single writer (the sending thread). Readers such as the NACK
+    listener do not lock: ``get`` re-checks the slot tag after copying and
+    discards the copy if the writer reused the slot meanwhile.
+    """
+    def __init__(self, capacity=1000, slot_size=1500, retention_ms=None, clock=time.monotonic):
+        """
+        Args:
+            capacity: Number of packets kept
+            slot_size: Largest packet that can be stored
+            retention_ms: Only return packets sent within this many ms, None to
+                keep them until their slot is reused
+            clock: Time source for retention, in seconds
+        """
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.retention = retention_ms / 1000.0 if retention_ms else None
+        self.clock = clock
+        self._storage = bytearray(capacity * slot_size)
+        self._view = memoryview(self._storage)
+        self._tags = [-1] * capacity  # Extended seq stored in each slot, -1 if empty
+        self._lengths = [0] * capacity
+        self._times = [0.0] * capacity
+        self._highest = None  # Highest extended sequence number stored
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, seq_num):
+        index, ext = self._locate(seq_num)
+        return index is not None
+
+    def _extend(self, seq_num):
+        """Map a 16-bit sequence number to the extended sequence space"""
+        highest = self._highest
+        if highest is None:
+            return seq_num + 65536  # Room for packets older than the first one
+        return highest + ((seq_num - highest + 32768) & 0xFFFF) - 32768
+
+    def _locate(self, seq_num):
+        """Find the valid slot holding seq_num, or (None, ext)"""
+        ext = self._extend(seq_num)
+        index = ext % self.capacity
+        if self._tags[index] != ext:
+            return None, ext
+        if self.retention is not None and self.clock() - self._times[index] > self.retention:
+            return None, ext
+        return index, ext
+
+    def reserve(self, seq_num):
+        """Get the writable slot for seq_num, invalidating what it held
+
+        Fill the slot, then publish it with ``commit``.
+        """
+        index = self._extend(seq_num) % self.capacity
+        if self._tags[index] >= 0:
+            self._count -= 1
+        self._tags[index] = -1
+        start = index * self.slot_size
+        return self._view[start:start + self.slot_size]
+
+    def commit(self, seq_num, length):
+        """Publish the packet written into seq_num's reserved slot"""
+        ext = self._extend(seq_num)
+        index = ext % self.capacity
+        self._lengths[index] = length
+        self._times[index] = self.clock()
+        self._tags[index] = ext
+        self._count += 1
+        if self._highest is None or ext > self._highest:
+            self._highest = ext
+
+    def store(self, seq_num, data):
+        """Copy an encoded packet into the history"""
+        if len(data) > self.slot_size:
+            raise ValueError("Packet larger than history slot")
+        slot = self.reserve(seq_num)
+        slot[:len(data)] = data
+        self.commit(seq_num, len(data))
+
+    def get(self, seq_num):
+        """Get a copy of the stored packet, or None if it is not available"""
+        index, ext = self._locate(seq_num)
+        if index is None:
+            return None
+        start = index * self.slot_size
+        data = bytes(self._view[start:start + self._lengths[index]])
+        if self._tags[index] != ext:
+            return None  # Slot reused while copying
+        return data
+
+    def clear(self):
+        """Drop every stored packet"""
+        self._tags = [-1] * self.capacity
+        self._highest = None
+        self._count = 0
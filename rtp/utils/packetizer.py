@@ -0,0 +1,105 @@
+"""
+Packetization of audio into RTP payloads
+
+A packet carries ``ptime`` milliseconds of audio: longer ptimes aggregate
+more samples per packet, cutting the packet rate and the share of the
+bandwidth taken by headers at the cost of latency. The payload must also
+fit in one datagram of the path MTU together with the IP/UDP and RTP
+headers and whatever an FEC or retransmission packet adds around the same
+payload, so frames too large for that budget are fragmented into several
+packets. Fragments are cut on sample boundaries, so every packet gets a
+sample-accurate timestamp and can be played on its own.
+"""
+
+from rtp.utils.codecs import PCM16
+from rtp.utils.fec import FEC_HEADER_SIZE
+
+IP_UDP_OVERHEAD = 28  # IPv4 + UDP headers
+RTP_HEADER_SIZE = 12
+RTX_HEADER_SIZE = 2  # Original sequence number in front of a retransmitted payload
+
+
+class Packetizer:
+    """Cut audio into payloads of one ptime that fit the MTU
+
+    Attributes:
+        samples_per_packet: Samples in one ptime, the timestamp step per frame
+        max_payload: Largest payload in bytes that fits the MTU budget
+        max_samples: Samples in the largest payload
+    """
+    def __init__(self, codec=None, ptime=20, mtu=1500, fec=False, rtx=False, clock_rate=None):
+        """
+        Args:
+            codec: Codec the frames are encoded with, 16-bit PCM if None
+            ptime: Audio per packet in milliseconds (10, 20, 40, 60...)
+            mtu: Path MTU in bytes
+            fec: Reserve room for the FEC header, FEC packets carry the
+                largest payload of their group
+            rtx: Reserve room for the retransmission header
+            clock_rate: RTP clock rate, the codec's if None
+
+        Raises:
+            ValueError: If ptime is not a whole number of samples or the MTU
+                leaves no room for a sample
+        """
+        self.codec = codec or PCM16
+        self.clock_rate = clock_rate or self.codec.clock_rate
+        self.ptime = ptime
+        self.mtu = mtu
+        if ptime <= 0 or (self.clock_rate * ptime) % 1000:
+            raise ValueError(f"ptime {ptime} ms is not a whole number of samples "
+                             f"at {self.clock_rate} Hz")
+        self.samples_per_packet = self.clock_rate * ptime // 1000
+        overhead = max(FEC_HEADER_SIZE if fec else 0, RTX_HEADER_SIZE if rtx else 0)
+        self.max_payload = mtu - IP_UDP_OVERHEAD - RTP_HEADER_SIZE - overhead
+        self.max_samples = self.max_payload // self.codec.bytes_per_sample
+        if self.max_samples < 1:
+            raise ValueError(f"MTU {mtu} leaves no room for a payload")
+
+    @property
+    def frame_bytes(self):
+        """Bytes of 16-bit PCM in one ptime"""
+        return self.samples_per_packet * 2
+
+    def fragment(self, payload, samples=None):
+        """Split an encoded frame into payloads that fit the MTU
+
+        The frame is cut into the fewest, evenly sized pieces on sample
+        boundaries.
+
+        Args:
+            payload: Encoded frame
+            samples: Samples in the frame, None if it is not audio
+
+        Returns:
+            List of (payload, samples) pairs; samples is None when the frame
+            was not audio and fits in one packet
+        """
+        if len(payload) <= self.max_payload:
+            return [(payload, samples)]
+        width = self.codec.bytes_per_sample
+        total = len(payload) // width
+        count = -(-total // self.max_samples)
+        fragments = []
+        start = 0
+        for i in range(count):
+            end = (total * (i + 1) // count) * width
+            if i == count - 1:
+                end = len(payload)  # A trailing partial sample stays with the last piece
+            fragments.append((payload[start:end], (end - start) // width))
+            start = end
+        return fragments
+
+    def split(self, pcm):
+        """Encode 16-bit PCM one ptime at a time and fragment it to the MTU
+
+        Returns:
+            List of (payload, samples) pairs in order
+        """
+        payloads = []
+        frame_bytes = self.frame_bytes
+        encode = self.codec.encode
+        for start in range(0, len(pcm), frame_bytes):
+            frame = pcm[start:start + frame_bytes]
+            payloads.extend(self.fragment(encode(frame), len(frame) // 2))
+        return payloads
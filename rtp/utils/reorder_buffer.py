@@ -0,0 +1,157 @@
+class ReorderBuffer:
+    """Fixed-size circular reorder buffer keyed by extended sequence number
+
+    The buffer covers the window ``[head, head + capacity)``. Packet ``ext``
+    lives in slot ``ext % capacity`` and a bytearray bitmap records which
+    slots hold a packet, so insert, in-order drain and eviction are O(1) per
+    packet, and enumerating the missing packets is O(window) in C plus O(k)
+    in Python for k losses. Memory is fixed at ``capacity`` slots.
+
+    Attributes:
+        head: Extended sequence number of the next packet to deliver
+        highest: Highest extended sequence number inserted
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._received = bytearray(capacity)  # 1 if the slot holds a packet
+        self.head = None
+        self.highest = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def extend(self, seq_num):
+        """Map a 16-bit sequence number to the extended sequence space
+
+        The first sequence number is offset by one cycle so packets older
+        than it still get a positive extended number.
+        """
+        highest = self.highest
+        if highest is None:
+            return seq_num + 65536
+        return highest + ((seq_num - highest + 32768) & 0xFFFF) - 32768
+
+    def has(self, ext):
+        """Check whether packet ext is buffered"""
+        return (self.head is not None and self.head <= ext <= self.highest
+                and self._received[ext % self.capacity] == 1)
+
+    def get(self, ext):
+        """Return buffered packet ext without removing it, or None"""
+        if not self.has(ext):
+            return None
+        return self._slots[ext % self.capacity]
+
+    def insert(self, ext, packet):
+        """Insert a packet
+
+        Packets before ``head`` and duplicates are ignored. A packet beyond
+        the window moves ``head`` forward first.
+
+        Returns:
+            Packets pushed out of the window by this insert, in order
+        """
+        if self.head is None:
+            self.head = self.highest = ext
+        if ext < self.head:
+            return []
+        evicted = []
+        if ext >= self.head + self.capacity:
+            evicted = self.advance(ext - self.capacity + 1)
+        index = ext % self.capacity
+        if self._received[index]:
+            return evicted
+        self._slots[index] = packet
+        self._received[index] = 1
+        self._count += 1
+        if ext > self.highest:
+            self.highest = ext
+        return evicted
+
+    def pop_ready(self):
+        """Remove and return the packets that are now in order"""
+        ready = []
+        if self.head is None:
+            return ready
+        capacity = self.capacity
+        received = self._received
+        slots = self._slots
+        head = self.head
+        while head <= self.highest:
+            index = head % capacity
+            if not received[index]:
+                break
+            ready.append(slots[index])
+            slots[index] = None
+            received[index] = 0
+            head += 1
+        self._count -= len(ready)
+        self.head = head
+        return ready
+
+    def peek_ready(self):
+        """Return the packets that are in order without removing them"""
+        ready = []
+        if self.head is None:
+            return ready
+        ext = self.head
+        while ext <= self.highest and self._received[ext % self.capacity]:
+            ready.append(self._slots[ext % self.capacity])
+            ext += 1
+        return ready
+
+    def advance(self, new_head):
+        """Move head forward, giving up on missing packets before it
+
+        Returns:
+            The buffered packets that were skipped over, in order
+        """
+        skipped = []
+        if self.head is None or new_head <= self.head:
+            return skipped
+        capacity = self.capacity
+        # Nothing is buffered beyond one full window past head
+        stop = min(new_head, self.head + capacity)
+        for ext in range(self.head, stop):
+            index = ext % capacity
+            if self._received[index]:
+                skipped.append(self._slots[index])
+                self._slots[index] = None
+                self._received[index] = 0
+        self._count -= len(skipped)
+        self.head = new_head
+        if self.highest < new_head - 1:
+            self.highest = new_head - 1
+        return skipped
+
+    def missing(self):
+        """List the extended sequence numbers missing between head and highest"""
+        result = []
+        if self.head is None:
+            return result
+        capacity = self.capacity
+        received = self._received
+        ext = self.head
+        end = self.highest + 1
+        while ext < end:
+            # Scan the contiguous part of the bitmap for holes
+            index = ext % capacity
+            stop = index + min(end - ext, capacity - index)
+            hole = received.find(0, index, stop)
+            if hole < 0:
+                ext += stop - index
+                continue
+            ext += hole - index
+            result.append(ext)
+            ext += 1
+        return result
+
+    def reset(self):
+        """Drop every buffered packet and forget the window"""
+        self._slots = [None] * self.capacity
+        self._received = bytearray(self.capacity)
+        self.head = None
+        self.highest = None
+        self._count = 0
@@ -1,30 +1,30 @@
-from collections import deque
+import time
 from ..core.packet import RTPPacket
+from .packet_history import PacketHistory
 
 class RetransmissionHandler:
-    def __init__(self, buffer_size=1000):
+    def __init__(self, buffer_size=1000, retention_ms=None, clock=time.monotonic, history=None):
         """Initialize retransmission handler
         
         Args:
             buffer_size: Size of packet buffer for retransmission
+            retention_ms: Drop packets older than this many ms (None keeps
+                them until their slot is reused)
+            clock: Time source for retention, in seconds
+            history: Existing PacketHistory to serve NACKs from instead of
+                allocating one; the other arguments are then ignored
         """
-        self.packet_buffer = {}  # seq_num -> packet mapping
-        self.buffer_size = buffer_size
-        self.seq_window = deque(maxlen=buffer_size)  # For maintaining buffer size
+        if history is None:
+            history = PacketHistory(buffer_size, retention_ms=retention_ms, clock=clock)
+        self.packet_buffer = history
+        self.buffer_size = history.capacity
         
     def add_packet(self, packet):
         """Add a packet to the retransmission buffer"""
         if packet.is_rtx_packet():
             return
             
-        self.packet_buffer[packet.seq_num] = packet
-        self.seq_window.append(packet.seq_num)
-        
-        # Remove old packets if buffer is full
-        while len(self.packet_buffer) > self.buffer_size:
-            old_seq = self.seq_window.popleft()
-            if old_seq in self.packet_buffer:
-                del self.packet_buffer[old_seq]
+        self.packet_buffer.store(packet.seq_num, packet.encode())
     
     def get_missing_packets(self, start_seq, end_seq):
         """Get list of missing sequence numbers in a range"""
@@ -48,8 +48,9 @@ class RetransmissionHandler:
             
         rtx_packets = []
         for seq_num in nack_packet.get_nack_sequence_numbers():
-            if seq_num in self.packet_buffer:
-                original_packet = self.packet_buffer[seq_num]
+            packet_data = self.packet_buffer.get(seq_num)
+            if packet_data is not None:
+                original_packet = RTPPacket.decode(packet_data)
                 rtx_packet = RTPPacket.create_rtx_packet(original_packet)
                 rtx_packets.append(rtx_packet)
                 
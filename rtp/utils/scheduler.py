@@ -0,0 +1,243 @@
+import heapq
+import logging
+import selectors
+import threading
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+
+class _Task:
+    """Periodic callback with drift-free deadlines ``start + count * interval``"""
+    __slots__ = ('callback', 'interval', 'start', 'count', 'end', 'active', 'on_stop')
+
+    def __init__(self, callback, interval, start, end, on_stop=None):
+        self.callback = callback
+        self.on_stop = on_stop
+        self.interval = interval
+        self.start = start
+        self.count = 0
+        self.end = end
+        self.active = True
+
+    @property
+    def deadline(self):
+        return self.start + self.count * self.interval
+
+
+class PacingScheduler:
+    """Run many periodic senders from one thread on absolute deadlines
+
+    Tasks sit in a heap ordered by their next ``time.monotonic()`` deadline,
+    which is always ``start + n * interval`` so processing time never
+    accumulates as drift. When the thread falls behind by more than one
+    interval, the policy decides what happens to the missed ticks:
+
+    - ``'catch_up'`` runs them back to back, at most ``max_catch_up`` per
+      task, and skips the rest
+    - ``'skip'`` drops them and resumes at the next future deadline
+
+    While waiting for the next deadline the thread also serves readable
+    sockets registered with ``add_reader``, such as the senders' NACKs.
+    """
+    CATCH_UP = 'catch_up'
+    SKIP = 'skip'
+
+    def __init__(self, policy=CATCH_UP, max_catch_up=5, history=100000, clock=time.monotonic):
+        """
+        Args:
+            policy: 'catch_up' or 'skip'
+            max_catch_up: Missed ticks run per task before skipping
+            history: Number of lateness samples kept for percentiles
+            clock: Time source in seconds
+        """
+        if policy not in (self.CATCH_UP, self.SKIP):
+            raise ValueError(f"Unknown pacing policy: {policy}")
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.running = False
+        self.skipped = 0
+        self._heap = []
+        self._counter = 0  # Tie breaker for equal deadlines
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._readers = 0
+        self._lateness = array('d', bytes(8 * history))
+        self._samples = 0
+
+    def __len__(self):
+        return sum(1 for _, _, task in self._heap if task.active)
+
+    def add(self, callback, interval, start=None, duration=None, on_stop=None):
+        """Call callback every interval seconds until it returns False
+
+        Args:
+            callback: Called with no arguments at each deadline
+            interval: Period in seconds
+            start: First deadline, defaults to now
+            duration: Stop after this many seconds, None to run until removed
+            on_stop: Called once when the task ends, for whatever reason
+
+        Returns:
+            Handle for ``remove``
+        """
+        if start is None:
+            start = self.clock()
+        task = _Task(callback, interval, start, start + duration if duration else None, on_stop)
+        self._push(task)
+        return task
+
+    def add_sender(self, sender, interval=0.02, start=None, duration=None):
+        """Drive an RTPSender: send with ``tick`` and serve its NACKs
+
+        Returns:
+            Handle for ``remove``
+        """
+        sender.running = True
+        self.add_reader(sender.socket, sender.poll_nacks)
+
+        def tick():
+            return sender.running and sender.tick()
+
+        def stop():
+            self.remove_reader(sender.socket)
+            sender.running = False
+
+        return self.add(tick, interval, start, duration, on_stop=stop)
+
+    def remove(self, task):
+        """Stop a task; it is dropped from the heap at its next deadline"""
+        task.active = False
+
+    def add_reader(self, sock, callback):
+        """Call callback() whenever sock is readable"""
+        with self._lock:
+            self._selector.register(sock, selectors.EVENT_READ, callback)
+            self._readers += 1
+
+    def remove_reader(self, sock):
+        with self._lock:
+            try:
+                self._selector.unregister(sock)
+                self._readers -= 1
+            except (KeyError, ValueError):
+                pass
+
+    def _push(self, task):
+        with self._lock:
+            self._counter += 1
+            heapq.heappush(self._heap, (task.deadline, self._counter, task))
+
+    def _stopped(self, task):
+        on_stop = task.on_stop
+        if on_stop is not None:
+            task.on_stop = None
+            on_stop()
+
+    def _record(self, lateness):
+        samples = self._lateness
+        samples[self._samples % len(samples)] = lateness
+        self._samples += 1
+
+    def next_deadline(self):
+        """Earliest pending deadline, or None"""
+        heap = self._heap
+        return heap[0][0] if heap else None
+
+    def run_pending(self, now=None):
+        """Run every task whose deadline has passed
+
+        Returns:
+            Number of callbacks run
+        """
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        ran = 0
+        while heap and heap[0][0] <= now:
+            with self._lock:
+                deadline, _, task = heapq.heappop(heap)
+            if task.active and task.end is not None and deadline >= task.end:
+                task.active = False
+            if task.active:
+                self._record(self.clock() - deadline)
+                if task.callback() is False:
+                    task.active = False
+            if not task.active:
+                self._stopped(task)
+                continue
+            ran += 1
+            task.count += 1
+
+            behind = now - task.deadline
+            if behind >= 0:
+                # The next deadline has passed already
+                missed = int(behind // task.interval) + 1
+                keep = 0 if self.policy == self.SKIP else self.max_catch_up
+                if missed > keep:
+                    task.count += missed - keep
+                    self.skipped += missed - keep
+            self._push(task)
+        return ran
+
+    def run(self, until=None, stop_when_empty=True):
+        """Run tasks and serve readers until stopped
+
+        Args:
+            until: Clock time to stop at, None to run until stopped
+            stop_when_empty: Return once no task is left
+        """
+        self.running = True
+        while self.running:
+            now = self.clock()
+            if until is not None and now >= until:
+                break
+            self.run_pending(now)
+            deadline = self.next_deadline()
+            if deadline is None:
+                if stop_when_empty:
+                    break
+                deadline = now + 0.05
+            timeout = max(0.0, deadline - self.clock())
+            if until is not None:
+                timeout = min(timeout, max(0.0, until - self.clock()))
+            self._wait(timeout)
+        self.running = False
+
+    def _wait(self, timeout):
+        if not self._readers:
+            time.sleep(timeout)
+            return
+        for key, _ in self._selector.select(timeout):
+            try:
+                key.data()
+            except Exception as e:
+                logger.error("Error in scheduler reader: %s", e)
+
+    def start(self):
+        """Run the scheduler in a background thread"""
+        self.thread = threading.Thread(target=self.run, kwargs={'stop_when_empty': False})
+        self.thread.daemon = True
+        self.running = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self.running = False
+        if hasattr(self, 'thread'):
+            self.thread.join(timeout=1.0)
+
+    def lateness_percentiles(self, percentiles=(50, 90, 99, 99.9)):
+        """Send-time jitter: how late callbacks ran after their deadline
+
+        Returns:
+            Dict of percentile -> lateness in milliseconds
+        """
+        count = min(self._samples, len(self._lateness))
+        samples = sorted(self._lateness[:count])
+        if not samples:
+            return {p: 0.0 for p in percentiles}
+        return {p: samples[min(count - 1, int(p / 100.0 * count))] * 1000.0
+                for p in percentiles}
@@ -0,0 +1,295 @@
+"""
+Audio sinks for received media
+
+A sink takes packets in playout order with ``write(packet)`` and is closed
+with ``close()``, the interface RTPReceiver and RTPServer streams write to.
+When the sequence number jumps, the packets in between were given up, and
+the sink first fills the time their RTP timestamps cover, so the output
+timeline stays aligned with the sender's: 16-bit mono audio is concealed by
+repeating the last pitch period (see plc.py), anything else gets silence.
+Payloads are decoded to 16-bit PCM by the codec registered for their
+payload type.
+
+A sender using silence suppression stops sending during silence: the
+sequence numbers stay contiguous but the timestamps jump. The sink fills
+such a jump with comfort noise at the level of the last comfort noise
+packet (RFC 3389), or silence before one has arrived.
+
+``ThreadedSink`` moves the file writes off the receive thread: frames are
+queued and a background thread writes them in large batches, so a slow disk
+no longer stalls packet processing. ``MmapWaveSink`` writes into a
+preallocated, memory-mapped WAV file, and ``NullSink`` only counts, for
+measuring protocol overhead without any I/O.
+"""
+
+import logging
+import mmap
+import struct
+import threading
+import time
+import wave
+from rtp.utils.codecs import PT_CN, get_codec
+from rtp.utils.plc import PacketLossConcealer
+from rtp.utils.vad import ComfortNoise, decode_comfort_noise
+
+logger = logging.getLogger(__name__)
+
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+class AudioSink:
+    """Base class of the sinks: gap concealment on top of ``write_frames``
+
+    Attributes:
+        packets: Packets written
+        concealed_frames: Lost sequence numbers filled in
+        concealed_samples: Samples written for them
+        plc: PacketLossConcealer, None when lost audio is replaced by silence
+        comfort_noise_samples: Samples of comfort noise written for
+            suppressed silence
+    """
+    def __init__(self, sample_rate=8000, channels=1, sample_width=2, max_gap=10.0,
+                 noise_seed=None, plc=True):
+        """
+        Args:
+            sample_rate: RTP clock rate and WAV frame rate in Hz
+            channels: Audio channels
+            sample_width: Bytes per sample
+            max_gap: Longest silence written for one gap in seconds; larger
+                timestamp jumps are taken as a discontinuity
+            noise_seed: Seed of the comfort noise generator
+            plc: Conceal lost audio instead of writing silence; only 16-bit
+                mono audio can be concealed
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_size = channels * sample_width
+        self.max_gap = int(max_gap * sample_rate)
+        self.noise_seed = noise_seed
+        self.packets = 0
+        self.concealed_frames = 0
+        self.concealed_samples = 0
+        self.comfort_noise_samples = 0
+        self.comfort_noise = ComfortNoise(noise_seed)
+        self.plc = PacketLossConcealer(sample_rate) \
+            if plc and channels == 1 and sample_width == 2 else None
+        self._noise_level = None  # dBov from the last comfort noise packet
+        self._next_seq = None
+        self._next_ts = None  # Timestamp right after the last written payload
+
+    def write(self, packet):
+        """Write one packet's decoded payload after filling any gap before it"""
+        if self._next_seq is not None:
+            gap = (packet.timestamp - self._next_ts) & 0xFFFFFFFF
+            if packet.seq_num != self._next_seq:
+                lost = (packet.seq_num - self._next_seq) & 0xFFFF
+                if lost < 0x8000 and 0 < gap <= self.max_gap:
+                    self.concealed_frames += lost
+                    self.concealed_samples += gap
+                    self.write_frames(self.plc.conceal(gap) if self.plc
+                                      else bytes(gap * self.frame_size))
+            elif 0 < gap <= self.max_gap:
+                # Nothing was lost: the sender suppressed this stretch as silence
+                self.comfort_noise_samples += gap
+                self.write_frames(self.comfort_noise.generate(gap * self.channels,
+                                                              self._noise_level))
+        self._next_seq = (packet.seq_num + 1) & 0xFFFF
+        if packet.payload_type == PT_CN:
+            # The silence starts at this timestamp; the noise is written up to the next packet
+            self._noise_level = decode_comfort_noise(packet.payload_view)
+            self._next_ts = packet.timestamp
+            return
+        payload = packet.payload_view
+        codec = get_codec(packet.payload_type)
+        if codec is not None:
+            payload = codec.decode(payload)
+        self.packets += 1
+        self._next_ts = (packet.timestamp + len(payload) // self.frame_size) & 0xFFFFFFFF
+        if self.plc:
+            payload = self.plc.update(payload)
+        self.write_frames(payload)
+
+    def write_frames(self, data):
+        """Write raw audio frames"""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release the output"""
+
+
+class NullSink(AudioSink):
+    """Discard the audio, keeping counts and the time of the first and last write
+
+    Attributes:
+        bytes: Audio bytes written, silence included
+        first, last: time.monotonic() of the first and last packet
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes = 0
+        self.first = None
+        self.last = None
+
+    def write(self, packet):
+        now = time.monotonic()
+        if self.first is None:
+            self.first = now
+        self.last = now
+        super().write(packet)
+
+    def write_frames(self, data):
+        self.bytes += len(data)
+
+    def rate(self):
+        """Packets per second between the first and last write, None if unknown"""
+        if self.first is None or self.last <= self.first:
+            return None
+        return (self.packets - 1) / (self.last - self.first)
+
+
+class WaveFileSink(AudioSink):
+    """Write a WAV file with the wave module, on the calling thread"""
+    def __init__(self, path, sample_rate=8000, channels=1, sample_width=2, **kwargs):
+        super().__init__(sample_rate, channels, sample_width, **kwargs)
+        self.path = path
+        self._wave = wave.open(path, 'wb')
+        self._wave.setnchannels(channels)
+        self._wave.setsampwidth(sample_width)
+        self._wave.setframerate(sample_rate)
+
+    def write_frames(self, data):
+        # The header is patched once on close instead of after every write
+        self._wave.writeframesraw(data)
+
+    def close(self):
+        if self._wave is not None:
+            self._wave.close()
+            self._wave = None
+
+
+class MmapWaveSink(AudioSink):
+    """Write a WAV file through a memory map of a preallocated file
+
+    Frames are copied into the map, so a write is a memory copy and the
+    kernel writes the pages back. The file grows by doubling when the
+    preallocated length is used up; ``close`` fills in the header and
+    truncates the file to the audio written.
+    """
+    def __init__(self, path, sample_rate=8000, channels=1, sample_width=2, preallocate=60.0,
+                 **kwargs):
+        """
+        Args:
+            path: WAV file to create
+            preallocate: Seconds of audio the file is first sized for
+        """
+        super().__init__(sample_rate, channels, sample_width, **kwargs)
+        self.path = path
+        self._file = open(path, 'w+b')
+        length = _WAV_HEADER.size + max(1, int(preallocate * sample_rate)) * self.frame_size
+        self._file.truncate(length)
+        self._map = mmap.mmap(self._file.fileno(), length)
+        self._offset = _WAV_HEADER.size
+
+    def write_frames(self, data):
+        end = self._offset + len(data)
+        if end > len(self._map):
+            self._grow(end)
+        self._map[self._offset:end] = data
+        self._offset = end
+
+    def _grow(self, needed):
+        length = max(needed, 2 * len(self._map))
+        self._map.close()
+        self._file.truncate(length)
+        self._map = mmap.mmap(self._file.fileno(), length)
+
+    def close(self):
+        if self._map is None:
+            return
+        data_size = self._offset - _WAV_HEADER.size
+        self._map[:_WAV_HEADER.size] = _WAV_HEADER.pack(
+            b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * self.frame_size, self.frame_size, self.sample_width * 8,
+            b'data', data_size)
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._file.truncate(self._offset)
+        self._file.close()
+
+
+class ThreadedSink(AudioSink):
+    """Queue frames and write them to another sink from a background thread
+
+    ``write`` only copies the frames into a queue. The writer thread hands
+    them to the wrapped sink in one ``write_frames`` call once
+    ``batch_bytes`` are queued or ``flush_interval`` has passed. Gap
+    concealment happens here, on the caller's thread, in packet order.
+
+    Attributes:
+        writes: Batched writes made to the wrapped sink
+        dropped_bytes: Audio discarded because the queue was full
+    """
+    def __init__(self, sink, batch_bytes=64 * 1024, flush_interval=0.2, max_pending=16 << 20):
+        """
+        Args:
+            sink: AudioSink receiving the batched frames
+            batch_bytes: Queued bytes that wake the writer
+            flush_interval: Longest time frames wait in the queue in seconds
+            max_pending: Queue limit in bytes; frames beyond it are dropped
+                rather than blocking the caller
+        """
+        super().__init__(sink.sample_rate, sink.channels, sink.sample_width,
+                         sink.max_gap / sink.sample_rate, noise_seed=sink.noise_seed,
+                         plc=sink.plc is not None)
+        self.sink = sink
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.writes = 0
+        self.dropped_bytes = 0
+        self._chunks = []
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write_frames(self, data):
+        with self._cond:
+            if self._pending + len(data) > self.max_pending:
+                self.dropped_bytes += len(data)
+                return
+            # The payload may be a view into a receive buffer that gets reused
+            self._chunks.append(bytes(data))
+            self._pending += len(data)
+            if self._pending >= self.batch_bytes:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and self._pending < self.batch_bytes:
+                    self._cond.wait(self.flush_interval)
+                chunks, self._chunks = self._chunks, []
+                self._pending = 0
+                closed = self._closed
+            if chunks:
+                try:
+                    self.sink.write_frames(b''.join(chunks))
+                    self.writes += 1
+                except (OSError, ValueError) as e:
+                    logger.error("Error writing audio: %s", e)
+            if closed:
+                break
+
+    def close(self):
+        """Write what is queued, stop the thread and close the wrapped sink"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.sink.close()
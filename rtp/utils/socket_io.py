@@ -0,0 +1,72 @@
+import select
+import socket
+
+# Non-blocking receive flag; without it recv_batch reads one datagram per call
+_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+class BufferPool:
+    """Preallocated receive buffers for recv_batch
+
+    ``count`` slots of ``size`` bytes are carved out of one ``bytearray``, so
+    receiving a batch allocates no datagram buffers. A slot is overwritten by
+    the next batch: packets decoded from it must be copied with
+    ``RTPPacket.detach`` if they are kept longer.
+    """
+    def __init__(self, count=64, size=2048):
+        """
+        Args:
+            count: Largest number of datagrams received per batch
+            size: Largest datagram size, longer datagrams are truncated
+        """
+        self.count = count
+        self.size = size
+        self._storage = bytearray(count * size)
+        view = memoryview(self._storage)
+        self.slots = [view[i * size:(i + 1) * size] for i in range(count)]
+
+
+def recv_batch(sock, pool, timeout=None):
+    """Wait for datagrams, then drain the socket into the pool
+
+    Args:
+        sock: Blocking UDP socket (``settimeout(None)``)
+        pool: BufferPool receiving the datagrams
+        timeout: Seconds to wait for the first datagram, None to wait forever
+
+    Returns:
+        List of (memoryview of the datagram, sender address), empty on timeout
+    """
+    slots = pool.slots
+    if not _DONTWAIT:
+        # Cannot drain without blocking: one datagram per call
+        if not select.select([sock], [], [], timeout)[0]:
+            return []
+        length, addr = sock.recvfrom_into(slots[0])
+        return [(slots[0][:length], addr)]
+
+    batch = []
+    recvfrom_into = sock.recvfrom_into
+    index = 0
+    while index < len(slots):
+        slot = slots[index]
+        try:
+            length, addr = recvfrom_into(slot, 0, _DONTWAIT)
+        except BlockingIOError:
+            # Only wait when the socket was empty to begin with
+            if batch or not select.select([sock], [], [], timeout)[0]:
+                break
+            continue
+        batch.append((slot[:length], addr))
+        index += 1
+    return batch
+
+
+def send_batch(sock, datagrams, addr):
+    """Send the datagrams produced in one tick to one address
+
+    Python has no ``sendmmsg``, so this is a single tight ``sendto`` loop.
+    """
+    sendto = sock.sendto
+    for data in datagrams:
+        sendto(data, addr)
@@ -0,0 +1,107 @@
+"""
+Voice activity detection and comfort noise (RFC 3389)
+
+The sender measures the energy of every frame in dBov (decibels relative to
+a full-scale square wave) with NumPy and treats it as speech when it is
+above both a fixed threshold and an adaptive estimate of the background
+noise. A hangover keeps a few frames after speech so the ends of words are
+not cut off. Silent frames are not sent (DTX); instead a comfort noise
+packet carrying the noise level is sent when the silence starts and
+periodically after that, and the receiver fills the gap with noise of that
+level so the call does not fall dead silent.
+
+Comfort noise payloads carry only the level byte (no spectral
+coefficients), which RFC 3389 allows; the noise is white.
+"""
+
+import numpy as np
+
+MIN_LEVEL = -127.0  # Lowest level a comfort noise payload can carry, in dBov
+_FULL_SCALE = 32768.0
+
+
+def level_dbov(frame):
+    """Energy of a frame of 16-bit little-endian PCM in dBov"""
+    samples = np.frombuffer(frame, dtype='<i2', count=len(frame) // 2)
+    if not len(samples):
+        return MIN_LEVEL
+    power = np.dot(samples, samples.astype(np.float64)) / len(samples)
+    return max(MIN_LEVEL, 10.0 * np.log10(power / _FULL_SCALE ** 2)) if power else MIN_LEVEL
+
+
+def frame_levels(pcm, frame_samples=160):
+    """Energy in dBov of every whole frame of 16-bit PCM, in one pass"""
+    samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
+    frames = samples[:len(samples) - len(samples) % frame_samples].reshape(-1, frame_samples)
+    power = np.einsum('ij,ij->i', frames, frames.astype(np.float64)) / frame_samples
+    with np.errstate(divide='ignore'):
+        return np.maximum(MIN_LEVEL, 10.0 * np.log10(power / _FULL_SCALE ** 2))
+
+
+def encode_comfort_noise(level):
+    """Comfort noise payload for a noise level in dBov"""
+    return bytes([int(min(127, max(0, round(-level))))])
+
+
+def decode_comfort_noise(payload):
+    """Noise level in dBov of a comfort noise payload"""
+    if not payload:
+        raise ValueError("Empty comfort noise payload")
+    return -float(payload[0] & 0x7F)
+
+
+class VoiceActivityDetector:
+    """Energy-based voice activity detection with a noise floor and hangover
+
+    Attributes:
+        level: Level of the last frame in dBov
+        noise_floor: Estimated background level in dBov, starting low enough
+            that a call opening with speech is detected
+    """
+    def __init__(self, threshold=-55.0, margin=10.0, hangover=8, floor_rise=0.005):
+        """
+        Args:
+            threshold: Frames below this level in dBov are always silence
+            margin: dB above the noise floor a frame needs to be speech
+            hangover: Frames still sent after speech drops below the thresholds
+            floor_rise: Fraction of the distance the noise floor moves up per
+                frame; it follows quieter frames immediately
+        """
+        self.threshold = threshold
+        self.margin = margin
+        self.hangover = hangover
+        self.floor_rise = floor_rise
+        self.level = MIN_LEVEL
+        self.noise_floor = threshold - margin
+        self._hang = 0
+
+    def is_active(self, frame):
+        """Whether a frame of 16-bit PCM should be sent"""
+        level = self.level = level_dbov(frame)
+        floor = self.noise_floor
+        if level < floor:
+            floor = level
+        else:
+            floor += self.floor_rise * (level - floor)
+        self.noise_floor = floor
+        if level > self.threshold and level > floor + self.margin:
+            self._hang = self.hangover
+            return True
+        if self._hang:
+            self._hang -= 1
+            return True
+        return False
+
+
+class ComfortNoise:
+    """White noise at a level in dBov, written in place of suppressed silence"""
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def generate(self, samples, level):
+        """samples of 16-bit PCM noise at level dBov, silence if level is None"""
+        if level is None or level <= MIN_LEVEL:
+            return bytes(2 * samples)
+        rms = _FULL_SCALE * 10.0 ** (level / 20.0)
+        noise = self.rng.standard_normal(samples) * rms
+        return np.clip(np.rint(noise), -32768, 32767).astype('<i2').tobytes()
@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name="rtp-audio",
     version="0.1.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=[
         "numpy>=1.21.0",
         "soundfile>=0.10.3",